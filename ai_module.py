@@ -1,153 +1,291 @@
 # ✅ AI Assistant backend logic
 
-import re, logging
+import logging, re
 from collections import Counter
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional
 
-# Try to use the fast python-Levenshtein library if available.  When it
-# isn't installed fall back to difflib's SequenceMatcher so that the
-# module still works out of the box.  The previous implementation relied
-# on an unconditional import which raised ``ModuleNotFoundError`` when the
-# optional dependency was missing, breaking AI log analysis entirely.
-try:  # pragma: no cover - simple import guard
-    import Levenshtein  # type: ignore
+from error_clusters import ErrorClusterer, cluster_errors, count_repeats
+from log_scanner import line_level
+from log_tokenizer import LineTokens, tokenize_line, tokenize_text
+from sketches import TopKCounter
 
-    def _levenshtein_ratio(a: str, b: str) -> float:
-        return Levenshtein.ratio(a, b)
-
-except Exception:  # pragma: no cover - fallback implementation
-    from difflib import SequenceMatcher
-
-    def _levenshtein_ratio(a: str, b: str) -> float:
-        return SequenceMatcher(None, a, b).ratio()
-        
-# 🔍 Basic regex patterns to reuse from main app
-ERROR_PATTERN = re.compile(r'\[(ERROR|WARN|FATAL)\]')
-SERVICE_PATTERN = re.compile(r'\[(com\.datalex\..+?)\]')
-
-class ThreadPatterns:
-    THREAD_ID = re.compile(r'(?:\[[^\]]*\] ){1,2}\[(\d{13}_\d{4})\]')
+SERVICE_CATEGORY = "com.datalex."  # only these loggers count as services
+LEVEL_MARKER = re.compile(r'\[(?:FATAL|ERROR|WARN)\]')
 
 
 # ✅ Main AI analysis function
 def analyze_log_content(log_text: str) -> Dict[str, Any]:
     """
     Analyze the given log content and return AI-generated insights.
-    Includes: error counts, service names, Levenshtein similarity, anomalies.
+    Includes: error counts, service names, groups of similar error lines, anomalies.
+    """
+    analyzer = LogContentAnalyzer()
+    analyzer.feed_text(log_text)
+    return analyzer.result()
+
+# ✅ Same analysis read straight from disk, a chunk at a time
+def analyze_log_file(path: str, start: int = 0, end: Optional[int] = None,
+                     chunk_bytes: int = 1024 * 1024) -> Dict[str, Any]:
+    """Analyze bytes ``start``..``end`` of a log file without holding more than one chunk of it."""
+    return analyze_log_range(path, start, end, chunk_bytes).result()
+
+# ✅ Process pool task: the analyzer state of one byte range, merged by the caller
+def analyze_log_range(path: str, start: int = 0, end: Optional[int] = None,
+                      chunk_bytes: int = 1024 * 1024, source: Optional[str] = None) -> "LogContentAnalyzer":
+    """Feed bytes ``start``..``end`` of a log file (named ``source``) to a new analyzer, a chunk at a time."""
+    analyzer = LogContentAnalyzer(source=source)
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_bytes if remaining is None else min(chunk_bytes, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            analyzer.feed_bytes(chunk)
+    analyzer.flush()
+    return analyzer
+
+# ✅ Reduce step: the range analyzers of one log (or of its from/to window) in file order
+def merge_log_ranges(analyzers: Iterable["LogContentAnalyzer"], first_line: int = 1,
+                     source: Optional[str] = None) -> "LogContentAnalyzer":
+    """One analyzer of consecutive byte ranges, the first starting on file line ``first_line``."""
+    merged = LogContentAnalyzer(source=source)
+    line_offset = first_line - 1
+    for analyzer in analyzers:
+        merged.merge(analyzer, line_offset)
+        line_offset += analyzer.total_lines
+    return merged
+
+class LogContentAnalyzer:
     """
-    lines = log_text.splitlines()
-    level_counter = Counter()
-    thread_counter = Counter()
-    service_counter = Counter()
-    error_services_counter = Counter()  # ✅ NEW: Track services in error lines
-    error_lines = []  # ✅ Preserve for Levenshtein
-
-    for i, line in enumerate(lines):
-        # ✅ Count log levels
-        level_match = ERROR_PATTERN.search(line)
-        if level_match:
-            level = level_match.group(1)
-            level_counter[level] += 1
-            error_lines.append((i + 1, line))  # For Levenshtein
-
-            # ✅ Track services that failed
-            service_match = SERVICE_PATTERN.search(line)
-            if service_match:
-                service = service_match.group(1).split('.')[-1]
-                error_services_counter[service] += 1
+    Incremental ``analyze_log_content``: feed it lines (``feed_lines``),
+    text (``feed_text``) or raw bytes (``feed_bytes``, lines may span
+    chunks), then ask for the ``result``.  Only counters, a bounded
+    top-threads counter and the error groups are kept, never the lines
+    themselves.  The thread and service of a line are read from its prefix
+    (see ``log_tokenizer``), so only timestamp lines have them.  Like the
+    error table (``log_scanner.line_level``), any line carrying a
+    ``[FATAL]``/``[ERROR]``/``[WARN]`` marker is an error line, continuation
+    lines included.
+
+    Analyzers of different log files (``source``) combine with
+    ``merge_log``; every kept structure is capped, so a combined analysis of
+    any number of files stays within the memory of a single one.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.85, source: Optional[str] = None):
+        self.source = source
+        self.logs: Dict[str, Dict[str, int]] = {}  # per merged log file: lines and error lines
+        self.total_lines = 0
+        self.level_counter = Counter()
+        self.thread_counter = TopKCounter()  # a new thread id per request: keep the busiest only
+        self.service_counter = Counter()
+        self.error_services_counter = Counter()  # ✅ NEW: Track services in error lines
+        self.error_groups = ErrorClusterer(similarity_threshold, source=source)  # ✅ Error lines grouped by masked template
+        self._partial: List[bytes] = []  # bytes of a line not finished by the last chunk
+
+    def _count(self, tokens: LineTokens) -> None:
+        """Count the thread and service of a timestamp line."""
+        _, _, _, thread, category, service = tokens
 
         # ✅ Count threads
-        thread_match = ThreadPatterns.THREAD_ID.search(line)
-        if thread_match:
-            # logger.debug("Pattern THREAD_ID found")
-            thread_counter[thread_match.group(1)] += 1
+        if thread:
+            self.thread_counter.add(thread)
 
         # ✅ Count all services (not just error ones)
-        service_match = SERVICE_PATTERN.search(line)
-        if service_match:
-            service = service_match.group(1).split('.')[-1]
-            service_counter[service] += 1
-
-    # ✅ Top summaries
-    top_threads = thread_counter.most_common(3)
-    top_services = service_counter.most_common(3)
-    top_error_services = error_services_counter.most_common(5)
-
-    # ✅ Start building anomaly list
-    anomalies = []
-
-    if level_counter["FATAL"] > 0:
-        anomalies.append("⚠️ FATAL errors detected — critical issue present.")
-    if level_counter["ERROR"] > 10:
-        anomalies.append("📌 High volume of ERRORs — investigate root cause.")
-    if len(top_threads) == 1 and top_threads[0][1] > 5:
-        anomalies.append(f"🧵 Thread '{top_threads[0][0]}' may be problematic (appears {top_threads[0][1]} times).")
-
-    # ✅ NEW: Repeating errors based on Levenshtein
-    similar_count = detect_similar_errors(error_lines, threshold=0.85)
-    if similar_count >= 3:
-        anomalies.append(f"🔁 {similar_count} repeating error lines (≥85% match) — possible retry loop.")
-
-    # ✅ NEW: Failing services based on ERROR/FATAL
-    if top_error_services:
-        summary = ", ".join([f"{name} ({count})" for name, count in top_error_services])
-        anomalies.append(f"🛠️ Services with most errors: {summary}")
-
-    # ✅ Return structured insights
-    # ✅ Natural language summary (AI-style)
-    natural_summary = generate_summary_text(
-        total_lines=len(lines),
-        level_counter=level_counter,
-        top_threads=top_threads,
-        top_services=top_services,
-        similar_count=similar_count,
-        top_error_services=top_error_services
-    )
-
-    return {
-        "summary": natural_summary,
-        "top_threads": top_threads,
-        "top_services": top_services,
-        "anomalies": anomalies,
-        "recommendations": generate_recommendations(level_counter, top_threads, top_error_services, similar_count),
-        "failing_services": [f"{name} ({count})" for name, count in top_error_services]
-    }
-
-# ✅ Helper function to detect similar error lines using Levenshtein distance
+        if category is not None and category.startswith(SERVICE_CATEGORY):
+            self.service_counter[service] += 1
+
+    def _count_error(self, line: str, tokens: Optional[LineTokens]) -> bool:
+        """Count the level of a line with a severity marker (and its service); True for an error line."""
+        level = line_level(line)
+        if level is None:
+            return False
+        self.level_counter[level] += 1
+        # ✅ Track services that failed
+        if tokens is not None and tokens[4] is not None and tokens[4].startswith(SERVICE_CATEGORY):
+            self.error_services_counter[tokens[5]] += 1
+        return True
+
+    def feed_line(self, line: str) -> None:
+        self.total_lines += 1
+        tokens = tokenize_line(line)
+        if tokens is not None:
+            self._count(tokens)
+        if self._count_error(line, tokens):
+            self.error_groups.add(self.total_lines, line)  # Grouped by masked template
+
+    def feed_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.feed_line(line)
+
+    def feed_text(self, text: str) -> None:
+        """
+        Whole lines separated by ``\\n`` (``\\r\\n`` too): the prefixes are
+        tokenized in one batch, then only the lines with a severity marker
+        are looked at one by one.
+        """
+        if not text:
+            return
+        count = self._count
+        for _, _, tokens in tokenize_text(text):
+            count(tokens)
+
+        count_error = self._count_error
+        add_error = self.error_groups.add
+        find, rfind, count_newlines = text.find, text.rfind, text.count
+        line_number = self.total_lines + 1
+        pos = line_end = 0
+        for marker in LEVEL_MARKER.finditer(text):
+            if marker.start() < line_end:
+                continue  # another marker on a line already counted
+            start = rfind("\n", 0, marker.start()) + 1
+            line_number += count_newlines("\n", pos, start)
+            pos = start
+            line_end = find("\n", marker.end())
+            if line_end < 0:
+                line_end = len(text)
+            line = text[start:line_end].rstrip("\r")
+            if count_error(line, tokenize_line(line)):
+                add_error(line_number, line)
+        self.total_lines += count_newlines("\n") + (not text.endswith("\n"))
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        end = chunk.rfind(b"\n") + 1
+        if not end:
+            self._partial.append(chunk)
+            return
+        # UTF-8 never splits a character across "\n", so whole lines decode as one
+        self._partial.append(chunk[:end])
+        text = b"".join(self._partial).decode("utf-8", errors="ignore")
+        self._partial = [chunk[end:]] if end < len(chunk) else []
+        self.feed_text(text)
+
+    def flush(self) -> None:
+        """Analyze a last line that was not ended by a newline."""
+        rest = b"".join(self._partial)
+        self._partial = []
+        if rest:
+            self.feed_text(rest.decode("utf-8", errors="ignore"))
+
+    def merge(self, other: "LogContentAnalyzer", line_offset: Optional[int] = None) -> None:
+        """
+        Add the analysis of the lines that follow ours (e.g. the next byte
+        range of the file): their line numbers are shifted by ours, unless
+        ``line_offset`` says otherwise.
+        """
+        self.flush()
+        other.flush()
+        self.level_counter.update(other.level_counter)
+        self.thread_counter.merge(other.thread_counter)
+        self.service_counter.update(other.service_counter)
+        self.error_services_counter.update(other.error_services_counter)
+        self.error_groups.merge(other.error_groups, self.total_lines if line_offset is None else line_offset)
+        self.total_lines += other.total_lines
+        for log, stats in other.logs.items():
+            mine = self.logs.setdefault(log, {"lines": 0, "errors": 0})
+            mine["lines"] += stats["lines"]
+            mine["errors"] += stats["errors"]
+
+    def merge_log(self, other: "LogContentAnalyzer") -> None:
+        """
+        Add the whole analysis of another log file (``other.source``): its
+        line numbers stay its own and it gets a row in the ``logs`` of the
+        result.
+        """
+        other.flush()
+        if not other.logs:
+            other.logs[other.source or "?"] = {"lines": other.total_lines,
+                                               "errors": sum(other.level_counter.values())}
+        self.merge(other, line_offset=0)
+
+    def result(self) -> Dict[str, Any]:
+        """The insights for everything fed so far (a last line without newline included)."""
+        self.flush()
+        level_counter = self.level_counter
+
+        # ✅ Top summaries
+        top_threads = self.thread_counter.most_common(3)
+        top_services = self.service_counter.most_common(3)
+        top_error_services = self.error_services_counter.most_common(5)
+
+        # ✅ Start building anomaly list
+        anomalies = []
+
+        if level_counter["FATAL"] > 0:
+            anomalies.append("⚠️ FATAL errors detected — critical issue present.")
+        if level_counter["ERROR"] > 10:
+            anomalies.append("📌 High volume of ERRORs — investigate root cause.")
+        if len(top_threads) == 1 and top_threads[0][1] > 5:
+            anomalies.append(f"🧵 Thread '{top_threads[0][0]}' may be problematic (appears {top_threads[0][1]} times).")
+
+        # ✅ NEW: Repeating errors (masked templates, LSH candidates, similarity-checked)
+        error_groups = self.error_groups.groups()
+        similar_count = count_repeats(error_groups)
+        if similar_count >= 3:
+            anomalies.append(f"🔁 {similar_count} repeating error lines (≥85% similar after masking IDs/numbers) — possible retry loop.")
+
+        # ✅ NEW: Failing services based on ERROR/FATAL
+        if top_error_services:
+            summary = ", ".join([f"{name} ({count})" for name, count in top_error_services])
+            anomalies.append(f"🛠️ Services with most errors: {summary}")
+
+        # ✅ Return structured insights
+        # ✅ Natural language summary (AI-style)
+        natural_summary = generate_summary_text(
+            total_lines=self.total_lines,
+            level_counter=level_counter,
+            top_threads=top_threads,
+            top_services=top_services,
+            similar_count=similar_count,
+            top_error_services=top_error_services,
+            log_count=max(len(self.logs), 1)
+        )
+
+        result = {
+            "summary": natural_summary,
+            "top_threads": top_threads,
+            "top_services": top_services,
+            "anomalies": anomalies,
+            "recommendations": generate_recommendations(level_counter, top_threads, top_error_services, similar_count),
+            "failing_services": [f"{name} ({count})" for name, count in top_error_services],
+            "error_groups": [
+                {"size": g["size"], "line_number": g["line_number"], "representative": g["representative"],
+                 **({"log": g["source"]} if self.logs else {})}
+                for g in error_groups[:5] if g["size"] > 1
+            ]
+        }
+        if self.logs:
+            # ✅ Combined analysis of several logs: where the lines and errors came from
+            result["logs"] = [{"log": log, **stats} for log, stats in self.logs.items()]
+        return result
+
+# ✅ Helper function to detect similar error lines (masked templates + LSH)
 def detect_similar_errors(error_lines: list, threshold: float = 0.85) -> int:
     """
-    Detect how many lines are similar to each other using a Levenshtein
-    ratio. The fast `python-Levenshtein` package is used when available,
-    otherwise the standard library `difflib.SequenceMatcher` is used as a
-    fallback.
+    Detect how many lines repeat an earlier, similar line.  Lines are
+    grouped by ``error_clusters.cluster_errors``: variable tokens are
+    masked, and each template joins a group whose representative, found
+    among its MinHash/LSH candidates, is ≥ ``threshold`` similar.  That
+    takes near-linear time instead of comparing every pair of lines.
 
     - Only compares [ERROR], [WARN], [FATAL] lines.
-    - Returns how many lines were part of ≥85% match groups.
+    - Returns how many lines were part of ≥85% match groups, minus one per group.
     """
-    matched_indices = set()
-    count = 0
-
-    for i, (line_num_i, line_i) in enumerate(error_lines):
-        for j in range(i + 1, len(error_lines)):
-            if j in matched_indices:
-                continue  # Skip already matched
-
-            line_j = error_lines[j][1]
-            similarity = _levenshtein_ratio(line_i, line_j)
-
-            if similarity >= threshold:
-                matched_indices.update({i, j})  # Save both
-                count += 1
-                break  # Stop comparing line_i with more
-
-    return count
+    return count_repeats(cluster_errors(error_lines, threshold))
 
 # ✅ Helper to generate natural language summary
-def generate_summary_text(total_lines: int, level_counter, top_threads, top_services, similar_count: int, top_error_services) -> str:
+def generate_summary_text(total_lines: int, level_counter, top_threads, top_services, similar_count: int, top_error_services,
+                          log_count: int = 1) -> str:
     """
     Generates human-friendly log summary sentence using statistics.
     """
-    summary = f"The log file contains {total_lines:,} lines.\n"
+    if log_count > 1:
+        summary = f"The {log_count} log files contain {total_lines:,} lines.\n"
+    else:
+        summary = f"The log file contains {total_lines:,} lines.\n"
 
     if level_counter:
         level_summary = ", ".join([f"{lvl}: {cnt}" for lvl, cnt in level_counter.items()])
@@ -164,7 +302,7 @@ def generate_summary_text(total_lines: int, level_counter, top_threads, top_serv
         summary += f"Most active service: {top_services[0][0]} ({top_services[0][1]} lines).\n"
 
     if similar_count > 0:
-        summary += f"{similar_count} repeating error line(s) detected (Levenshtein ≥85% similarity error grouping).\n"
+        summary += f"{similar_count} repeating error line(s) detected (≥85% similar after masking IDs/numbers).\n"
 
     return summary.strip()
 
@@ -0,0 +1,99 @@
+# ✅ Benchmark: pairwise Levenshtein loop vs template/LSH error clustering
+#
+# "exhaustive" is the number of groups found when every new template is
+# compared with every representative instead of the few LSH proposes; a
+# similar count means the lookup misses (almost) no group.  Timings use
+# python-Levenshtein when installed, difflib (much slower per comparison)
+# otherwise.
+#
+# Usage:
+#     python benchmarks/bench_error_clusters.py
+#     python benchmarks/bench_error_clusters.py --sizes 1000 10000 100000 --legacy-max 2000
+
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from error_clusters import cluster_errors, count_repeats, error_template, similarity_at_least
+
+WORDS = ["supplier", "timeout", "fare", "cache", "booking", "session", "ticket", "queue", "pricing", "socket",
+         "refused", "invalid", "segment", "payload", "schema", "missing", "retry", "gateway", "token", "expired"]
+SERVICES = ["AirShopping", "Pricing", "Booking", "Ticketing"]
+
+
+def make_error_lines(count: int, messages: int, unique_share: float, seed: int = 7):
+    """``(line_number, line)`` pairs: repeats of ``messages`` message shapes plus one-off lines."""
+    rnd = random.Random(seed)
+    shapes = [" ".join(rnd.sample(WORDS, rnd.randint(4, 9))) + " id={} after {} ms" for _ in range(messages)]
+    lines = []
+    for n in range(1, count + 1):
+        ts = f"2025-07-28T10:{(n // 60) % 60:02d}:{n % 60:02d},{rnd.randint(0, 999):03d}"
+        level = rnd.choice(["ERROR", "WARN", "FATAL"])
+        if rnd.random() < unique_share:
+            text = " ".join(rnd.choice(WORDS) + rnd.choice("abcdefgh") for _ in range(rnd.randint(5, 12)))
+        else:
+            text = rnd.choice(shapes).format(rnd.randint(1, 10 ** 9), rnd.randint(1, 30000))
+        lines.append((n, f"{ts} [{level}] [default task-{rnd.randint(1, 9)}] "
+                         f"[com.datalex.matrix.{rnd.choice(SERVICES)}] {text}"))
+    return lines
+
+
+def legacy_similar_count(error_lines, threshold: float = 0.85) -> int:
+    """The pairwise loop ``detect_similar_errors`` used to run."""
+    matched, count = set(), 0
+    for i, (_, line_i) in enumerate(error_lines):
+        for j in range(i + 1, len(error_lines)):
+            if j not in matched and similarity_at_least(line_i, error_lines[j][1], threshold):
+                matched.update({i, j})
+                count += 1
+                break
+    return count
+
+
+def exhaustive_group_count(error_lines, threshold: float = 0.85) -> int:
+    """Groups formed when every new template is compared with every representative."""
+    representatives, group_of_template = [], {}
+    for _, line in error_lines:
+        template = error_template(line)
+        group = group_of_template.get(template)
+        if group is None:
+            group = next((i for i, rep in enumerate(representatives)
+                          if similarity_at_least(template, rep, threshold)), None)
+            if group is None:
+                group = len(representatives)
+                representatives.append(template)
+            group_of_template[template] = group
+    return len(representatives)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--messages", type=int, default=40, help="Distinct message shapes")
+    parser.add_argument("--unique", type=float, default=0.05, help="Share of one-off lines")
+    parser.add_argument("--legacy-max", type=int, default=2000, help="Largest size the pairwise loop runs on")
+    parser.add_argument("--check-max", type=int, default=10000, help="Largest size clustered exhaustively too")
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'groups':>8} {'repeats':>8} {'clusters':>10} {'pairwise':>10} {'speed-up':>10} "
+          f"{'exhaustive':>12}")
+    for size in args.sizes:
+        error_lines = make_error_lines(size, args.messages, args.unique)
+        start = time.perf_counter()
+        groups = cluster_errors(error_lines)
+        fast = time.perf_counter() - start
+        legacy = speed_up = exhaustive = "-"
+        if size <= args.legacy_max:
+            start = time.perf_counter()
+            legacy_similar_count(error_lines)
+            slow = time.perf_counter() - start
+            legacy, speed_up = f"{slow:.2f}s", f"{slow / fast:.1f}x"
+        if size <= args.check_max:
+            exhaustive = exhaustive_group_count(error_lines)
+        print(f"{size:>8} {len(groups):>8} {count_repeats(groups):>8} {fast:>9.2f}s {legacy:>10} {speed_up:>10} "
+              f"{exhaustive:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# ✅ Benchmark: sequential vs process-pool error scan of a set of rotated logs
+#
+# Usage:
+#     python benchmarks/bench_error_scan.py --files 30 --size-mb 32 --workers 8
+#     python benchmarks/bench_error_scan.py --log ./logs/a.log --log ./logs/b.log
+
+import argparse, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from log_scanner import merge_error_results, scan_errors_range
+from rqrs_parser import get_process_pool, plan_range_count, shutdown_process_pool, split_aligned_ranges
+from synthetic_log import write_synthetic_log
+
+
+def scan_parallel(paths, workers: int, min_range_bytes: int, mode: str):
+    """Every range of every file is submitted at once, as /analyze_logs does with its look-ahead."""
+    pool = get_process_pool(workers)
+    planned = []
+    for path in paths:
+        parts = plan_range_count(os.path.getsize(path), workers, min_range_bytes)
+        ranges = split_aligned_ranges(path, parts)
+        planned.append([pool.submit(scan_errors_range, path, os.path.basename(path), start, end, mode)
+                        for start, end in ranges])
+    return [merge_error_results([future.result() for future in futures]) for futures in planned]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--log", action="append", help="Existing log file (repeatable; default: generate a set)")
+    parser.add_argument("--files", type=int, default=12, help="Number of generated logs")
+    parser.add_argument("--size-mb", type=int, default=32, help="Size of each generated log")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--min-range-mb", type=int, default=16)
+    parser.add_argument("--mode", default="mmap", choices=["mmap", "stream"])
+    args = parser.parse_args()
+
+    tmpdir = None
+    paths = args.log
+    if not paths:
+        tmpdir = tempfile.TemporaryDirectory()
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(tmpdir.name, f"server.log.{i}")
+            write_synthetic_log(path, args.size_mb * 1024 * 1024, seed=i)
+            paths.append(path)
+    size_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+
+    try:
+        start = time.perf_counter()
+        sequential = [scan_errors_range(path, os.path.basename(path), mode=args.mode) for path in paths]
+        seq_time = time.perf_counter() - start
+
+        # Warm the pool so worker start-up is not billed to the parallel run
+        scan_parallel(paths[:1], args.workers, args.min_range_mb * 1024 * 1024, args.mode)
+        start = time.perf_counter()
+        parallel = scan_parallel(paths, args.workers, args.min_range_mb * 1024 * 1024, args.mode)
+        par_time = time.perf_counter() - start
+    finally:
+        shutdown_process_pool()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    identical = sequential == parallel
+    rows = sum(len(result[1]) for result in sequential)
+    print(f"Logs:        {len(paths)} files, {size_mb:.1f} MB, {rows:,} error rows")
+    print(f"Sequential:  {seq_time:.2f}s ({size_mb / seq_time:.1f} MB/s)")
+    print(f"Parallel:    {par_time:.2f}s ({size_mb / par_time:.1f} MB/s) with {args.workers} workers")
+    print(f"Speed-up:    {seq_time / par_time:.2f}x")
+    print(f"Identical:   {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# ✅ Benchmark: per-field regexes vs the one-regex prefix tokenizer
+#
+# Every variant reads the same 1 MB chunks of raw bytes.  "legacy" is what
+# the AI analyzer and the scanners used to run: split and decode each line,
+# then a level search, a service search, a thread id search, a findall of
+# every bracketed value and a timestamp match.  "per line" splits and
+# decodes each line and calls ``tokenize_line``; "batch" decodes a chunk once
+# and makes one ``tokenize_text`` call.  Costs are nanoseconds per line of a
+# synthetic log (plain lines, stack traces and SOAP payloads).
+#
+# Usage:
+#     python benchmarks/bench_log_tokenizer.py
+#     python benchmarks/bench_log_tokenizer.py --size-mb 64
+#     python benchmarks/bench_log_tokenizer.py --log ./logs/server.log
+
+import argparse, os, re, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from log_tokenizer import tokenize_line, tokenize_text
+from synthetic_log import write_synthetic_log
+
+ERROR_PATTERN = re.compile(r'\[(ERROR|WARN|FATAL)\]')
+SERVICE_PATTERN = re.compile(r'\[(com\.datalex\..+?)\]')
+THREAD_ID = re.compile(r'(?:\[[^\]]*\] ){1,2}\[(\d{13}_\d{4})\]')
+TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},\d{3}')
+BRACKET_VALUES = re.compile(r"\[([^\[\]]*)\]")
+
+
+def legacy_fields(chunks):
+    """The per-field regexes, run on every line."""
+    fields = 0
+    for line in (raw.decode("utf-8", "ignore").rstrip("\r") for chunk in chunks for raw in chunk.split(b"\n")):
+        level = ERROR_PATTERN.search(line)
+        service = SERVICE_PATTERN.search(line)
+        thread = THREAD_ID.search(line)
+        values = BRACKET_VALUES.findall(line)
+        if TIMESTAMP.match(line):
+            fields += 1
+        fields += bool(level) + bool(service) + bool(thread) + len(values)
+    return fields
+
+
+def tokenized_lines(chunks):
+    return sum(1 for chunk in chunks for raw in chunk.split(b"\n")
+               if tokenize_line(raw.decode("utf-8", "ignore").rstrip("\r")) is not None)
+
+
+def tokenized_chunks(chunks):
+    return sum(1 for chunk in chunks for _ in tokenize_text(chunk.decode("utf-8", "ignore")))
+
+
+def read_chunks(path: str, chunk_bytes: int):
+    """The file in chunks of whole lines (the last one may lack its newline)."""
+    chunks, rest = [], b""
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_bytes)
+            if not data:
+                break
+            data = rest + data
+            end = data.rfind(b"\n") + 1
+            if not end:
+                rest = data
+                continue
+            chunks.append(data[:end - 1])
+            rest = data[end:]
+    if rest:
+        chunks.append(rest)
+    return chunks
+
+
+def timed(fn, arg, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--log", help="Existing log file (default: generate one)")
+    parser.add_argument("--size-mb", type=int, default=16, help="Size of the generated log")
+    parser.add_argument("--chunk-kb", type=int, default=1024, help="Bytes per tokenize_text call")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmpdir = None
+    path = args.log
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "server.log")
+        write_synthetic_log(path, args.size_mb * 1024 * 1024)
+    try:
+        chunks = read_chunks(path, args.chunk_kb * 1024)
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    line_count = sum(chunk.count(b"\n") + 1 for chunk in chunks)
+    headers = tokenized_lines(chunks)
+
+    legacy = timed(legacy_fields, chunks, args.repeat)
+    per_line = timed(tokenized_lines, chunks, args.repeat)
+    batch = timed(tokenized_chunks, chunks, args.repeat)
+    identical = tokenized_chunks(chunks) == headers
+
+    ns = 1e9 / line_count
+    print(f"Lines:       {line_count:,} ({headers:,} timestamp lines)")
+    print(f"Legacy:      {legacy * ns:7.0f} ns/line")
+    print(f"Per line:    {per_line * ns:7.0f} ns/line ({legacy / per_line:.1f}x)")
+    print(f"Batch:       {batch * ns:7.0f} ns/line ({legacy / batch:.1f}x)")
+    print(f"Identical:   {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# ✅ Benchmark: sequential vs process-pool RQ/RS extraction
+#
+# Usage:
+#     python benchmarks/bench_rqrs_parallel.py --size-mb 256 --workers 8
+#     python benchmarks/bench_rqrs_parallel.py --log ./logs/matrixtdp4.log
+
+import argparse, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from rqrs_parser import parse_rqrs_parallel, scan_rqrs_range, shutdown_process_pool
+from synthetic_log import write_synthetic_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--log", help="Existing log file to benchmark (default: generate one)")
+    parser.add_argument("--size-mb", type=int, default=128, help="Size of the generated log")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--min-range-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    tmpdir = None
+    path = args.log
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "synthetic.log")
+        write_synthetic_log(path, args.size_mb * 1024 * 1024)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    try:
+        start = time.perf_counter()
+        seq_entries, seq_lines = scan_rqrs_range(path)
+        seq_time = time.perf_counter() - start
+
+        # Warm the pool so worker start-up is not billed to the first run
+        parse_rqrs_parallel(path, args.workers, args.min_range_mb * 1024 * 1024)
+        start = time.perf_counter()
+        par_entries, par_lines = parse_rqrs_parallel(path, args.workers, args.min_range_mb * 1024 * 1024)
+        par_time = time.perf_counter() - start
+    finally:
+        shutdown_process_pool()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    identical = seq_entries == par_entries and seq_lines == par_lines
+    print(f"File:        {size_mb:.1f} MB, {seq_lines:,} lines, {len(seq_entries):,} RQ/RS entries")
+    print(f"Sequential:  {seq_time:.2f}s ({size_mb / seq_time:.1f} MB/s)")
+    print(f"Parallel:    {par_time:.2f}s ({size_mb / par_time:.1f} MB/s) with {args.workers} workers")
+    print(f"Speed-up:    {seq_time / par_time:.2f}x")
+    print(f"Identical:   {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# ✅ Benchmark: legacy XML_ERRORS regex vs the linear issue detector
+#
+# Usage:
+#     python benchmarks/bench_xml_issues.py
+#     python benchmarks/bench_xml_issues.py --tags 4000 --repeat 3
+
+import argparse, os, re, sys, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from xml_issues import detect_xml_issues, has_xml_issue
+
+LEGACY_XML_ERRORS = re.compile(r'<(ns1:)?Errors>|<.*Error.*>|ErrorCode|WarningCode', re.IGNORECASE)
+
+
+def make_payloads(tags: int):
+    """(name, payload) pairs: pretty-printed and single-line responses, with and without errors."""
+    segments = [f'<Segment id="{i}" from="MNL" to="SIN"><Flight>PR{i}</Flight></Segment>' for i in range(tags)]
+    errors = '<Errors><Error Type="3" Code="450" ShortText="Supplier failure"/></Errors>'
+    return [
+        ("multi-line, clean", "<FareSearchRS>\n" + "\n".join(segments) + "\n</FareSearchRS>"),
+        ("multi-line, error", "<FareSearchRS>\n" + "\n".join(segments) + "\n" + errors + "\n</FareSearchRS>"),
+        ("single line, clean", "<FareSearchRS>" + "".join(segments) + "</FareSearchRS>"),
+        ("single line, error", "<FareSearchRS>" + "".join(segments) + errors + "</FareSearchRS>"),
+    ]
+
+
+def best_of(repeat: int, func, text: str) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tags", type=int, default=1500, help="Segments per generated payload")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    identical = True
+    print(f"{'payload':<20} {'size':>10} {'regex':>10} {'detector':>10} {'speed-up':>10}")
+    for name, payload in make_payloads(args.tags):
+        legacy = best_of(args.repeat, LEGACY_XML_ERRORS.search, payload)
+        linear = best_of(args.repeat, detect_xml_issues, payload)
+        identical &= bool(LEGACY_XML_ERRORS.search(payload)) == has_xml_issue(payload)
+        print(f"{name:<20} {len(payload) / 1024:>8.0f}KB {legacy * 1000:>8.2f}ms {linear * 1000:>8.2f}ms "
+              f"{legacy / linear:>9.1f}x")
+    print(f"Identical:   {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# ✅ Synthetic JBoss-style log generator shared by the benchmarks
+
+import random
+
+SERVICES = [
+    "com.datalex.matrix.AirShopping",
+    "com.datalex.matrix.Pricing",
+    "com.datalex.tdp.Booking",
+    "com.datalex.tdp.Ticketing",
+]
+FAMILIES = ["OTA_AirLowFareSearch", "OTA_AirPrice", "OTA_AirBook", "OTA_AirDemandTicket"]
+LEVELS = ["INFO"] * 8 + ["DEBUG"] * 3 + ["WARN", "ERROR"]
+
+
+def write_synthetic_log(path: str, target_bytes: int, seed: int = 7) -> int:
+    """Write a log of roughly ``target_bytes`` mixing plain lines, stack traces and SOAP payloads."""
+    rnd = random.Random(seed)
+    threads = [f"{1722145600000 + i}_{1000 + i}" for i in range(200)]
+    written = 0
+    seconds = 0
+    entry = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target_bytes:
+            entry += 1
+            seconds += rnd.randint(0, 1)
+            ts = (f"2025-07-28T{(10 + seconds // 3600) % 24:02d}:{(seconds // 60) % 60:02d}:"
+                  f"{seconds % 60:02d},{rnd.randint(0, 999):03d}")
+            level = rnd.choice(LEVELS)
+            thread = rnd.choice(threads)
+            service = rnd.choice(SERVICES)
+            roll = rnd.random()
+            if roll < 0.3:
+                family = rnd.choice(FAMILIES)
+                suffix = rnd.choice(["RQ", "RS"])
+                marker = "XML Request:" if suffix == "RQ" else "XML Response:"
+                block = [f"{ts} [{level}] [default task-{rnd.randint(1, 9)}] [{thread}] [{service}] {marker}",
+                         f'<{family}{suffix} xmlns="http://www.opentravel.org/OTA/2003/05" Version="1.0">']
+                block += [f'  <Item id="{j}">value {rnd.randint(0, 10 ** 6)}</Item>' for j in range(rnd.randint(1, 8))]
+                if rnd.random() < 0.1:
+                    block.append(f'  <Errors><Error Code="{rnd.randint(100, 999)}">Supplier failure</Error></Errors>')
+                block.append(f"</{family}{suffix}>")
+            elif roll < 0.35:
+                block = [f"{ts} [ERROR] [default task-1] [{thread}] [{service}] Call failed id={rnd.randint(0, 10 ** 9)}",
+                         "java.lang.RuntimeException: supplier timeout",
+                         "\tat com.datalex.matrix.Client.call(Client.java:120)", ""]
+            else:
+                block = [f"{ts} [{level}] [default task-{rnd.randint(1, 9)}] [{thread}] [{service}] "
+                         f"Message number {entry} value={rnd.randint(0, 1000)}"]
+            text = "\n".join(block) + "\n"
+            f.write(text)
+            written += len(text)
+    return written
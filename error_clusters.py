@@ -0,0 +1,183 @@
+# ✅ Near-linear grouping of similar error lines
+#
+# The AI inspection flags "repeating error lines" (≥85% alike).  Comparing
+# every line with every later one is quadratic: 50k WARN lines are about a
+# billion similarity ratios.  ``cluster_errors`` gets the same groups in two
+# cheap steps:
+#
+#   1. Variable tokens (timestamps, UUIDs, hex ids, numbers) are masked, so
+#      "timeout after 3000 ms id=81723" and "timeout after 5000 ms id=912"
+#      share one template and group by a dict lookup.
+#   2. The distinct templates are clustered around representatives.  A
+#      MinHash signature of each template's words, cut into LSH bands, finds
+#      the representatives that may be alike; only the few sharing most
+#      bands are compared with the real ratio, so every member is
+#      ≥ threshold similar to its group's representative.
+#
+# ``ErrorClusterer`` does the same one line at a time with bounded memory,
+# for logs streamed from disk, and merges the clusterers of consecutive
+# parts of a log into the groups one pass over all of it would have found.
+
+import re, random, zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Try to use the fast python-Levenshtein library if available.  When it
+# isn't installed fall back to difflib's SequenceMatcher so that the
+# module still works out of the box.
+try:  # pragma: no cover - simple import guard
+    import Levenshtein  # type: ignore
+
+    def similarity_at_least(a: str, b: str, threshold: float) -> bool:
+        return Levenshtein.ratio(a, b) >= threshold
+
+except Exception:  # pragma: no cover - fallback implementation
+    from difflib import SequenceMatcher
+
+    def similarity_at_least(a: str, b: str, threshold: float) -> bool:
+        # The quick ratios are upper bounds of ratio() and cost next to nothing
+        matcher = SequenceMatcher(None, a, b)
+        return (matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold
+                and matcher.ratio() >= threshold)
+
+# Variable parts of a line, masked in this order
+MASKS = [
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?'), "<TS>"),
+    (re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b'), "<UUID>"),
+    (re.compile(r'\b(?:0x[0-9a-fA-F]+|(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,})\b'), "<HEX>"),
+    (re.compile(r'\d+(?:\.\d+)?'), "<NUM>"),
+]
+WORD = re.compile(r'\S+')
+
+SIGNATURE_BANDS = 12  # LSH bands; a pair of templates sharing any band may be compared
+SIGNATURE_ROWS = 3  # MinHash values per band (≥95% recall from 60% word overlap)
+MAX_CANDIDATES = 8  # representatives compared per new template, those sharing most bands first
+MAX_GROUPS = 10000  # groups an ErrorClusterer keeps; later lines unlike all of them are only counted
+_PRIME = (1 << 61) - 1
+_rnd = random.Random(20250728)  # fixed, so groups do not change between runs
+_PERMUTATIONS = [(_rnd.randrange(1, _PRIME), _rnd.randrange(_PRIME))
+                 for _ in range(SIGNATURE_BANDS * SIGNATURE_ROWS)]
+
+
+def error_template(line: str) -> str:
+    """``line`` with its variable tokens replaced by placeholders."""
+    for pattern, placeholder in MASKS:
+        line = pattern.sub(placeholder, line)
+    return line
+
+
+def template_bands(template: str) -> List[Tuple[int, ...]]:
+    """LSH bands of the MinHash signature of the set of words of ``template``."""
+    hashes = {zlib.crc32(word.encode("utf-8", "ignore")) for word in WORD.findall(template)} or {0}
+    signature = [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+    return [(band,) + tuple(signature[band * SIGNATURE_ROWS:(band + 1) * SIGNATURE_ROWS])
+            for band in range(SIGNATURE_BANDS)]
+
+
+class ErrorClusterer:
+    """
+    Incremental ``cluster_errors``: ``add`` lines as they are read, then ask
+    for ``groups``.  At most ``max_groups`` groups (and four times as many
+    remembered templates) are kept; a line that matches none of them once
+    that many exist is counted in ``ungrouped`` instead.
+
+    ``source`` (e.g. the log file name) is recorded in the groups this
+    clusterer starts, so groups merged from several files tell where their
+    first line is.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_groups: int = MAX_GROUPS, source: Optional[str] = None):
+        self.threshold = threshold
+        self.max_groups = max_groups
+        self.source = source
+        self.ungrouped = 0
+        self._groups: List[Dict[str, Any]] = []
+        # template -> [group, lines, first line number, first line, source], in first-seen order
+        self._templates: Dict[str, List[Any]] = {}
+        self._unremembered: List[int] = []  # per group, lines whose template was not remembered
+        self._buckets: Dict[Tuple[int, ...], List[int]] = {}
+
+    def add(self, line_number: int, line: str) -> None:
+        self._place(line_number, line, error_template(line), 1, self.source)
+
+    def merge(self, other: "ErrorClusterer", line_offset: int = 0) -> None:
+        """
+        Fold in ``other``, which clustered the lines that followed ours
+        (numbered from 1 again: ``line_offset`` shifts them; lines of
+        another file keep their numbers).  Its templates are replayed in the
+        order they were first seen, so the groups are the ones a single
+        clusterer would have formed over all the lines.
+        """
+        landed: Dict[int, Optional[int]] = {}  # group of other -> our group its first template joined
+        for template, (group, count, line_number, line, source) in other._templates.items():
+            target = self._place(line_number + line_offset, line, template, count, source)
+            landed.setdefault(group, target)
+        for group, count in enumerate(other._unremembered):
+            if not count:
+                continue
+            target = landed.get(group)
+            if target is None:
+                representative = other._groups[group]
+                self._place(representative["line_number"] + line_offset, representative["representative"],
+                            representative["template"], count, representative["source"])
+            else:
+                self._groups[target]["size"] += count
+                self._unremembered[target] += count
+        self.ungrouped += other.ungrouped
+
+    def _place(self, line_number: int, line: str, template: str, count: int,
+               source: Optional[str]) -> Optional[int]:
+        """Add ``count`` lines of ``template``; returns their group (None: only counted as ungrouped)."""
+        groups = self._groups
+        known = self._templates.get(template)
+        if known is not None:
+            known[1] += count
+            groups[known[0]]["size"] += count
+            return known[0]
+        group = None
+        bands = template_bands(template)
+        shared = Counter(candidate for band in bands for candidate in self._buckets.get(band, ()))
+        for candidate, _ in sorted(shared.items(), key=lambda item: (-item[1], item[0]))[:MAX_CANDIDATES]:
+            if similarity_at_least(template, groups[candidate]["template"], self.threshold):
+                group = candidate
+                break
+        if group is None:
+            if len(groups) >= self.max_groups:
+                self.ungrouped += count
+                return None
+            # A new representative: only representatives are indexed, so a
+            # bucket holds groups rather than every line that hashed there
+            group = len(groups)
+            groups.append({"size": 0, "line_number": line_number, "representative": line, "template": template,
+                           "source": source})
+            self._unremembered.append(0)
+            for band in bands:
+                self._buckets.setdefault(band, []).append(group)
+        if len(self._templates) < 4 * self.max_groups:
+            self._templates[template] = [group, count, line_number, line, source]
+        else:
+            self._unremembered[group] += count
+        groups[group]["size"] += count
+        return group
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """The groups so far, largest first (see ``cluster_errors``)."""
+        return sorted(self._groups, key=lambda g: (-g["size"], g["line_number"]))
+
+
+def cluster_errors(error_lines: Sequence[Tuple[int, str]], threshold: float = 0.85) -> List[Dict[str, Any]]:
+    """
+    Group ``(line_number, line)`` pairs whose templates are ``threshold``
+    similar, largest group first.  Each group has its ``size``, the
+    ``representative`` line (the first one seen) with its ``line_number``,
+    and the shared ``template`` of the representative (``source`` is None).
+    """
+    clusterer = ErrorClusterer(threshold, max_groups=len(error_lines) or 1)
+    for line_number, line in error_lines:
+        clusterer.add(line_number, line)
+    return clusterer.groups()
+
+
+def count_repeats(groups: Sequence[Dict[str, Any]]) -> int:
+    """Lines that repeat an earlier line of their group (a group of n lines has n - 1)."""
+    return sum(group["size"] - 1 for group in groups)
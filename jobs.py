@@ -0,0 +1,191 @@
+# ✅ Priority job scheduler for background work (parsing, preloading, ...)
+#
+# Jobs wait in one priority queue and run on a bounded number of worker slots.
+# Part of the slots is reserved for urgent jobs, so a user request never waits
+# behind a preload of forty files.  Submitting a job for a key that is already
+# queued or running returns that job (raising its priority) instead of
+# cancelling and restarting it.
+
+import asyncio, heapq, itertools, logging, time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("fastapi_logger")
+
+HISTORY_SIZE = 200  # finished jobs kept for status queries
+
+
+class JobState(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job:
+    """One unit of work; ``future`` resolves to whatever ``factory()`` returned."""
+
+    __slots__ = ("key", "kind", "priority", "factory", "state", "future", "task",
+                 "submitted", "started", "finished", "error")
+
+    def __init__(self, key: str, kind: str, priority: int, factory: Callable[[], Awaitable[Any]]):
+        self.key = key
+        self.kind = kind
+        self.priority = priority
+        self.factory = factory
+        self.state = JobState.QUEUED
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting when a job fails; mark the exception as retrieved
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.task: Optional[asyncio.Task] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.state in (JobState.QUEUED, JobState.RUNNING)
+
+    async def wait(self) -> Any:
+        """Result of the job.  Cancelling the waiter does not cancel the job."""
+        return await asyncio.shield(self.future)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "key": self.key,
+            "kind": self.kind,
+            "priority": int(self.priority),
+            "state": self.state.value,
+            "queued_for": round((self.started or now) - self.submitted, 2),
+            "running_for": round((self.finished or now) - self.started, 2) if self.started else None,
+            "error": self.error,
+        }
+
+
+class JobScheduler:
+    """
+    Runs submitted coroutine factories, most urgent (lowest ``priority``)
+    first, at most ``workers`` at a time.  Jobs less urgent than
+    ``urgent_priority`` never take the last ``reserved`` slots.
+    """
+
+    def __init__(self, workers: int, reserved: int = 1, urgent_priority: int = 1, name: str = "jobs"):
+        self.workers = max(1, workers)
+        self.reserved = min(max(0, reserved), self.workers - 1) if self.workers > 1 else 0
+        self.urgent_priority = urgent_priority
+        self.name = name
+        self.jobs: Dict[str, Job] = {}  # queued and running
+        self.history: "OrderedDict[str, Job]" = OrderedDict()  # finished, oldest first
+        self.queue: List[tuple] = []  # (priority, seq, job); entries of promoted jobs go stale
+        self.running = 0
+        self.running_background = 0
+        self._seq = itertools.count()
+
+    def submit(self, key: str, factory: Callable[[], Awaitable[Any]], priority: int, kind: str = "job") -> Job:
+        """Queue ``factory()`` under ``key``, or return (and promote) the job already active for it."""
+        job = self.jobs.get(key)
+        if job is not None:
+            if priority < job.priority:
+                self.promote(job, priority)
+            return job
+        job = Job(key, kind, priority, factory)
+        self.jobs[key] = job
+        heapq.heappush(self.queue, (priority, next(self._seq), job))
+        self._dispatch()
+        return job
+
+    def promote(self, job: Job, priority: int) -> None:
+        """Make ``job`` more urgent; a running job keeps running, it is never restarted."""
+        logger.info(f"⏫ Promoting {self.name} job {job.key} ({job.state.value}) to priority {int(priority)}")
+        was_background = job.priority > self.urgent_priority
+        job.priority = priority
+        if job.state is JobState.QUEUED:
+            heapq.heappush(self.queue, (priority, next(self._seq), job))
+        elif job.state is JobState.RUNNING and was_background and priority <= self.urgent_priority:
+            self.running_background -= 1  # its slot now counts as an urgent one
+        self._dispatch()
+
+    def cancel(self, key: str) -> bool:
+        job = self.jobs.get(key)
+        if job is None:
+            return False
+        if job.state is JobState.QUEUED:
+            self._finish(job, JobState.CANCELLED)
+            job.future.cancel()
+        elif job.task is not None:
+            job.task.cancel()
+        return True
+
+    def get(self, key: str) -> Optional[Job]:
+        return self.jobs.get(key) or self.history.get(key)
+
+    def _has_slot(self, priority: int) -> bool:
+        if self.running >= self.workers:
+            return False
+        return priority <= self.urgent_priority or self.running_background < self.workers - self.reserved
+
+    def _dispatch(self) -> None:
+        while self.queue:
+            priority, _, job = self.queue[0]
+            if job.state is not JobState.QUEUED or priority != job.priority:
+                heapq.heappop(self.queue)  # stale entry of a promoted, cancelled or started job
+                continue
+            if not self._has_slot(priority):
+                return
+            heapq.heappop(self.queue)
+            job.state = JobState.RUNNING
+            job.started = time.time()
+            self.running += 1
+            if priority > self.urgent_priority:
+                self.running_background += 1
+            job.task = asyncio.create_task(self._run(job), name=f"{self.name}:{job.key}")
+
+    async def _run(self, job: Job) -> None:
+        try:
+            result = await job.factory()
+        except asyncio.CancelledError:
+            self._finish(job, JobState.CANCELLED)
+            job.future.cancel()
+        except Exception as e:
+            logger.error(f"🔴 {self.name} job {job.key} failed: {e}")
+            job.error = str(e)
+            self._finish(job, JobState.FAILED)
+            job.future.set_exception(e)
+        else:
+            self._finish(job, JobState.DONE)
+            job.future.set_result(result)
+
+    def _finish(self, job: Job, state: JobState) -> None:
+        if job.state is JobState.RUNNING:
+            self.running -= 1
+            if job.priority > self.urgent_priority:
+                self.running_background -= 1
+        job.state = state
+        job.finished = time.time()
+        job.factory = None  # drop references held by the closure
+        if self.jobs.get(job.key) is job:
+            del self.jobs[job.key]
+        self.history.pop(job.key, None)
+        self.history[job.key] = job
+        while len(self.history) > HISTORY_SIZE:
+            self.history.popitem(last=False)
+        self._dispatch()
+
+    async def wait_all(self, jobs: List[Job]) -> List[Any]:
+        """Results of ``jobs``; failed or cancelled jobs give None."""
+        results = await asyncio.gather(*(job.wait() for job in jobs), return_exceptions=True)
+        return [None if isinstance(r, BaseException) else r for r in results]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "reserved_for_urgent": self.reserved,
+            "running": self.running,
+            "queued": sum(1 for job in self.jobs.values() if job.state is JobState.QUEUED),
+            "active": [job.snapshot() for job in sorted(self.jobs.values(), key=lambda j: (j.priority, j.submitted))],
+            "recent": [job.snapshot() for job in reversed(self.history.values())][:20],
+        }
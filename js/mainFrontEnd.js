@@ -186,7 +186,7 @@ async function analyzeLogs() {
         const res = await fetch("/analyze_logs", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ mode: mode, log: selectedLog })
+            body: JSON.stringify({ mode: mode, log: selectedLog, limit: ERROR_PAGE_SIZE })
         });
 
         let result;
@@ -249,36 +249,8 @@ async function analyzeLogs() {
             tr.appendChild(td);
             tableBody.appendChild(tr);
         } else {
-            (result.errors || []).forEach((entry) => {
-                const row = document.createElement("tr");
-
-                const createCell = (text) => {
-                    const cell = document.createElement("td");
-                    cell.textContent = text;
-                    return cell;
-                };
-
-                const lineCell = document.createElement("td");
-                const lineLink = document.createElement("a");
-                lineLink.href = "#";
-                lineLink.textContent = entry.line_number;
-                lineLink.onclick = () => {
-                    openLogContextModal(entry.log_file, entry.line_number);
-                    return false;
-                };
-                lineCell.appendChild(lineLink);
-
-                row.appendChild(createCell(entry.log_file));
-                row.appendChild(lineCell);
-                row.appendChild(createCell(entry.thread_id));
-                row.appendChild(createCell(entry.service));
-
-                const errorMsgCell = document.createElement("td");
-                errorMsgCell.innerHTML = highlightLogLevel(entry.error_message);
-                row.appendChild(errorMsgCell);
-
-                tableBody.appendChild(row);
-            });
+            appendErrorRows(tableBody, result.errors);
+            setLoadMoreErrors(tableBody, { mode: mode, log: selectedLog }, result.next_cursor);
         }
 
         // After error summary is updated, populate RQRS (only for specific mode)
@@ -286,8 +258,9 @@ async function analyzeLogs() {
             aiSummary();
             rqrsPromise = fetchRQRS(selectedLog);
         } else {
+            // ✅ The AI summary covers every log at once; RQ/RS stays per log
             const rqrsTableBody = document.querySelector("#rqrsTable tbody");
-            output.innerHTML = "⚠️ Only specific log file is supported.";
+            aiSummary({ logs: ["*"] });
             rqrsTableBody.innerHTML = "";
         }
 
@@ -313,6 +286,80 @@ async function analyzeLogs() {
     }
 }
 
+// Rows of /analyze_logs are fetched ERROR_PAGE_SIZE at a time; "Load more" asks for the next page
+const ERROR_PAGE_SIZE = 2000;
+
+function appendErrorRows(tableBody, errors) {
+    (errors || []).forEach((entry) => {
+        const row = document.createElement("tr");
+
+        const createCell = (text) => {
+            const cell = document.createElement("td");
+            cell.textContent = text;
+            return cell;
+        };
+
+        const lineCell = document.createElement("td");
+        const lineLink = document.createElement("a");
+        lineLink.href = "#";
+        lineLink.textContent = entry.line_number;
+        lineLink.onclick = () => {
+            openLogContextModal(entry.log_file, entry.line_number);
+            return false;
+        };
+        lineCell.appendChild(lineLink);
+
+        row.appendChild(createCell(entry.log_file));
+        row.appendChild(lineCell);
+        row.appendChild(createCell(entry.thread_id));
+        row.appendChild(createCell(entry.service));
+
+        const errorMsgCell = document.createElement("td");
+        errorMsgCell.innerHTML = highlightLogLevel(entry.error_message);
+        row.appendChild(errorMsgCell);
+
+        tableBody.appendChild(row);
+    });
+}
+
+function setLoadMoreErrors(tableBody, request, cursor) {
+    const existing = document.getElementById("loadMoreErrorsRow");
+    if (existing) existing.remove();
+    if (!cursor) return;
+
+    const tr = document.createElement("tr");
+    tr.id = "loadMoreErrorsRow";
+    const td = document.createElement("td");
+    td.colSpan = 5;
+    td.style.textAlign = "center";
+    const button = document.createElement("button");
+    button.textContent = "Load more";
+    button.onclick = async () => {
+        button.disabled = true;
+        button.textContent = "Loading...";
+        try {
+            const res = await fetch("/analyze_logs", {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ ...request, limit: ERROR_PAGE_SIZE, cursor: cursor })
+            });
+            const page = await res.json();
+            if (!res.ok || page.error) throw new Error(page.error || res.statusText);
+            tr.remove();
+            appendErrorRows(tableBody, page.errors);
+            setLoadMoreErrors(tableBody, request, page.next_cursor);
+            applyFilters();
+        } catch (err) {
+            console.error("Error loading more errors:", err);
+            button.disabled = false;
+            button.textContent = "Load more";
+        }
+    };
+    td.appendChild(button);
+    tr.appendChild(td);
+    tableBody.appendChild(tr);
+}
+
 // =============================================
 // 5. FILTER FUNCTIONS
 // =============================================
@@ -320,7 +367,7 @@ async function analyzeLogs() {
 function applyFilters() {
     const threadVal = document.getElementById('threadFilter').value.toLowerCase();
     const serviceVal = document.getElementById('serviceFilter').value.toLowerCase();
-    document.querySelectorAll('#errorDetailsTable tbody tr').forEach(row => {
+    document.querySelectorAll('#errorDetailsTable tbody tr:not(#loadMoreErrorsRow)').forEach(row => {
         const thread = row.children[2].textContent.toLowerCase();
         const service = row.children[3].textContent.toLowerCase();
         row.style.display = (thread.includes(threadVal) && service.includes(serviceVal)) ? '' : 'none';
@@ -373,92 +420,65 @@ function applyRqrsFilters() {
 async function fetchRQRS(log) {
     const rqrsTableBody = document.querySelector("#rqrsTable tbody");
     rqrsTableBody.innerHTML = "<tr><td colspan='4' style='text-align: center;'>⏳ Loading RQ/RS data...</td></tr>";
+    window.rqrsCache = [];
 
     try {
-        // 1. Make the API request
-        const response = await fetch(`/get_rqrs?log=${encodeURIComponent(log)}`);
+        // 1. Request the entries as NDJSON: rows arrive while the log is still being parsed
+        const response = await fetch(`/get_rqrs_stream?log=${encodeURIComponent(log)}`);
         
         // 2. Check if request failed
         if (!response.ok) {
             const errorData = await response.json().catch(() => null);
-            throw new Error(errorData?.error || `Server returned ${response.status} ${response.statusText}`);
+            throw new Error(errorData?.detail || errorData?.error || `Server returned ${response.status} ${response.statusText}`);
         }
         
-        // 3. Parse JSON data
-        const data = await response.json();
-        
-        // 4. Handle both response formats
-        const rqrsData = Array.isArray(data.rqrs) ? data.rqrs : 
-                        Array.isArray(data.entries) ? data.entries : 
-                        [];
+        // 3. Read the stream line by line and render each chunk as it comes in
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let summary = null;
         
-        // 5. Store data in cache for later use
-        window.rqrsCache = rqrsData;
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split("\n");
+            buffer = lines.pop();
+            
+            const batch = [];
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const item = JSON.parse(line);
+                if (item.error) throw new Error(item.error);
+                if (item.done) {
+                    summary = item;
+                } else {
+                    batch.push(item);
+                }
+            }
+            if (batch.length > 0) {
+                if (window.rqrsCache.length === 0) rqrsTableBody.innerHTML = "";
+                appendRqrsRows(log, batch);
+            }
+        }
         
-        // 6. Clear existing rows
-        rqrsTableBody.innerHTML = "";
+        if (!summary) {
+            throw new Error("Connection closed before all RQ/RS entries were received");
+        }
         
-        // 7. Handle empty results
-        if (rqrsData.length === 0) {
-            const emptyRow = document.createElement("tr");
-            emptyRow.innerHTML = `
-                <td colspan="4" style="text-align: center; color: #666;">
-                    No RQ/RS entries found in this log file
-                </td>
+        // 4. Handle empty results
+        if (window.rqrsCache.length === 0) {
+            rqrsTableBody.innerHTML = `
+                <tr>
+                    <td colspan="4" style="text-align: center; color: #666;">
+                        No RQ/RS entries found in this log file
+                    </td>
+                </tr>
             `;
-            rqrsTableBody.appendChild(emptyRow);
             return;
         }
         
-        // 8. Create table rows for each entry
-        rqrsData.forEach((entry, index) => {
-            const row = document.createElement("tr");
-            
-            // Normalize entry data (handle both formats)
-            const normalizedEntry = {
-                line: entry.line || entry.line_number || "??",
-                thread: entry.thread || entry.thread_id || "UNKNOWN",
-                service: entry.service || "UNKNOWN",
-                tag: entry.tag || "???",
-                has_issue: entry.has_issue || false
-            };
-
-            // Line Number column
-            const lineCell = document.createElement("td");
-            lineCell.textContent = normalizedEntry.line;
-            lineCell.style.textAlign = "center";
-            
-            // Thread ID column
-            const threadCell = document.createElement("td");
-            threadCell.textContent = normalizedEntry.thread;
-            
-            // Service column
-            const serviceCell = document.createElement("td");
-            serviceCell.textContent = normalizedEntry.service;
-            
-            // XML Tag column (with clickable link)
-            const tagCell = document.createElement("td");
-            const tagLink = document.createElement("a");
-            tagLink.href = "#";
-            tagLink.textContent = normalizedEntry.tag + (normalizedEntry.has_issue ? " ⚠️" : "");
-            tagLink.style.color = normalizedEntry.has_issue ? "#d32f2f" : "#1976d2";
-            tagLink.onclick = (e) => {
-                e.preventDefault();
-                fetchAndDisplayXMLForModal(log, index, normalizedEntry.tag);
-            };
-            tagCell.appendChild(tagLink);
-            
-            // Add all cells to the row
-            row.appendChild(lineCell);
-            row.appendChild(threadCell);
-            row.appendChild(serviceCell);
-            row.appendChild(tagCell);
-            
-            // Add row to table
-            rqrsTableBody.appendChild(row);
-        });
-        
-        // 9. Enable filter controls if we have data
+        // 5. Enable filter controls if we have data
         const filterControls = document.querySelectorAll(
             "#rqrsFilterControls input, #rqrsClearFiltersBtn"
         );
@@ -489,6 +509,67 @@ async function fetchRQRS(log) {
     }
 }
 
+// Appends one batch of streamed entries to the RQ/RS table (and to window.rqrsCache)
+function appendRqrsRows(log, entries) {
+    const rqrsTableBody = document.querySelector("#rqrsTable tbody");
+    const fragment = document.createDocumentFragment();
+    
+    entries.forEach(entry => {
+        const index = window.rqrsCache.length;
+        window.rqrsCache.push(entry);
+        const row = document.createElement("tr");
+        
+        // Normalize entry data (handle both formats)
+        const normalizedEntry = {
+            line: entry.line || entry.line_number || "??",
+            thread: entry.thread || entry.thread_id || "UNKNOWN",
+            service: entry.service || "UNKNOWN",
+            tag: entry.tag || "???",
+            has_issue: entry.has_issue || false,
+            issue_codes: entry.issue_codes || []
+        };
+
+        // Line Number column
+        const lineCell = document.createElement("td");
+        lineCell.textContent = normalizedEntry.line;
+        lineCell.style.textAlign = "center";
+        
+        // Thread ID column
+        const threadCell = document.createElement("td");
+        threadCell.textContent = normalizedEntry.thread;
+        
+        // Service column
+        const serviceCell = document.createElement("td");
+        serviceCell.textContent = normalizedEntry.service;
+        
+        // XML Tag column (with clickable link)
+        const tagCell = document.createElement("td");
+        const tagLink = document.createElement("a");
+        tagLink.href = "#";
+        tagLink.textContent = normalizedEntry.tag + (normalizedEntry.has_issue ? " ⚠️" : "");
+        tagLink.style.color = normalizedEntry.has_issue ? "#d32f2f" : "#1976d2";
+        if (normalizedEntry.issue_codes.length) {
+            tagLink.title = `Codes: ${normalizedEntry.issue_codes.join(", ")}`;
+        }
+        tagLink.onclick = (e) => {
+            e.preventDefault();
+            fetchAndDisplayXMLForModal(log, index, normalizedEntry.tag);
+        };
+        tagCell.appendChild(tagLink);
+        
+        // Add all cells to the row
+        row.appendChild(lineCell);
+        row.appendChild(threadCell);
+        row.appendChild(serviceCell);
+        row.appendChild(tagCell);
+        
+        fragment.appendChild(row);
+    });
+    
+    // One DOM insertion per batch instead of one per row
+    rqrsTableBody.appendChild(fragment);
+}
+
 // Helper function to extract service name from thread ID
 function extractServiceFromThread(thread) {
     if (!thread) return "UNKNOWN";
@@ -584,7 +665,10 @@ async function fetchAndDisplayXMLForModal(log, index, tag) {
             displayXmlContent(tag, data.raw_xml, "Raw XML (Parser Error)");
             showToast("⚠️ Showing raw XML due to parser error");
         } else if (data.pretty_xml) {
-            displayXmlContent(tag, data.pretty_xml, "Formatted XML");
+            displayXmlContent(tag, data.pretty_xml, data.truncated ? "Formatted XML (truncated)" : "Formatted XML");
+            if (data.warning) {
+                showToast(`⚠️ ${data.warning}`);
+            }
         } else {
             throw new Error("No XML content in response");
         }
@@ -700,6 +784,8 @@ function openLogContextModal(logFile, lineNumber) {
     const content = document.getElementById("logContextText");
 
     content.textContent = "⏳ Loading log context...";
+    modal.dataset.log = logFile;
+    modal.dataset.line = lineNumber;
 
     fetch(`/log_context?log=${encodeURIComponent(logFile)}&line=${lineNumber}`)
         .then(res => {
@@ -718,6 +804,27 @@ function openLogContextModal(logFile, lineNumber) {
         });
 }
 
+// Jump to the closest FATAL/ERROR line before or after the one shown (a level index lookup)
+async function jumpToLevelLine(direction) {
+    const modal = document.getElementById("logContextModal");
+    const logFile = modal.dataset.log;
+    if (!logFile) return;
+
+    try {
+        const res = await fetch(`/next_level_line?log=${encodeURIComponent(logFile)}&line=${modal.dataset.line}&direction=${direction}`);
+        if (!res.ok) throw new Error("Level lookup failed");
+        const data = await res.json();
+        if (data.line_number === null) {
+            showToast(direction === "next" ? "No later ERROR in this log." : "No earlier ERROR in this log.");
+            return;
+        }
+        openLogContextModal(logFile, data.line_number);
+    } catch (err) {
+        console.error("❌ Failed to find the next ERROR line:", err);
+        alert("⚠️ Unable to find the next ERROR line.");
+    }
+}
+
 function closeLogContextModal() {
     const modal = document.getElementById("logContextModal");
     const content = document.getElementById("logContextText");
@@ -1088,7 +1195,7 @@ document.addEventListener("DOMContentLoaded", () => {
         th.addEventListener("click", () => {
             const table = th.closest("table");
             const tbody = table.querySelector("tbody");
-            const rows = Array.from(tbody.querySelectorAll("tr"));
+            const rows = Array.from(tbody.querySelectorAll("tr:not(#loadMoreErrorsRow)"));
 
             table.querySelectorAll("th.sortable").forEach(header => {
                 if (header !== th) header.classList.remove("asc", "desc");
@@ -1122,8 +1229,10 @@ document.addEventListener("DOMContentLoaded", () => {
                     });
             });
 
+            const loadMoreRow = tbody.querySelector("#loadMoreErrorsRow");
             tbody.innerHTML = "";
             rows.forEach(row => tbody.appendChild(row));
+            if (loadMoreRow) tbody.appendChild(loadMoreRow);
 
             th.classList.toggle("asc", ascending);
             th.classList.toggle("desc", !ascending);
@@ -1274,21 +1383,54 @@ async function clearCache() {
 // =============================================
 // ✅ AI Assistant
 
-    async function aiSummary() {
+    let aiJobSource = null;
+
+    async function aiSummary(selection) {
         const log = logSelect.value;
         const output = document.getElementById("ai-output"); 
-        if (!log) return alert("Please select a log file.");
+        if (!selection && !log) return alert("Please select a log file.");
 
         output.innerHTML = "🧠 Analyzing log file... Please wait.";
+        if (aiJobSource) aiJobSource.close();
 
         try {
-          const res = await fetch("/ai/inspect_log", {
+          // ✅ The analysis runs as a background job; its progress and result come over SSE
+          const res = await fetch("/ai/inspect_jobs", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ log })
+            body: JSON.stringify(selection || { log })
           });
-          const data = await res.json();
+          const job = await res.json();
+          if (!res.ok) throw new Error(job.detail || res.statusText);
+
+          aiJobSource = new EventSource(`/ai/inspect_jobs/${job.job_id}/stream`);
+          aiJobSource.onmessage = (event) => {
+            const status = JSON.parse(event.data);
+            if (status.state === "queued" || status.state === "running") {
+              output.innerHTML = `🧠 Analyzing log file... ${status.progress.percent}%
+                (${status.progress.lines_done.toLocaleString()} lines, ETA ${status.progress.eta}s)
+                <button id="ai-cancel-btn">✖ Cancel</button>`;
+              document.getElementById("ai-cancel-btn").onclick = () =>
+                fetch(`/ai/inspect_jobs/${job.job_id}`, { method: "DELETE" });
+              return;
+            }
+            aiJobSource.close();
+            aiJobSource = null;
+            if (status.state === "done") renderAiSummary(output, status.result);
+            else if (status.state === "cancelled") output.innerHTML = "⏹️ Analysis cancelled.";
+            else output.innerHTML = `❌ Failed to analyze log: ${status.error || status.state}`;
+          };
+          aiJobSource.onerror = () => {
+            aiJobSource.close();
+            aiJobSource = null;
+            output.innerHTML = "❌ Lost connection to the analysis job.";
+          };
+        } catch (e) {
+          output.innerHTML = `❌ Failed to analyze log: ${e.message}`;
+        }
+    }
 
+    function renderAiSummary(output, data) {
         output.innerHTML = `
           <h3>🤖 Highlevel Summary</h3>
           <pre>${data.summary}</pre>
@@ -1304,10 +1446,15 @@ async function clearCache() {
               ${data.failing_services.map(s => `<li>❌ ${s}</li>`).join('')}
             </ul>
           ` : ''}
+          ${data.error_groups && data.error_groups.length ? `
+            <h3>🔁 Repeating Errors</h3>
+            <ul>${data.error_groups.map(g => `<li>${g.size}× (first at ${g.log ? `${escapeHTML(g.log)} ` : ''}line ${g.line_number}): <code>${escapeHTML(g.representative)}</code></li>`).join('')}</ul>
+          ` : ''}
+          ${data.logs && data.logs.length ? `
+            <h3>📚 Logs Analyzed</h3>
+            <ul>${data.logs.map(l => `<li>${escapeHTML(l.log)} — ${l.lines.toLocaleString()} lines, ${l.errors.toLocaleString()} errors/warnings</li>`).join('')}</ul>
+          ` : ''}
           <h3>🧠 Recommendations</h3>
           <ul>${data.recommendations.map(r => `<li>${r}</li>`).join('')}</ul>
         `;
-        } catch (e) {
-          output.innerHTML = `❌ Failed to analyze log: ${e.message}`;
-        }
     }
\ No newline at end of file
@@ -0,0 +1,618 @@
+# ✅ Persistent line-offset, severity-level and timestamp indexes for random access into large log files
+
+import heapq, itertools, os, struct, threading, logging
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from log_scanner import (
+    NEXT_ENTRY_BYTES, TIMESTAMP_PREFIX_BYTES, MmapScanner, ScanSubscriber, checkpoint_state, error_row,
+    make_checkpoint, run_scan, timestamp_ms
+)
+
+logger = logging.getLogger("fastapi_logger")
+
+DEFAULT_INDEX_DIR = os.path.join("./applog", "index")
+
+# (inode, size, mtime_ns) — identifies one concrete version of a file
+FileFingerprint = Tuple[int, int, int]
+
+# Sidecar layout: magic, inode, size, mtime_ns, line count, array typecode
+_LINE_INDEX_MAGIC = b"LSTLIDX1"
+_LINE_INDEX_HEADER = struct.Struct("<8sQQQQc")
+
+LEVELS = ("FATAL", "ERROR", "WARN")
+
+# Sidecar layout: magic, inode, size, mtime_ns, checkpoint offset/line/anchor,
+# entry count per level, array typecode; then the line numbers of each level
+# followed by their byte offsets
+_LEVEL_INDEX_MAGIC = b"LSTLVL01"
+_LEVEL_INDEX_HEADER = struct.Struct("<8sQQQQQIQQQc")
+
+# Sidecar layout: magic, inode, size, mtime_ns, checkpoint offset/line/anchor,
+# entries per block, block count; then the start offsets of the blocks, the
+# lines before each, and their smallest and largest timestamps
+_TIME_INDEX_MAGIC = b"LSTTIM01"
+_TIME_INDEX_HEADER = struct.Struct("<8sQQQQQIQQ")
+DEFAULT_TIME_BLOCK_ENTRIES = 1000
+
+
+def file_fingerprint(path: str) -> FileFingerprint:
+    """Return the (inode, size, mtime_ns) fingerprint of a file."""
+    st = os.stat(path)
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def sidecar_path(path: str, index_dir: str, suffix: str) -> str:
+    """Location of the sidecar file with the given suffix for a log file."""
+    return os.path.join(index_dir, os.path.basename(path) + suffix)
+
+
+def offsets_typecode(size: int) -> str:
+    """Smallest unsigned array typecode able to hold offsets into ``size`` bytes."""
+    return "I" if size < 2 ** 32 else "Q"
+
+
+def _write_atomic(target: str, header: bytes, payload: array) -> None:
+    """Write a sidecar through a temp file so readers never see a partial index."""
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        payload.tofile(f)
+    os.replace(tmp, target)
+
+
+class LineIndex:
+    """
+    Maps 1-based line numbers to byte offsets of a single log file.
+
+    ``offsets[n - 1]`` is the byte offset where line ``n`` starts.  Lines are
+    split on ``\\n`` and decoded with ``errors='ignore'`` like the rest of the
+    app, so callers can seek straight to a line instead of re-reading the file
+    from byte 0.
+    """
+
+    __slots__ = ("path", "fingerprint", "offsets")
+
+    def __init__(self, path: str, fingerprint: FileFingerprint, offsets: array):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.offsets = offsets
+
+    @property
+    def size(self) -> int:
+        return self.fingerprint[1]
+
+    @property
+    def line_count(self) -> int:
+        return len(self.offsets)
+
+    def offset_of(self, line_number: int) -> int:
+        """Byte offset where ``line_number`` (1-based) starts."""
+        if line_number < 1 or line_number > len(self.offsets):
+            raise IndexError(f"Line number {line_number} out of range")
+        return self.offsets[line_number - 1]
+
+    def end_of(self, line_number: int) -> int:
+        """Byte offset just past ``line_number`` (including its newline)."""
+        if line_number < len(self.offsets):
+            return self.offsets[line_number]
+        return self.size
+
+    def read_lines(self, start_line: int, end_line: int) -> List[str]:
+        """Read lines ``start_line``..``end_line`` (inclusive, clamped) in one read."""
+        start_line = max(1, start_line)
+        end_line = min(end_line, len(self.offsets))
+        if start_line > end_line:
+            return []
+        start = self.offsets[start_line - 1]
+        end = self.end_of(end_line)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return [line.rstrip(b"\r").decode("utf-8", errors="ignore")
+                for line in data.split(b"\n")[:end_line - start_line + 1]]
+
+    def read_line(self, line_number: int) -> str:
+        lines = self.read_lines(line_number, line_number)
+        if not lines:
+            raise IndexError(f"Line number {line_number} out of range")
+        return lines[0]
+
+    def iter_lines(self, start_line: int) -> Iterator[Tuple[int, str]]:
+        """Yield ``(line_number, text)`` from ``start_line`` forward to the indexed end."""
+        if start_line < 1 or start_line > len(self.offsets):
+            return
+        remaining = self.size - self.offsets[start_line - 1]
+        line_number = start_line
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[start_line - 1])
+            for raw in f:
+                if remaining <= 0:
+                    break
+                remaining -= len(raw)
+                yield line_number, raw.rstrip(b"\r\n").decode("utf-8", errors="ignore")
+                line_number += 1
+
+    def iter_lines_backward(self, start_line: int, block: int = 256) -> Iterator[Tuple[int, str]]:
+        """Yield ``(line_number, text)`` from ``start_line`` back to line 1, reading in blocks."""
+        end_line = min(start_line, len(self.offsets))
+        while end_line >= 1:
+            first = max(1, end_line - block + 1)
+            lines = self.read_lines(first, end_line)
+            for i in range(len(lines) - 1, -1, -1):
+                yield first + i, lines[i]
+            end_line = first - 1
+
+    # -- Persistence ---------------------------------------------------------
+
+    def save(self, target: str) -> None:
+        ino, size, mtime_ns = self.fingerprint
+        header = _LINE_INDEX_HEADER.pack(
+            _LINE_INDEX_MAGIC, ino, size, mtime_ns, len(self.offsets),
+            self.offsets.typecode.encode("ascii"),
+        )
+        _write_atomic(target, header, self.offsets)
+
+    @classmethod
+    def load(cls, path: str, source: str, fingerprint: FileFingerprint) -> Optional["LineIndex"]:
+        """Load a sidecar, returning ``None`` when missing, corrupt or stale."""
+        try:
+            with open(source, "rb") as f:
+                header = f.read(_LINE_INDEX_HEADER.size)
+                if len(header) != _LINE_INDEX_HEADER.size:
+                    return None
+                magic, ino, size, mtime_ns, count, typecode = _LINE_INDEX_HEADER.unpack(header)
+                if magic != _LINE_INDEX_MAGIC or (ino, size, mtime_ns) != fingerprint:
+                    return None
+                offsets = array(typecode.decode("ascii"))
+                offsets.fromfile(f, count)
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+        return cls(path, fingerprint, offsets)
+
+    @classmethod
+    def build(cls, path: str) -> "LineIndex":
+        """Scan ``path`` once and record the start offset of every line."""
+        fingerprint = file_fingerprint(path)
+        size = fingerprint[1]
+        offsets = array(offsets_typecode(size))
+        if size:
+            offsets.append(0)
+            pos = 0
+            with open(path, "rb") as f:
+                for raw in f:
+                    pos += len(raw)
+                    if pos >= size:
+                        break
+                    offsets.append(pos)
+        return cls(path, fingerprint, offsets)
+
+
+_line_indexes: Dict[str, LineIndex] = {}
+_line_indexes_lock = threading.Lock()
+
+
+def get_line_index(path: str, index_dir: str = DEFAULT_INDEX_DIR) -> LineIndex:
+    """
+    Return an up-to-date ``LineIndex`` for ``path``.
+
+    The index is reused from memory, then from its on-disk sidecar, and only
+    rebuilt when the file's (inode, size, mtime) fingerprint no longer matches.
+    """
+    key = os.path.abspath(path)
+    fingerprint = file_fingerprint(path)
+
+    with _line_indexes_lock:
+        index = _line_indexes.get(key)
+    if index is not None and index.fingerprint == fingerprint:
+        return index
+
+    target = sidecar_path(path, index_dir, ".lidx")
+    index = LineIndex.load(path, target, fingerprint)
+    if index is None:
+        index = LineIndex.build(path)
+        try:
+            index.save(target)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist line index for {path}: {e}")
+        logger.info(f"🗂️ Built line index for {os.path.basename(path)} ({index.line_count:,} lines)")
+
+    with _line_indexes_lock:
+        _line_indexes[key] = index
+    return index
+
+
+def invalidate_line_index(path: str, index_dir: str = DEFAULT_INDEX_DIR) -> None:
+    """Drop the in-memory and on-disk index of ``path``."""
+    with _line_indexes_lock:
+        _line_indexes.pop(os.path.abspath(path), None)
+    try:
+        os.remove(sidecar_path(path, index_dir, ".lidx"))
+    except OSError:
+        pass
+
+
+class _LevelCollector(ScanSubscriber):
+    wants_records = True
+    level_records_only = True
+
+    def __init__(self, lines: Dict[str, array], offsets: Dict[str, array]):
+        self.lines = lines
+        self.offsets = offsets
+
+    def on_record(self, record) -> None:
+        level = record.level
+        if level is not None:
+            self.lines[level].append(record.line_number)
+            self.offsets[level].append(record.offset)
+
+
+def _retyped(values: array, typecode: str) -> array:
+    return values if values.typecode == typecode else array(typecode, values.tolist())
+
+
+class LevelIndex:
+    """
+    Line numbers and byte offsets of the ``[FATAL]``/``[ERROR]``/``[WARN]``
+    lines of a single log file, sorted per level.
+
+    A line is filed under its most severe marker, like the error scan counts
+    it, so ``counts`` equals the error scan's counts without reading the file.
+    ``checkpoint`` (see ``log_scanner.make_checkpoint``) lets a grown file be
+    brought up to date by scanning only the appended bytes.
+    """
+
+    __slots__ = ("path", "checkpoint", "lines", "offsets")
+
+    def __init__(self, path: str, checkpoint: Dict[str, int], lines: Dict[str, array], offsets: Dict[str, array]):
+        self.path = path
+        self.checkpoint = checkpoint
+        self.lines = lines
+        self.offsets = offsets
+
+    @property
+    def fingerprint(self) -> FileFingerprint:
+        return (self.checkpoint["inode"], self.checkpoint["size"], self.checkpoint["mtime_ns"])
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {level: len(self.lines[level]) for level in LEVELS}
+
+    def next_line(self, line_number: int, levels: Sequence[str] = LEVELS, backward: bool = False) -> Optional[int]:
+        """The closest line after (or before) ``line_number`` carrying one of ``levels``."""
+        found = []
+        for level in levels:
+            lines = self.lines[level]
+            if backward:
+                i = bisect_left(lines, line_number)
+                if i:
+                    found.append(lines[i - 1])
+            else:
+                i = bisect_right(lines, line_number)
+                if i < len(lines):
+                    found.append(lines[i])
+        if not found:
+            return None
+        return max(found) if backward else min(found)
+
+    def entries(self, levels: Sequence[str] = LEVELS, after_line: int = 0) -> Iterator[Tuple[int, int]]:
+        """``(line_number, offset)`` of the lines carrying one of ``levels`` past ``after_line``, in line order."""
+        streams = []
+        for level in levels:
+            lines = self.lines[level]
+            start = bisect_right(lines, after_line)
+            streams.append(zip(itertools.islice(lines, start, None), itertools.islice(self.offsets[level], start, None)))
+        return heapq.merge(*streams)
+
+    def between(self, start: int, end: int) -> "LevelIndex":
+        """The entries whose line starts within bytes ``start``..``end`` (e.g. a time window)."""
+        lines, offsets = {}, {}
+        for level in LEVELS:
+            lo, hi = bisect_left(self.offsets[level], start), bisect_left(self.offsets[level], end)
+            lines[level], offsets[level] = self.lines[level][lo:hi], self.offsets[level][lo:hi]
+        return LevelIndex(self.path, self.checkpoint, lines, offsets)
+
+    def read_rows(self, log_file: str, entries: Iterable[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Error table rows of the given indexed lines, read with one seek each."""
+        rows = []
+        with open(self.path, "rb") as f:
+            for line_number, offset in entries:
+                f.seek(offset)
+                text = f.readline().decode("utf-8", errors="ignore").rstrip("\r\n")
+                rows.append(error_row(log_file, line_number, text))
+        return rows
+
+    # -- Persistence ---------------------------------------------------------
+
+    def save(self, target: str) -> None:
+        typecode = offsets_typecode(self.checkpoint["size"])
+        payload = array(typecode)
+        for level in LEVELS:
+            payload.extend(_retyped(self.lines[level], typecode))
+        for level in LEVELS:
+            payload.extend(_retyped(self.offsets[level], typecode))
+        cp = self.checkpoint
+        header = _LEVEL_INDEX_HEADER.pack(
+            _LEVEL_INDEX_MAGIC, cp["inode"], cp["size"], cp["mtime_ns"], cp["offset"], cp["line"], cp["anchor"],
+            *(len(self.lines[level]) for level in LEVELS), typecode.encode("ascii"),
+        )
+        _write_atomic(target, header, payload)
+
+    @classmethod
+    def load(cls, path: str, source: str) -> Optional["LevelIndex"]:
+        """Load a sidecar whatever file version it describes; ``None`` when missing or corrupt."""
+        try:
+            with open(source, "rb") as f:
+                header = f.read(_LEVEL_INDEX_HEADER.size)
+                if len(header) != _LEVEL_INDEX_HEADER.size:
+                    return None
+                magic, ino, size, mtime_ns, offset, line, anchor, *counts, typecode = _LEVEL_INDEX_HEADER.unpack(header)
+                if magic != _LEVEL_INDEX_MAGIC:
+                    return None
+                lines, offsets = {}, {}
+                for target in (lines, offsets):
+                    for level, count in zip(LEVELS, counts):
+                        target[level] = array(typecode.decode("ascii"))
+                        target[level].fromfile(f, count)
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+        checkpoint = {"inode": ino, "size": size, "mtime_ns": mtime_ns, "offset": offset, "line": line,
+                      "anchor": anchor}
+        return cls(path, checkpoint, lines, offsets)
+
+    @classmethod
+    def build(cls, path: str, mode: str = "mmap", previous: Optional["LevelIndex"] = None) -> "LevelIndex":
+        """
+        Scan ``path`` for severity markers.  When ``previous`` indexes an
+        earlier version of the file that only grew since, its entries are kept
+        and only the bytes after its checkpoint are scanned.
+        """
+        fingerprint = file_fingerprint(path)
+        typecode = offsets_typecode(fingerprint[1])
+        lines = {level: array(typecode) for level in LEVELS}
+        offsets = {level: array(typecode) for level in LEVELS}
+        start, first_line = 0, 1
+        if previous is not None and checkpoint_state(path, previous.checkpoint, fingerprint) == "appended":
+            start, first_line = previous.checkpoint["offset"], previous.checkpoint["line"] + 1
+            for level in LEVELS:
+                keep = bisect_left(previous.lines[level], first_line)
+                lines[level] = _retyped(previous.lines[level][:keep], typecode)
+                offsets[level] = _retyped(previous.offsets[level][:keep], typecode)
+        scanner = run_scan(path, [_LevelCollector(lines, offsets)], start, fingerprint[1], first_line, mode)
+        checkpoint = make_checkpoint(path, fingerprint, scanner.resume_offset, scanner.resume_line)
+        return cls(path, checkpoint, lines, offsets)
+
+
+class TimeIndex:
+    """
+    Sparse timestamp index of a single log file.
+
+    The entries (timestamp lines) are grouped in blocks of ``every``; for each
+    block the index keeps its start offset, the number of lines before it and
+    the smallest and largest timestamp (epoch ms) in it.  ``window`` finds a
+    time range by binary search over the running maximum and the trailing
+    minimum of those, so entries written slightly out of order cannot hide,
+    and reads at most the two blocks at the edges of the range.
+    """
+
+    __slots__ = ("path", "checkpoint", "every", "offsets", "lines", "mins", "maxs", "_bounds")
+
+    def __init__(self, path: str, checkpoint: Dict[str, int], every: int,
+                 offsets: array, lines: array, mins: array, maxs: array):
+        self.path = path
+        self.checkpoint = checkpoint
+        self.every = every
+        self.offsets = offsets
+        self.lines = lines
+        self.mins = mins
+        self.maxs = maxs
+        self._bounds: Optional[Tuple[array, array]] = None
+
+    @property
+    def fingerprint(self) -> FileFingerprint:
+        return (self.checkpoint["inode"], self.checkpoint["size"], self.checkpoint["mtime_ns"])
+
+    def _block_entries(self, block: int) -> Tuple[bytes, List[int]]:
+        """Bytes of a block and the positions of its entries within them."""
+        start = self.offsets[block]
+        end = self.offsets[block + 1] if block + 1 < len(self.offsets) else self.checkpoint["size"]
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return data, [0] + [match.start() + 1 for match in NEXT_ENTRY_BYTES.finditer(data)]
+
+    def window(self, from_ms: Optional[int], to_ms: Optional[int]) -> Optional[Tuple[int, int, int]]:
+        """
+        ``(start, lines before start, end)``: the bytes from the first entry
+        stamped at or after ``from_ms`` up to the last entry stamped before
+        ``to_ms`` (None leaves that side open); None when no entry qualifies.
+        """
+        if not self.offsets:
+            return None
+        if self._bounds is None:
+            running_max = array("q", itertools.accumulate(self.maxs, max))
+            trailing_min = array("q", reversed(list(itertools.accumulate(reversed(self.mins), min))))
+            self._bounds = (running_max, trailing_min)
+        running_max, trailing_min = self._bounds
+
+        start, start_line = 0, 0
+        if from_ms is not None:
+            # Every entry before this block is older than from_ms; the block itself holds a newer one
+            block = bisect_left(running_max, from_ms)
+            if block == len(self.offsets):
+                return None
+            data, entries = self._block_entries(block)
+            for pos in entries:
+                if timestamp_ms(data[pos:pos + 23].decode("ascii", "ignore")) >= from_ms:
+                    start, start_line = self.offsets[block] + pos, self.lines[block] + data.count(b"\n", 0, pos)
+                    break
+
+        end = self.checkpoint["size"]
+        if to_ms is not None:
+            # Every entry from this block on is at least to_ms; the one before holds an older one
+            block = bisect_left(trailing_min, to_ms) - 1
+            if block < 0:
+                return None
+            data, entries = self._block_entries(block)
+            end = self.offsets[block] + len(data)
+            for i, pos in enumerate(entries):
+                if timestamp_ms(data[pos:pos + 23].decode("ascii", "ignore")) < to_ms:
+                    end = self.offsets[block] + (entries[i + 1] if i + 1 < len(entries) else len(data))
+
+        return (start, start_line, end) if start < end else None
+
+    # -- Persistence ---------------------------------------------------------
+
+    def save(self, target: str) -> None:
+        payload = array("q", self.offsets)
+        for values in (self.lines, self.mins, self.maxs):
+            payload.extend(values)
+        cp = self.checkpoint
+        header = _TIME_INDEX_HEADER.pack(
+            _TIME_INDEX_MAGIC, cp["inode"], cp["size"], cp["mtime_ns"], cp["offset"], cp["line"], cp["anchor"],
+            self.every, len(self.offsets),
+        )
+        _write_atomic(target, header, payload)
+
+    @classmethod
+    def load(cls, path: str, source: str) -> Optional["TimeIndex"]:
+        """Load a sidecar whatever file version it describes; ``None`` when missing or corrupt."""
+        try:
+            with open(source, "rb") as f:
+                header = f.read(_TIME_INDEX_HEADER.size)
+                if len(header) != _TIME_INDEX_HEADER.size:
+                    return None
+                magic, ino, size, mtime_ns, offset, line, anchor, every, count = _TIME_INDEX_HEADER.unpack(header)
+                if magic != _TIME_INDEX_MAGIC:
+                    return None
+                columns = []
+                for _ in range(4):
+                    column = array("q")
+                    column.fromfile(f, count)
+                    columns.append(column)
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+        checkpoint = {"inode": ino, "size": size, "mtime_ns": mtime_ns, "offset": offset, "line": line,
+                      "anchor": anchor}
+        return cls(path, checkpoint, every, *columns)
+
+    @classmethod
+    def build(cls, path: str, every: int = DEFAULT_TIME_BLOCK_ENTRIES,
+              previous: Optional["TimeIndex"] = None) -> "TimeIndex":
+        """
+        Index the entries of ``path``.  When ``previous`` indexes an earlier
+        version of the file that only grew since (with the same block size),
+        its complete blocks are kept and the scan starts at its last block.
+        """
+        fingerprint = file_fingerprint(path)
+        offsets, lines, mins, maxs = array("q"), array("q"), array("q"), array("q")
+        start, line = 0, 0
+        if (previous is not None and previous.every == every and previous.offsets
+                and checkpoint_state(path, previous.checkpoint, fingerprint) == "appended"):
+            keep = len(previous.offsets) - 1  # the last block may have grown
+            for column, kept in ((offsets, previous.offsets), (lines, previous.lines),
+                                 (mins, previous.mins), (maxs, previous.maxs)):
+                column.extend(kept[:keep])
+            start, line = previous.offsets[keep], previous.lines[keep]
+
+        with MmapScanner(path, start, fingerprint[1]) as scanner:
+            buf, end = scanner.buf, scanner.end
+            first = [start] if TIMESTAMP_PREFIX_BYTES.match(buf, start, end) else []
+            entry_starts = itertools.chain(first, (m.start() + 1 for m in NEXT_ENTRY_BYTES.finditer(buf, start, end)))
+            count, counted_to, low, high = 0, start, b"", b""
+            for pos in entry_starts:
+                stamp = buf[pos:pos + 23]  # timestamps compare like their text
+                if count % every == 0:
+                    if count:
+                        mins.append(timestamp_ms(low.decode("ascii")))
+                        maxs.append(timestamp_ms(high.decode("ascii")))
+                    line += scanner.count_newlines(counted_to, pos)
+                    counted_to = pos
+                    offsets.append(pos)
+                    lines.append(line)
+                    low = high = stamp
+                elif stamp < low:
+                    low = stamp
+                elif stamp > high:
+                    high = stamp
+                count += 1
+            if count:
+                mins.append(timestamp_ms(low.decode("ascii")))
+                maxs.append(timestamp_ms(high.decode("ascii")))
+
+        checkpoint = make_checkpoint(path, fingerprint, offsets[-1] if offsets else 0, lines[-1] if lines else 0)
+        return cls(path, checkpoint, every, offsets, lines, mins, maxs)
+
+
+_indexes: Dict[Tuple[str, str], Any] = {}  # (kind suffix, absolute path) -> LevelIndex / TimeIndex
+_indexes_lock = threading.Lock()
+
+
+def _get_checkpointed_index(cls, suffix: str, path: str, index_dir: str, build_args: tuple,
+                            executor: Optional[Executor], describe):
+    """
+    Shared lookup of the level and time indexes: memory, then the on-disk
+    sidecar; a file that only grew since is extended from the checkpoint and
+    anything else is rebuilt (by ``executor`` when given).
+    """
+    key = (suffix, os.path.abspath(path))
+    fingerprint = file_fingerprint(path)
+
+    with _indexes_lock:
+        index = _indexes.get(key)
+    if index is not None and index.fingerprint == fingerprint:
+        return index
+
+    target = sidecar_path(path, index_dir, suffix)
+    if index is None:
+        index = cls.load(path, target)
+    if index is None or index.fingerprint != fingerprint:
+        if executor is None:
+            index = cls.build(path, *build_args, index)
+        else:
+            index = executor.submit(cls.build, path, *build_args, index).result()
+        try:
+            index.save(target)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist {describe(None)} for {path}: {e}")
+        logger.info(f"🗂️ Built {describe(None)} for {os.path.basename(path)} ({describe(index)})")
+
+    with _indexes_lock:
+        _indexes[key] = index
+    return index
+
+
+def _invalidate_checkpointed_index(suffix: str, path: str, index_dir: str) -> None:
+    with _indexes_lock:
+        _indexes.pop((suffix, os.path.abspath(path)), None)
+    try:
+        os.remove(sidecar_path(path, index_dir, suffix))
+    except OSError:
+        pass
+
+
+def get_level_index(path: str, index_dir: str = DEFAULT_INDEX_DIR, mode: str = "mmap",
+                    executor: Optional[Executor] = None) -> LevelIndex:
+    """Return an up-to-date ``LevelIndex`` for ``path`` (see ``_get_checkpointed_index``)."""
+    return _get_checkpointed_index(LevelIndex, ".vidx", path, index_dir, (mode,), executor,
+                                   lambda index: "level index" if index is None else index.counts)
+
+
+def invalidate_level_index(path: str, index_dir: str = DEFAULT_INDEX_DIR) -> None:
+    """Drop the in-memory and on-disk level index of ``path``."""
+    _invalidate_checkpointed_index(".vidx", path, index_dir)
+
+
+def get_time_index(path: str, index_dir: str = DEFAULT_INDEX_DIR, every: int = DEFAULT_TIME_BLOCK_ENTRIES,
+                   executor: Optional[Executor] = None) -> TimeIndex:
+    """Return an up-to-date ``TimeIndex`` for ``path`` (see ``_get_checkpointed_index``)."""
+    return _get_checkpointed_index(TimeIndex, ".tidx", path, index_dir, (every,), executor,
+                                   lambda index: "time index" if index is None else f"{len(index.offsets)} blocks")
+
+
+def invalidate_time_index(path: str, index_dir: str = DEFAULT_INDEX_DIR) -> None:
+    """Drop the in-memory and on-disk time index of ``path``."""
+    _invalidate_checkpointed_index(".tidx", path, index_dir)
@@ -0,0 +1,857 @@
+# ✅ Single-pass streaming log scanner shared by every log feature
+#
+# One LogScanner pass reads a file once and fans the result out to any number
+# of subscribers (RQ/RS extraction, error scan, search, ...), instead of every
+# feature opening the file and re-tokenizing the same lines with its own regexes.
+
+import calendar, mmap, os, re, time, zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from log_tokenizer import header_fields, tokenize_line
+
+# 🔍 Regex patterns mirrored from main.Patterns (worker processes never import main)
+TIMESTAMP_BYTES = re.compile(rb'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},\d{3}')
+BRACKET_VALUES = re.compile(r"\[([^\[\]]*)\]")
+
+# 🔍 Bytes patterns for the mmap fast paths; every marker we look for is ASCII
+TIMESTAMP_PREFIX_BYTES = re.compile(rb'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},\d{3}')  # used with .match(buf, pos)
+NEXT_ENTRY_BYTES = re.compile(rb'\n(?=\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},\d{3})')
+XML_MARKER_BYTES = re.compile(rb'XML Re(?:quest|sponse):')
+LEVEL_MARKER_BYTES = re.compile(rb'\[(?:FATAL|ERROR|WARN)\]')
+# Line-start patterns anchored on a literal "\n" (much faster than ^ with MULTILINE)
+XML_LINE = re.compile(r'\n[^\S\n]*<')  # first non-blank character is "<"
+NON_XML_LINE = re.compile(r'\n[^\S\n]*[^\s<]')
+
+BATCH_LINES = 50_000
+COUNT_CHUNK_BYTES = 4 * 1024 * 1024
+ANCHOR_BYTES = 4096  # bytes before a checkpoint that must be unchanged to resume from it
+PROGRESS_BYTES = 1024 * 1024  # the mmap scanner publishes its position at most once per this many bytes
+
+
+_MINUTE_MS: Dict[str, int] = {}  # "YYYY-MM-DDTHH:MM" -> epoch milliseconds
+
+
+def timestamp_ms(line: str) -> int:
+    """
+    Milliseconds since the epoch of a line's leading timestamp, read as UTC
+    (only differences between timestamps matter); -1 when there is none.
+    """
+    if len(line) < 23 or line[10] != "T" or line[19] != ",":
+        return -1
+    minute = line[:16]
+    base = _MINUTE_MS.get(minute)
+    if base is None:
+        try:
+            base = calendar.timegm(time.strptime(minute, "%Y-%m-%dT%H:%M")) * 1000
+        except ValueError:
+            return -1
+        if len(_MINUTE_MS) >= 4096:
+            _MINUTE_MS.clear()
+        _MINUTE_MS[minute] = base
+    seconds, millis = line[17:19], line[20:23]
+    if not (seconds.isdigit() and millis.isdigit()):
+        return -1
+    return base + int(seconds) * 1000 + int(millis)
+
+
+def line_level(text: str) -> Optional[str]:
+    """Most severe ``[FATAL]``/``[ERROR]``/``[WARN]`` marker present on a line."""
+    if "[" not in text:
+        return None
+    if "[FATAL]" in text:
+        return "FATAL"
+    if "[ERROR]" in text:
+        return "ERROR"
+    if "[WARN]" in text:
+        return "WARN"
+    return None
+
+
+class LogRecord:
+    """
+    One physical line of a log.
+
+    ``thread``/``service``/``timestamp`` belong to the entry the line is part
+    of (taken from its timestamp header line), ``level`` is the severity marker
+    found on this very line.
+    """
+
+    __slots__ = ("line_number", "offset", "text", "is_entry_start", "entry_line",
+                 "timestamp", "level", "thread", "service")
+
+    def __init__(self, line_number, offset, text, is_entry_start, entry_line,
+                 timestamp, level, thread, service):
+        self.line_number = line_number
+        self.offset = offset
+        self.text = text
+        self.is_entry_start = is_entry_start
+        self.entry_line = entry_line
+        self.timestamp = timestamp
+        self.level = level
+        self.thread = thread
+        self.service = service
+
+
+class XmlSpan:
+    """
+    A block of XML lines following an ``XML Request:``/``XML Response:`` header.
+
+    ``start_line`` is the line after the header (what the RQ/RS table shows),
+    ``first_line``..``end_line`` and ``start_offset``..``end_offset`` cover the
+    XML lines themselves.
+    """
+
+    __slots__ = ("header", "header_line", "start_line", "first_line", "end_line",
+                 "start_offset", "end_offset", "lines")
+
+    def __init__(self, header, header_line, first_line, start_offset):
+        self.header = header
+        self.header_line = header_line
+        self.start_line = header_line + 1
+        self.first_line = first_line
+        self.end_line = first_line
+        self.start_offset = start_offset
+        self.end_offset = start_offset
+        self.lines: List[str] = []
+
+    @property
+    def content(self) -> str:
+        return '\n'.join(self.lines)
+
+
+class ScanSubscriber:
+    """Base class for scan consumers; override only the hooks you need."""
+
+    wants_records = False
+    wants_spans = False
+    # Set when only records carrying a severity marker matter, which lets the
+    # mmap scanner hand over just those lines instead of every line
+    level_records_only = False
+
+    def on_record(self, record: LogRecord) -> None:
+        pass
+
+    def on_xml_span(self, span: XmlSpan) -> None:
+        pass
+
+    def on_finish(self, line_count: int) -> None:
+        pass
+
+
+class ScanProgress:
+    """
+    How far a running scan got, for progress reporting.
+
+    The scanner thread overwrites the counters at bounded intervals (every
+    batch of lines, or every ``PROGRESS_BYTES`` for the mmap scanner) and
+    anybody may read them at any time: the scan loop never calls back into
+    the caller or takes a lock.
+    """
+
+    __slots__ = ("total_bytes", "bytes_done", "lines_done", "started", "finished")
+
+    def __init__(self, total_bytes: int = 0):
+        self.total_bytes = total_bytes
+        self.bytes_done = 0
+        self.lines_done = 0
+        self.started = time.time()
+        self.finished: Optional[float] = None
+
+    def finish(self) -> None:
+        self.bytes_done = self.total_bytes
+        self.finished = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus throughput and ETA derived from them."""
+        elapsed = (self.finished or time.time()) - self.started
+        rate = self.bytes_done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total_bytes - self.bytes_done, 0)
+        return {
+            "bytes_done": self.bytes_done,
+            "total_bytes": self.total_bytes,
+            "percent": round(100.0 * self.bytes_done / self.total_bytes, 1) if self.total_bytes else 100.0,
+            "lines_done": self.lines_done,
+            "elapsed": round(elapsed, 2),
+            "mb_per_s": round(rate / (1024 * 1024), 2),
+            "eta": round(remaining / rate, 1) if rate and self.finished is None else 0.0,
+        }
+
+
+class LogScanner:
+    """
+    Streams ``path`` from ``start`` to ``end`` once, feeding every subscriber.
+
+    Lines are split on ``\\n`` (matching the line index) and decoded with
+    ``errors='ignore'``.  Per-line records are only built when at least one
+    subscriber asks for them, so span-only consumers pay for the XML state
+    machine and nothing else.
+
+    ``resume_offset``/``resume_line`` locate the last timestamp line scanned
+    (and the number of lines before it).  Every bit of scanner state is reset
+    on a timestamp line, so a later scan of the grown file may start there.
+    """
+
+    def __init__(self, path: str, subscribers: Sequence[ScanSubscriber],
+                 start: int = 0, end: Optional[int] = None, first_line: int = 1,
+                 progress: Optional[ScanProgress] = None):
+        self.path = path
+        self.subscribers = list(subscribers)
+        self.start = start
+        self.end = end
+        self.line_count = first_line - 1
+        self.offset = start
+        self.resume_offset = start
+        self.resume_line = first_line - 1
+        self.progress = progress if progress is not None else ScanProgress()
+
+    def iter_batches(self, batch_lines: int = BATCH_LINES) -> Iterator[int]:
+        """Scan the file, yielding the number of lines consumed after every batch."""
+        record_hooks = [s.on_record for s in self.subscribers if s.wants_records]
+        span_hooks = [s.on_xml_span for s in self.subscribers if s.wants_spans]
+        end = os.path.getsize(self.path) if self.end is None else self.end
+        progress = self.progress
+        progress.total_bytes = max(end - self.start, 0)
+        first_line = self.line_count
+
+        line_number = self.line_count
+        offset = self.offset
+        next_yield = line_number + batch_lines
+        tokenize = tokenize_line
+
+        entry_line = 0
+        entry_offset, entry_prior_line = self.resume_offset, self.resume_line
+        timestamp = ""
+        thread = service = "UNKNOWN"
+        xml_marker_found = False
+        span: Optional[XmlSpan] = None
+        header = ""
+        header_line = 0
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if offset >= end:
+                    break
+                line_number += 1
+                text = raw.decode("utf-8", "ignore").rstrip("\r\n")
+                tokens = tokenize(text)
+                is_entry_start = tokens is not None
+
+                if is_entry_start:
+                    # A new entry closes any XML block still being collected
+                    if span is not None:
+                        for hook in span_hooks:
+                            hook(span)
+                        span = None
+                    header = text
+                    header_line = entry_line = line_number
+                    entry_offset, entry_prior_line = offset, line_number - 1
+                    xml_marker_found = "XML Request:" in text or "XML Response:" in text
+                    if record_hooks:
+                        timestamp = tokens[0]
+                        thread = tokens[3] or "UNKNOWN"
+                        service = tokens[5] or "UNKNOWN"
+                elif xml_marker_found:
+                    stripped = text.strip()
+                    if stripped:
+                        if stripped[0] == "<":
+                            if span is None:
+                                span = XmlSpan(header, header_line, line_number, offset)
+                            span.lines.append(stripped)
+                            span.end_line = line_number
+                            span.end_offset = offset + len(raw)
+                        elif span is not None:
+                            for hook in span_hooks:
+                                hook(span)
+                            span = None
+                            xml_marker_found = False
+
+                if record_hooks:
+                    record = LogRecord(line_number, offset, text, is_entry_start, entry_line,
+                                       timestamp, line_level(text), thread, service)
+                    for hook in record_hooks:
+                        hook(record)
+
+                offset += len(raw)
+                if line_number >= next_yield:
+                    self.line_count, self.offset = line_number, offset
+                    self.resume_offset, self.resume_line = entry_offset, entry_prior_line
+                    progress.bytes_done, progress.lines_done = offset - self.start, line_number - first_line
+                    next_yield = line_number + batch_lines
+                    yield line_number
+
+        if span is not None:
+            for hook in span_hooks:
+                hook(span)
+
+        self.line_count, self.offset = line_number, offset
+        self.resume_offset, self.resume_line = entry_offset, entry_prior_line
+        progress.lines_done = line_number - first_line
+        for subscriber in self.subscribers:
+            subscriber.on_finish(line_number)
+        progress.finish()
+        yield line_number
+
+    def run(self) -> int:
+        """Scan to the end and return the number of the last line consumed."""
+        for _ in self.iter_batches():
+            pass
+        return self.line_count
+
+
+def supports_mmap(subscribers: Sequence[ScanSubscriber]) -> bool:
+    """Whether the byte-level scanner can serve every subscriber (spans and severity lines only)."""
+    return all(s.level_records_only or not s.wants_records for s in subscribers)
+
+
+def run_scan(path: str, subscribers: Sequence[ScanSubscriber], start: int = 0, end: Optional[int] = None,
+             first_line: int = 1, mode: str = "stream",
+             progress: Optional[ScanProgress] = None) -> Union[LogScanner, "MmapScanner"]:
+    """
+    Scan ``path`` once for ``subscribers`` and return the finished scanner
+    (``line_count``, ``resume_offset``, ``resume_line``).
+
+    ``mode="mmap"`` uses the byte-level scanner when every subscriber allows
+    it and silently falls back to the line scanner otherwise.  ``progress``
+    is kept up to date while the scan runs.
+    """
+    if mode == "mmap" and supports_mmap(subscribers):
+        with MmapScanner(path, start, end, first_line, progress) as scanner:
+            scanner.run(subscribers)
+        return scanner
+    scanner = LogScanner(path, subscribers, start, end, first_line, progress)
+    scanner.run()
+    return scanner
+
+
+def scan_file(path: str, subscribers: Sequence[ScanSubscriber], start: int = 0,
+              end: Optional[int] = None, first_line: int = 1, mode: str = "stream") -> int:
+    """Scan ``path`` once for ``subscribers``; returns the number of the last line."""
+    return run_scan(path, subscribers, start, end, first_line, mode).line_count
+
+
+################################
+# Incremental re-scans
+################################
+def _anchor(f, offset: int) -> int:
+    f.seek(max(offset - ANCHOR_BYTES, 0))
+    return zlib.crc32(f.read(min(offset, ANCHOR_BYTES)))
+
+
+def make_checkpoint(path: str, fingerprint: Tuple[int, int, int], offset: int, line: int) -> Dict[str, int]:
+    """
+    Where a later scan of ``path`` may resume: ``offset`` is the start of a
+    timestamp line preceded by ``line`` lines.  The fingerprint and a CRC of
+    the bytes just before ``offset`` tell whether the file only grew since.
+    """
+    with open(path, "rb") as f:
+        anchor = _anchor(f, offset)
+    return {"inode": fingerprint[0], "size": fingerprint[1], "mtime_ns": fingerprint[2],
+            "offset": offset, "line": line, "anchor": anchor}
+
+
+def find_resume_point(path: str, line_count: int, end: Optional[int] = None) -> Tuple[int, int]:
+    """Resume point of the first ``end`` bytes of a file whose line count is already known (e.g. from a parallel scan)."""
+    with MmapScanner(path, 0, end) as scanner:
+        return scanner.resume_point(line_count)
+
+
+def checkpoint_state(path: str, checkpoint: Optional[Dict[str, int]], fingerprint: Tuple[int, int, int]) -> str:
+    """
+    ``"unchanged"`` when the file is exactly as checkpointed, ``"appended"``
+    when it is the same file with data added (or rewritten) after the
+    checkpoint offset, ``"replaced"`` when it was truncated, rotated or
+    rewritten before the offset and needs a full rescan.
+    """
+    if not checkpoint:
+        return "replaced"
+    if (checkpoint["inode"], checkpoint["size"], checkpoint["mtime_ns"]) == tuple(fingerprint):
+        return "unchanged"
+    if fingerprint[0] != checkpoint["inode"] or fingerprint[1] < checkpoint["size"]:
+        return "replaced"
+    try:
+        with open(path, "rb") as f:
+            if _anchor(f, checkpoint["offset"]) != checkpoint["anchor"]:
+                return "replaced"
+    except OSError:
+        return "replaced"
+    return "appended"
+
+
+################################
+# Byte-level mmap scanning
+################################
+class MmapScanner:
+    """
+    Memory-maps ``path`` and searches the raw bytes for the ASCII markers the
+    features care about (timestamp prefix, ``XML Request:``, ``[ERROR]``, ...).
+
+    Nothing is decoded except the lines handed to subscribers, and line numbers
+    are obtained by counting ``\\n`` between hits, so the cost of the lines in
+    between is a C-level ``count``/regex scan rather than a Python loop.  Line
+    numbers, offsets and texts are the same the :class:`LogScanner` produces.
+    """
+
+    def __init__(self, path: str, start: int = 0, end: Optional[int] = None, first_line: int = 1,
+                 progress: Optional[ScanProgress] = None):
+        self.path = path
+        self.progress = progress if progress is not None else ScanProgress()
+        self.start = start
+        self.end = end
+        self.first_line = first_line
+        self.line_count = first_line - 1
+        self.buf: Any = b""
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self.resume_offset = start
+        self.resume_line = first_line - 1
+        self._count_pos = start
+        self._count_line = first_line
+        self._entry_memo = (-1, None)  # (line start already resolved, its entry start)
+        self._header_memo = (-1, "UNKNOWN", "UNKNOWN", "")
+
+    def __enter__(self) -> "MmapScanner":
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size:  # an empty file cannot be mapped
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buf = self._map
+        self.end = size if self.end is None else min(self.end, size)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.buf = b""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ---- buffer helpers -------------------------------------------------
+    def _decode(self, start: int, end: int) -> str:
+        return self.buf[start:end].decode("utf-8", "ignore").rstrip("\r\n")
+
+    def count_newlines(self, start: int, end: int) -> int:
+        """``\\n`` count in ``buf[start:end]``; mmap has no ``count``, so copy bounded chunks."""
+        buf, count = self.buf, 0
+        while start < end:
+            stop = min(start + COUNT_CHUNK_BYTES, end)
+            count += buf[start:stop].count(b"\n")
+            start = stop
+        return count
+
+    def line_end_at(self, pos: int) -> int:
+        """Offset of the ``\\n`` ending the line containing ``pos`` (or the range end)."""
+        end = self.buf.find(b"\n", pos, self.end)
+        return self.end if end == -1 else end
+
+    def line_start_at(self, pos: int) -> int:
+        return max(self.buf.rfind(b"\n", self.start, pos) + 1, self.start)
+
+    def line_number_at(self, line_start: int) -> int:
+        """Number of the line starting at ``line_start``; calls must not go backwards."""
+        self._count_line += self.count_newlines(self._count_pos, line_start)
+        self._count_pos = line_start
+        return self._count_line
+
+    def is_entry_start_at(self, line_start: int) -> bool:
+        return TIMESTAMP_PREFIX_BYTES.match(self.buf, line_start, self.end) is not None
+
+    def entry_start_of(self, line_start: int) -> Optional[int]:
+        """Start of the timestamp line owning ``line_start``, or None before the first entry."""
+        resolved, entry = self._entry_memo
+        pos = line_start
+        while True:
+            if pos == resolved:
+                break
+            if self.is_entry_start_at(pos):
+                entry = pos
+                break
+            if pos <= self.start:
+                entry = None
+                break
+            pos = self.line_start_at(pos - 1)
+        self._entry_memo = (line_start, entry)
+        return entry
+
+    def entry_end_after(self, pos: int) -> int:
+        match = NEXT_ENTRY_BYTES.search(self.buf, pos, self.end)
+        return self.end if match is None else match.start() + 1
+
+    def entry_header(self, entry_start: Optional[int], text: Optional[str] = None):
+        """``(thread, service, timestamp)`` of the entry starting at ``entry_start`` (whose line may be ``text``)."""
+        if entry_start is None:
+            return "UNKNOWN", "UNKNOWN", ""
+        if self._header_memo[0] != entry_start:
+            if text is None:
+                text = self._decode(entry_start, self.line_end_at(entry_start))
+            self._header_memo = (entry_start, *header_fields(text), text[:23])
+        return self._header_memo[1:]
+
+    def count_lines(self) -> int:
+        """Number of the last line in the range."""
+        buf, start, end = self.buf, self.start, self.end
+        count = self.count_newlines(start, end)
+        if end > start and buf[end - 1:end] != b"\n":
+            count += 1
+        return self.first_line - 1 + count
+
+    def resume_point(self, line_count: int) -> Tuple[int, int]:
+        """``(offset, lines before it)`` of the last timestamp line in the range, given the range's last line number."""
+        pos = self.end
+        while pos > self.start:
+            pos = self.line_start_at(pos - 1)
+            if self.is_entry_start_at(pos):
+                tail = self.count_newlines(pos, self.end)
+                if self.buf[self.end - 1:self.end] != b"\n":
+                    tail += 1
+                return pos, line_count - tail
+        return self.start, self.first_line - 1
+
+    # ---- producers -------------------------------------------------------
+    def iter_level_records(self) -> Iterator[LogRecord]:
+        """Records for the lines carrying a ``[FATAL]``/``[ERROR]``/``[WARN]`` marker."""
+        buf, end = self.buf, self.end
+        search = LEVEL_MARKER_BYTES.search
+        pos = self.start
+        while True:
+            match = search(buf, pos, end)
+            if match is None:
+                return
+            line_start = self.line_start_at(match.start())
+            line_end = self.line_end_at(match.end())
+            pos = line_end + 1
+            text = self._decode(line_start, line_end)
+            line_number = self.line_number_at(line_start)
+            entry = self.entry_start_of(line_start)
+            if entry == line_start:
+                thread, service, timestamp = self.entry_header(entry, text)
+                entry_line = line_number
+            else:
+                thread, service, timestamp = self.entry_header(entry)
+                entry_line = 0 if entry is None else line_number - self.count_newlines(entry, line_start)
+            yield LogRecord(line_number, line_start, text, entry == line_start, entry_line,
+                            timestamp, line_level(text), thread, service)
+
+    def iter_xml_spans(self) -> Iterator[XmlSpan]:
+        """
+        XML spans after ``XML Request:``/``XML Response:`` headers, with the
+        same rules as :class:`LogScanner`: blank lines are skipped, the first
+        other non-``<`` line or the next timestamp line closes the span.
+        """
+        buf, end = self.buf, self.end
+        search = XML_MARKER_BYTES.search
+        pos = self.start
+        while True:
+            match = search(buf, pos, end)
+            if match is None:
+                return
+            header_start = self.line_start_at(match.start())
+            header_end = self.line_end_at(match.end())
+            pos = header_end + 1
+            if not self.is_entry_start_at(header_start):
+                continue  # marker text inside a continuation line
+            header_line = self.line_number_at(header_start)
+
+            # A span never outlives its entry, so locate it in the decoded entry body
+            body_start = header_end + 1
+            pos = self.entry_end_after(header_end)
+            if body_start >= pos:
+                continue
+            body = buf[body_start:pos]
+            try:
+                text, lossless = body.decode("utf-8"), True
+            except UnicodeDecodeError:
+                text, lossless = body.decode("utf-8", "ignore"), False
+            text = "\n" + text  # so the first body line also starts after a "\n"
+            first = XML_LINE.search(text)
+            if first is None:
+                continue
+            stop = NON_XML_LINE.search(text, first.end())
+            first_char = first.start() + 1
+            xml = text[first_char:len(text) if stop is None else stop.start()].rstrip()
+            lines = [line for line in map(str.strip, xml.split("\n")) if line]
+
+            first_index = text.count("\n", 0, first_char) - 1
+            last_index = first_index + xml.count("\n")
+            if len(text) == len(body) + 1:  # pure ASCII: characters are bytes
+                start_offset = first_char - 1
+                end_offset = start_offset + len(xml)
+            elif lossless:
+                start_offset = len(text[1:first_char].encode("utf-8"))
+                end_offset = start_offset + len(xml.encode("utf-8"))
+            else:
+                # "ignore" dropped bytes, but never a "\n": count lines in the raw body
+                lengths = [len(raw) + 1 for raw in body.split(b"\n", last_index + 1)[:last_index + 1]]
+                start_offset = sum(lengths[:first_index])
+                end_offset = sum(lengths) - 1
+            end_offset = body.find(b"\n", end_offset)
+
+            span = XmlSpan(self._decode(header_start, header_end), header_line,
+                           header_line + 1 + first_index, body_start + start_offset)
+            span.lines = lines
+            span.end_line = header_line + 1 + last_index
+            span.end_offset = pos if end_offset == -1 else body_start + end_offset + 1
+            yield span
+
+    def run(self, subscribers: Sequence[ScanSubscriber]) -> int:
+        """Feed span and severity-line subscribers; returns the number of the last line."""
+        span_hooks = [s.on_xml_span for s in subscribers if s.wants_spans]
+        record_hooks = [s.on_record for s in subscribers if s.wants_records]
+        progress = self.progress
+        size = max(self.end - self.start, 0)
+        passes = (1 if span_hooks else 0) + (1 if record_hooks else 0)
+        progress.total_bytes = size  # bytes_done counts each pass as an equal share of the range
+        done_before = 0
+        if span_hooks:
+            next_report = self.start + PROGRESS_BYTES
+            for span in self.iter_xml_spans():
+                for hook in span_hooks:
+                    hook(span)
+                if span.end_offset >= next_report:
+                    progress.bytes_done = (span.end_offset - self.start) // passes
+                    progress.lines_done = span.end_line - self.first_line + 1
+                    next_report = span.end_offset + PROGRESS_BYTES
+            self._count_pos, self._count_line = self.start, self.first_line
+            done_before = size
+        if record_hooks:
+            next_report = self.start + PROGRESS_BYTES
+            for record in self.iter_level_records():
+                for hook in record_hooks:
+                    hook(record)
+                if record.offset >= next_report:
+                    progress.bytes_done = (done_before + record.offset - self.start) // passes
+                    progress.lines_done = max(progress.lines_done, record.line_number - self.first_line + 1)
+                    next_report = record.offset + PROGRESS_BYTES
+        self.line_count = self.count_lines()
+        self.resume_offset, self.resume_line = self.resume_point(self.line_count)
+        progress.lines_done = self.line_count - self.first_line + 1
+        for subscriber in subscribers:
+            subscriber.on_finish(self.line_count)
+        progress.finish()
+        return self.line_count
+
+
+def iter_search_batches(path: str, collector: "SearchCollector", batch_lines: int = BATCH_LINES,
+                        mode: str = "stream", start: int = 0, end: Optional[int] = None,
+                        first_line: int = 1) -> Iterator[int]:
+    """
+    Run ``collector`` over ``path`` (or the bytes ``start``..``end``, whose
+    first line is ``first_line``), yielding between batches so callers can
+    stream results and check for aborts.  ``mode="mmap"`` searches the raw
+    bytes when the search text is a single ASCII line (bytes regexes only
+    fold ASCII case).
+    """
+    text = collector.search_text
+    if mode == "mmap" and text and text.isascii() and "\n" not in text and "\r" not in text:
+        with MmapScanner(path, start, end, first_line) as scanner:
+            yield from collector.scan_mmap(scanner, batch_lines)
+    else:
+        yield from LogScanner(path, [collector], start, end, first_line).iter_batches(batch_lines)
+
+
+################################
+# Built-in subscribers
+################################
+class ErrorCollector(ScanSubscriber):
+    """Counts and lists every line carrying a ``[FATAL]``, ``[ERROR]`` or ``[WARN]`` marker."""
+
+    wants_records = True
+    level_records_only = True
+
+    def __init__(self, log_file: str):
+        self.log_file = log_file
+        self.counts = {"FATAL": 0, "ERROR": 0, "WARN": 0}
+        self.errors: List[Dict[str, Any]] = []
+
+    def on_record(self, record: LogRecord) -> None:
+        level = record.level
+        if level is None:
+            return
+        self.counts[level] += 1
+        self.errors.append(error_row(self.log_file, record.line_number, record.text))
+
+
+def error_row(log_file: str, line_number: int, text: str) -> Dict[str, Any]:
+    """Error table row of a line carrying a severity marker."""
+    tokens = tokenize_line(text)
+    if tokens is not None:
+        # The thread column has always shown the second bracket: the task name when there is one
+        thread_id = tokens[2] or tokens[3] or "N/A"
+        service = tokens[5] or "N/A"
+    else:
+        # A marker on a continuation line (stack trace, payload): take what brackets it has
+        values = BRACKET_VALUES.findall(text)
+        thread_id = values[1] if len(values) > 1 else "N/A"
+        service = next((val.split(".")[-1] for val in values if "." in val), "N/A")
+
+    return {
+        "log_file": log_file,
+        "line_number": line_number,
+        "thread_id": thread_id,
+        "service": service,
+        "error_message": text.strip()
+    }
+
+
+def scan_errors_range(path: str, log_file: str, start: int = 0, end: Optional[int] = None,
+                      mode: str = "stream") -> Tuple[Dict[str, int], List[Dict[str, Any]], int]:
+    """
+    Error scan of bytes ``start``..``end`` (a process pool task): ``(counts,
+    rows, line_count)`` with line numbers relative to ``start``.
+    """
+    errors = ErrorCollector(log_file)
+    line_count = scan_file(path, [errors], start, end, mode=mode)
+    return errors.counts, errors.errors, line_count
+
+
+def merge_error_results(results: Sequence[Tuple[Dict[str, int], List[Dict[str, Any]], int]]
+                        ) -> Tuple[Dict[str, int], List[Dict[str, Any]], int]:
+    """Add up the range scans of one file in file order, rebasing line numbers to the whole file."""
+    counts = {"FATAL": 0, "ERROR": 0, "WARN": 0}
+    merged: List[Dict[str, Any]] = []
+    line_offset = 0
+    for range_counts, rows, line_count in results:
+        for level, count in range_counts.items():
+            counts[level] += count
+        if line_offset:
+            for row in rows:
+                row["line_number"] += line_offset
+        merged.extend(rows)
+        line_offset += line_count
+    return counts, merged, line_offset
+
+
+class SearchCollector(ScanSubscriber):
+    """
+    Case-insensitive literal search.
+
+    ``mode="line"`` reports every matching line with the entry text up to
+    that line; ``mode="entry"`` reports each log entry containing a match once,
+    from its timestamp line to the line before the next entry.
+    """
+
+    wants_records = True
+
+    def __init__(self, log_file: str, search_text: str, mode: str = "line"):
+        self.log_file = log_file
+        self.search_text = search_text
+        self.pattern = re.compile(re.escape(search_text), re.IGNORECASE)
+        self.mode = mode
+        self.results: List[Dict[str, Any]] = []
+        self.occurrences = 0
+        self._section: List[str] = []
+        self._in_entry = False
+        self._entry_matched = False
+        self._entry_line = 0
+        self._thread = self._service = "UNKNOWN"
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Hand over (and forget) the results found so far."""
+        results, self.results = self.results, []
+        return results
+
+    def _emit_entry(self) -> None:
+        self.results.append({
+            "log_file": self.log_file,
+            "line_number": self._entry_line,
+            "thread_id": self._thread,
+            "service": self._service,
+            "snippet": '\n'.join(self._section)
+        })
+
+    def on_record(self, record: LogRecord) -> None:
+        text = record.text
+        if record.is_entry_start:
+            if self.mode == "entry" and self._in_entry and self._entry_matched:
+                self._emit_entry()
+            self._section = [text]
+            self._in_entry = True
+            self._entry_matched = False
+            self._entry_line = record.line_number
+            self._thread, self._service = record.thread, record.service
+        elif self._in_entry or self.mode == "line":
+            self._section.append(text)
+
+        if not self.pattern.search(text):
+            return
+        if self.mode == "entry":
+            if self._in_entry:
+                self._entry_matched = True
+                self.occurrences += 1
+            return
+
+        self.occurrences += 1
+        self.results.append({
+            "log_file": self.log_file,
+            "line_number": record.line_number,
+            "thread_id": record.thread,
+            "service": record.service,
+            "snippet": text if record.is_entry_start else '\n'.join(self._section)
+        })
+
+    def on_finish(self, line_count: int) -> None:
+        if self.mode == "entry" and self._in_entry and self._entry_matched:
+            self._emit_entry()
+
+    def scan_mmap(self, scanner: MmapScanner, batch_lines: int = BATCH_LINES) -> Iterator[int]:
+        """
+        Byte-level equivalent of feeding every record of ``scanner``'s file;
+        only matching lines and the entries they belong to are decoded.  The
+        search text must be ASCII.
+        """
+        buf, end = scanner.buf, scanner.end
+        search = re.compile(re.escape(self.search_text.encode("ascii")), re.IGNORECASE).search
+        emitted_entry = -1
+        line_number = scanner.first_line - 1
+        next_yield = line_number + batch_lines
+        pos = scanner.start
+        while True:
+            match = search(buf, pos, end)
+            if match is None:
+                break
+            line_start = scanner.line_start_at(match.start())
+            line_end = scanner.line_end_at(match.end())
+            pos = line_end + 1
+            line_number = scanner.line_number_at(line_start)
+            entry = scanner.entry_start_of(line_start)
+
+            if self.mode == "entry":
+                if entry is None:
+                    continue
+                self.occurrences += 1
+                if entry == emitted_entry:
+                    continue
+                emitted_entry = entry
+                thread, service, _ = scanner.entry_header(entry)
+                entry_end = scanner.entry_end_after(line_start)
+                section = buf[entry:entry_end].decode("utf-8", "ignore")
+                if section.endswith("\n"):
+                    section = section[:-1]
+                self.results.append({
+                    "log_file": self.log_file,
+                    "line_number": line_number - scanner.count_newlines(entry, line_start),
+                    "thread_id": thread,
+                    "service": service,
+                    "snippet": '\n'.join(line.rstrip("\r") for line in section.split("\n"))
+                })
+            else:
+                self.occurrences += 1
+                thread, service, _ = scanner.entry_header(entry)
+                section_start = scanner.start if entry is None else entry
+                section = buf[section_start:line_end].decode("utf-8", "ignore")
+                self.results.append({
+                    "log_file": self.log_file,
+                    "line_number": line_number,
+                    "thread_id": thread,
+                    "service": service,
+                    "snippet": '\n'.join(line.rstrip("\r") for line in section.split("\n"))
+                })
+
+            if line_number >= next_yield:
+                next_yield = line_number + batch_lines
+                yield line_number
+
+        line_count = scanner.count_lines()
+        yield line_count
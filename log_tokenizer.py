@@ -0,0 +1,69 @@
+# ✅ One-regex tokenizer of JBoss log line prefixes
+#
+#   2025-07-28T10:00:05,715 [ERROR] [default task-9] [1722145600062_1062] [com.datalex.matrix.AirShopping] ...
+#   timestamp               level   task             thread               category (service = last segment)
+#
+# The task may contain dots ("[http-/10.0.0.1:8080-3]") when a thread id follows it.
+#
+# Every feature used to pull these fields out with its own regexes: a level
+# search, a service search (twice), a thread id search and a findall of all
+# bracketed values, each scanning the whole line.  PREFIX reads the leading
+# fields in one anchored match instead, and a line that does not start with
+# a digit (stack traces, XML payloads) is rejected before any regex runs.
+#
+# ``tokenize_text`` does the same for a whole chunk of lines in one
+# ``finditer`` call, so continuation lines cost nothing but the search for
+# the next line start.
+
+import re
+from typing import Iterator, Optional, Tuple
+
+_PREFIX = (
+    r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},\d{3})'
+    r'(?: \[([A-Z]+)\])?'  # level
+    # task: not a thread id, and dotted ("http-/10.0.0.1:8080-3") only when a thread id follows,
+    # so a dotted bracket without one is still read as the category
+    r'(?: \[((?!\d{13}_\d{4}\])(?:[^\[\].]*|[^\[\]]*(?=\] \[\d{13}_\d{4}\])))\])?'
+    r'(?: \[(\d{13}_\d{4})\])?'  # thread
+    r'(?: \[([^\[\]]*\.([^\[\].]*))\])?'  # category, its last segment being the service
+)
+PREFIX = re.compile(_PREFIX)
+NEXT_PREFIX = re.compile(r'\n' + _PREFIX)  # a literal "\n" start is much faster to search for than ^ with MULTILINE
+
+# (timestamp, level, task, thread, category, service); all but the timestamp may be None
+LineTokens = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+def tokenize_line(line: str) -> Optional[LineTokens]:
+    """The prefix fields of a timestamp line; None for a continuation line."""
+    if not line or line[0] not in "0123456789":
+        return None
+    match = PREFIX.match(line)
+    return match.groups() if match else None
+
+
+def tokenize_text(text: str, first_line: int = 1) -> Iterator[Tuple[int, int, LineTokens]]:
+    """
+    ``(line_number, line_start, tokens)`` of every timestamp line of
+    ``text`` (lines separated by ``\\n``, the first one numbered
+    ``first_line``), in order.  Continuation lines are skipped.
+    """
+    line_number = first_line
+    pos = 0
+    match = PREFIX.match(text)
+    if match:
+        yield line_number, 0, match.groups()
+    count = text.count
+    for match in NEXT_PREFIX.finditer(text):
+        start = match.start()
+        line_number += count("\n", pos, start) + 1
+        pos = start + 1
+        yield line_number, pos, match.groups()
+
+
+def header_fields(line: str) -> Tuple[str, str]:
+    """``(thread, service)`` of an entry's header line, "UNKNOWN" where missing."""
+    tokens = tokenize_line(line)
+    if tokens is None:
+        return "UNKNOWN", "UNKNOWN"
+    return tokens[3] or "UNKNOWN", tokens[5] or "UNKNOWN"
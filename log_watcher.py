@@ -0,0 +1,249 @@
+# ✅ Filesystem watcher for the logs directory
+#
+# Keeps the (inode, size, mtime_ns) fingerprint of every log and reports what
+# happened to a file when it changes: created, appended, replaced (new inode,
+# truncated or rewritten) or deleted.  Uses Linux inotify through ctypes when
+# available and falls back to polling the directory everywhere else.
+
+import ctypes, ctypes.util, errno, logging, os, select, stat, struct, threading, time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger("fastapi_logger")
+
+FileFingerprint = Tuple[int, int, int]
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+DEBOUNCE_SECONDS = 0.5  # a file being written is re-checked once it has been quiet this long...
+MAX_DELAY_SECONDS = 5.0  # ...or at the latest this long after its first event
+RESCAN_SECONDS = 60.0  # full rescans behind inotify, in case an event was missed
+
+
+def classify_change(old: Optional[FileFingerprint], new: Optional[FileFingerprint]) -> Optional[str]:
+    """What happened between two fingerprints of the same name; None when nothing did."""
+    if old == new:
+        return None
+    if old is None:
+        return "created"
+    if new is None:
+        return "deleted"
+    if new[0] == old[0] and new[1] > old[1]:
+        return "appended"
+    return "replaced"  # new inode, truncated, or rewritten in place
+
+
+def _open_inotify(directory: str) -> Optional[int]:
+    """inotify descriptor watching ``directory``, or None when inotify is not available."""
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return None
+    try:
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    fd = init(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    if add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        logger.warning(f"⚠️ inotify_add_watch failed for {directory}: {os.strerror(ctypes.get_errno())}")
+        os.close(fd)
+        return None
+    return fd
+
+
+class LogWatcher:
+    """
+    Watches the top level of ``directory`` from a daemon thread and calls
+    ``on_change(name, change)`` (from that thread) for every file whose
+    fingerprint changed.  ``ignore(name)`` filters out files that are not logs.
+
+    With inotify the thread sleeps until the kernel reports activity, then
+    re-fingerprints only the names involved once they have been quiet for
+    ``DEBOUNCE_SECONDS`` (a file written continuously is still checked every
+    ``MAX_DELAY_SECONDS``); a full rescan runs every ``RESCAN_SECONDS`` as a
+    safety net.  Without inotify every ``poll_interval`` is a full rescan.
+    """
+
+    def __init__(self, directory: str, on_change: Callable[[str, str], None],
+                 poll_interval: float = 2.0, use_inotify: bool = True,
+                 ignore: Optional[Callable[[str], bool]] = None):
+        self.directory = directory
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.ignore = ignore or (lambda name: False)
+        self.fingerprints: Dict[str, FileFingerprint] = {}
+        self.backend = "stopped"
+        self.changes = 0
+        self.rescans = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+
+    # ---- lifecycle -------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.fingerprints = self._scan_all()  # the files already there are not changes
+        self._fd = _open_inotify(self.directory) if self.use_inotify else None
+        self.backend = "inotify" if self._fd is not None else "polling"
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"👀 Watching {os.path.abspath(self.directory)} for changes ({self.backend})")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.backend = "stopped"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "backend": self.backend,
+            "files": len(self.fingerprints),
+            "changes": self.changes,
+            "rescans": self.rescans,
+        }
+
+    # ---- change detection -----------------------------------------------
+    def _fingerprint(self, name: str) -> Optional[FileFingerprint]:
+        try:
+            st = os.stat(os.path.join(self.directory, name))
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _scan_all(self) -> Dict[str, FileFingerprint]:
+        fingerprints = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if self.ignore(entry.name):
+                        continue
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            fingerprints[entry.name] = (st.st_ino, st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"⚠️ Could not list {self.directory}: {e}")
+        return fingerprints
+
+    def check(self, names: Optional[Set[str]] = None) -> int:
+        """
+        Compare the current fingerprints of ``names`` (all files when None)
+        with the known ones and report each difference; returns how many.
+        """
+        if names is None:
+            self.rescans += 1
+            current = self._scan_all()
+            names = set(current) | set(self.fingerprints)
+        else:
+            current = {name: fp for name in names if not self.ignore(name)
+                       for fp in [self._fingerprint(name)] if fp is not None}
+        reported = 0
+        for name in sorted(names):
+            if self.ignore(name):
+                continue
+            old, new = self.fingerprints.get(name), current.get(name)
+            change = classify_change(old, new)
+            if change is None:
+                continue
+            if new is None:
+                del self.fingerprints[name]
+            else:
+                self.fingerprints[name] = new
+            reported += 1
+            self.changes += 1
+            try:
+                self.on_change(name, change)
+            except Exception as e:
+                logger.error(f"🔴 Log change handler failed for {name} ({change}): {e}")
+        return reported
+
+    def _run(self) -> None:
+        pending: Dict[str, Tuple[float, float]] = {}  # name -> (first, last) event time
+        next_rescan = time.monotonic() + RESCAN_SECONDS
+        while not self._stop.is_set():
+            if self._fd is None:
+                if self._stop.wait(self.poll_interval):
+                    break
+                self.check()
+                continue
+
+            try:
+                readable, _, _ = select.select([self._fd], [], [], DEBOUNCE_SECONDS if pending else 1.0)
+            except (OSError, ValueError):
+                break  # descriptor closed by stop()
+            now = time.monotonic()
+            if readable:
+                status = self._read_events(pending, now)
+                if status == "lost":
+                    # The watched directory itself went away: keep going by polling
+                    logger.warning(f"⚠️ inotify watch on {self.directory} was lost, falling back to polling")
+                    os.close(self._fd)
+                    self._fd, self.backend = None, "polling"
+                    pending.clear()
+                    continue
+                if status == "overflow":
+                    pending.clear()
+                    next_rescan = now  # events were dropped: compare everything
+            due = {name for name, (first, last) in pending.items()
+                   if now - last >= DEBOUNCE_SECONDS or now - first >= MAX_DELAY_SECONDS}
+            if due:
+                for name in due:
+                    del pending[name]
+                self.check(due)
+            if now >= next_rescan:
+                self.check()
+                next_rescan = now + RESCAN_SECONDS
+
+    def _read_events(self, pending: Dict[str, Tuple[float, float]], now: float) -> Optional[str]:
+        """Drain the inotify descriptor into ``pending``; returns "overflow" or "lost" when relevant."""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return None
+            raise
+        status, pos = None, 0
+        while pos + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            pos += length
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                return "lost"
+            if mask & IN_Q_OVERFLOW:
+                status = "overflow"
+            elif name:
+                first = pending[name][0] if name in pending else now
+                pending[name] = (first, now)
+        return status
@@ -1,24 +1,43 @@
 # Import Python modules
-from contextlib import asynccontextmanager
+from contextlib import aclosing, asynccontextmanager
 from fastapi import FastAPI, Request, Query, HTTPException, Response, BackgroundTasks
 from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse, PlainTextResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from subprocess import Popen, PIPE
 from pathlib import Path
 from threading import Thread
-from xml.dom import minidom
 from logging.handlers import RotatingFileHandler
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from enum import Enum, IntEnum
 from typing import Dict, Any, Optional, List
-from xml.etree import ElementTree as ET
 from io import StringIO
-from ai_module import analyze_log_content
-import uvicorn, shutil, asyncio, os, re, difflib, json, time, subprocess, math, logging, sys, aiofiles, threading, psutil, signal, traceback, zipfile, tarfile, gzip
+from ai_module import LogContentAnalyzer, analyze_log_range, merge_log_ranges
+from log_index import (
+    LevelIndex, LineIndex, file_fingerprint, get_level_index, get_line_index, get_time_index,
+    invalidate_level_index, invalidate_line_index, invalidate_time_index
+)
+from log_watcher import LogWatcher
+from result_cache import AsyncLRUCache
+from result_store import ResultStore
+from xml_pretty import pretty_print_xml
+from jobs import Job, JobScheduler, JobState
+from log_scanner import (
+    ErrorCollector, ScanProgress, SearchCollector, checkpoint_state, find_resume_point,
+    iter_search_batches, make_checkpoint, merge_error_results, run_scan, scan_errors_range, timestamp_ms
+)
+from rqrs_table import (
+    SORT_KEYS, RqrsTable, decode_cursor, encode_cursor, latency_sketches, page_rows, read_span_lines, select_rows
+)
+from sketches import QuantileSketch
+from rqrs_parser import (
+    RqrsCollector, get_process_pool, merge_range_results, plan_range_count,
+    scan_rqrs_range, shutdown_process_pool, split_aligned_ranges
+)
+import uvicorn, shutil, asyncio, collections, itertools, os, re, difflib, json, time, subprocess, math, logging, sys, aiofiles, threading, psutil, signal, traceback, zipfile, tarfile, gzip, functools, sqlite3, hashlib, fnmatch
 
 
 @asynccontextmanager
@@ -45,6 +64,12 @@ async def lifespan(app: FastAPI):
     
     await initialize_critical_services()
     
+    if Config.RESULT_STORE_ENABLED:
+        asyncio.get_running_loop().run_in_executor(None, prune_result_store)
+    
+    if Config.WATCH_LOG_DIR:
+        GlobalState.log_watcher = start_log_watcher(asyncio.get_running_loop())
+    
     if Config.PRELOAD_ENABLED:
         asyncio.create_task(delayed_background_preload())
         logger.info("📦 Background preload will start after server becomes responsive")
@@ -55,6 +80,10 @@ async def lifespan(app: FastAPI):
     
     # (Optional) Add shutdown logic here if needed
     logger.info("🚨⏻ Server shutting down...")
+    if GlobalState.log_watcher is not None:
+        GlobalState.log_watcher.stop()
+        GlobalState.log_watcher = None
+    shutdown_process_pool()
 
 # Initialize FastAPI
 app = FastAPI(lifespan=lifespan)
@@ -63,10 +92,38 @@ app = FastAPI(lifespan=lifespan)
 class Config:
     LOG_OUTPUT_DIR = "./applog"
     LOG_DIR = "./logs"
-    MAX_CACHE_SIZE = 10
+    INDEX_DIR = "./applog/index"  # Line-offset, level and timestamp sidecars for random access into logs
+    TIME_INDEX_EVERY = 1000  # Log entries per sample of the timestamp index (a from/to lookup reads two such blocks)
+    CACHE_MAX_MB = 1024  # Estimated memory budget for cached RQ/RS results
+    ERROR_CACHE_MAX_MB = 256  # Estimated memory budget for cached error scans
+    RESULT_STORE_ENABLED = True  # Persist parse results so they survive restarts
+    RESULT_STORE_PATH = "./applog/results.db"
     PRELOAD_ENABLED = False  # Enable background preload of logs
     PRELOAD_LARGE_FILES = True  # Preload large files in background
-    LARGE_FILE_THRESHOLD_MB = 10 # Threshold for processing XML RQ/RS from logs
+    PARALLEL_PARSE_ENABLED = True  # Split very large files across a process pool
+    PARALLEL_THRESHOLD_MB = 200  # Files above this size are parsed in parallel
+    PARALLEL_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+    PARALLEL_MIN_RANGE_MB = 32  # Smallest byte range handed to a single worker
+    ERROR_SCAN_RANGE_MB = 16  # Smallest byte range of an error scan task (also bounds how long a cancel waits)
+    SEARCH_BATCH_LINES = 2000  # Lines scanned between abort checks / streamed results
+    SCAN_MODE = "mmap"  # "mmap": search raw bytes and decode only returned lines, "stream": decode every line
+    PROGRESS_INTERVAL_SECONDS = 0.5  # How often /progress_stream sends an update
+    JOB_WORKERS = 3  # Parse jobs running at the same time
+    JOB_RESERVED_USER_SLOTS = 1  # Of those, slots background jobs (preload, refresh) may never take
+    WATCH_LOG_DIR = True  # Invalidate cached results of logs that change on disk
+    WATCH_USE_INOTIFY = True  # Use inotify when available (Linux), otherwise poll
+    WATCH_POLL_SECONDS = 2.0  # Directory rescan interval when polling
+    WATCH_REPARSE_CHANGED = False  # Queue a background re-parse of changed logs that were cached
+    RQRS_PAGE_SIZE = 500  # Default page size of /get_rqrs_page
+    RQRS_STREAM_POLL_SECONDS = 0.25  # How often /get_rqrs_stream flushes entries of a parse in progress
+    LATENCY_QUANTILES = "0.5,0.9,0.95,0.99"  # Default percentiles reported by /rqrs_latency
+    ANALYZE_BATCH_ROWS = 1000  # Error rows per NDJSON line of a streamed /analyze_logs
+    XML_CACHE_MAX_MB = 64  # Estimated memory budget for formatted /get_rqrs_content payloads
+    AI_CACHE_MAX_MB = 32  # Estimated memory budget for memoized AI inspection results
+    AI_RANGE_MB = 16  # Smallest byte range of an AI inspection task (also bounds how long a cancel waits)
+    AI_JOB_HISTORY = 200  # AI inspection jobs whose progress and result stay available by job id
+    XML_TRUNCATED_VIEW_CHARS = 200_000  # Default size of the "truncated" XML view
+    XML_COLLAPSED_VIEW_DEPTH = 4  # Default depth below which the "collapsed" XML view hides elements
     EXCLUDED_EXTENSIONS = {'.zip', '.tar', '.gz', '.tar.gz', '.7z', '.Z', '.bz2', '.rar', '.xz'}
     CRITICAL_ENDPOINTS = [
         '/list_logs',
@@ -74,12 +131,19 @@ class Config:
         '/api/logs/list'
         '/healthcheck',
         '/get_rqrs',
+        '/get_rqrs_page',
+        '/get_rqrs_stream',
         '/api/search_logs_stream',
         '/get_rqrs_content',
+        '/rqrs_latency',
+        '/level_counts',
+        '/next_level_line',
         '/download_remote_logs',
         '/ai/inspect_log',
+        '/ai/inspect_jobs',
         '/analyze_logs',
-        '/parse_progress'
+        '/parse_progress',
+        '/progress_stream'
     ]
 
 # Initialize global state
@@ -88,6 +152,7 @@ class GlobalState:
     scp_proc = None
     scp_aborted = False
     abort_event = threading.Event()
+    log_watcher = None
     status = {
         "search_active": False,
         "matches_found": 0,
@@ -95,18 +160,13 @@ class GlobalState:
     }
     endpoint_metrics = {}
 
-# Regex patterns
+# Regex patterns (the level/thread/service of a line prefix are read by log_tokenizer)
 class Patterns:
     TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},\d{3}')
-    THREAD_ID = re.compile(r'(?:\[[^\]]*\] ){1,2}\[(\d{13}_\d{4})\]')
-    ERROR = re.compile(r"\[(ERROR|WARN|FATAL)\]")
-    SERVICE = re.compile(r"\[(com\.datalex\..+?)\]")
     RQRS_MARKER = re.compile(r'(XML Request:|XML Response:)\s*$')
     RQRS = re.compile(r'<([a-zA-Z_][\w]*?(RQ|RS))[\s>]')
     DATE = re.compile(r'^\d{4}-\d{2}-\d{2}')
-    BRACKETED = re.compile(r'\[([^\[\]]+)\]')
-    SERVICE_CLASS = re.compile(r'\[([^\]]+?)\]$')
-    XML_ERRORS = re.compile(r'<(ns1:)?Errors>|<.*Error.*>|ErrorCode|WarningCode', re.IGNORECASE)
+    TIME_BOUND = re.compile(r'(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,3}))?)?)?')
 
 # Mount static directories
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -181,6 +241,8 @@ class SearchRequest(BaseModel):
     search_text: str
     search_mode: str
     target_file: Optional[str] = None
+    from_time: Optional[str] = Field(None, alias="from")  # only entries stamped at or after this
+    to_time: Optional[str] = Field(None, alias="to")  # only entries stamped before this
 
 class SCPDownloadRequest(BaseModel):
     host: str
@@ -222,25 +284,6 @@ def get_file_metadata(filepath: Path) -> Dict[str, Any]:
         'processing_time': duration
     }
 
-def extract_thread_id(line: str) -> str:
-    """Extract thread ID using `Patterns.THREAD_ID`, returning ``"UNKNOWN"`` if no match."""
-    match = Patterns.THREAD_ID.search(line)
-    if match:
-        return match.group(1)
-    return "UNKNOWN"
-
-def extract_service(line: str) -> str:
-    """Extract the Java class name from a bracket that contains dots"""
-    if not Patterns.TIMESTAMP.match(line):
-        return "UNKNOWN"
-
-    brackets = Patterns.BRACKETED.findall(line)
-    for value in reversed(brackets):
-        if '.' in value:
-            return value.split('.')[-1]
-
-    return "UNKNOWN"
-
 def format_bytes(size: int) -> str:
     """Format bytes to human-readable string"""
     if size < 0:
@@ -255,6 +298,37 @@ def format_time(seconds: float) -> str:
     """Convert seconds to HH:MM:SS format"""
     return str(timedelta(seconds=seconds))
 
+def parse_time_bound(value: str) -> int:
+    """Epoch ms (log timestamps read as UTC) of ``YYYY-MM-DD[THH:MM[:SS[,mmm]]]``; a space may replace the T"""
+    match = Patterns.TIME_BOUND.fullmatch(value.strip())
+    if not match or int(match.group(4) or 0) > 59:
+        raise ValueError(f"Invalid time {value!r}, expected YYYY-MM-DDTHH:MM[:SS[,mmm]]")
+    date, hour, minute, second, millis = match.groups()
+    ms = timestamp_ms(f"{date}T{hour or '00'}:{minute or '00'}:{second or '00'},{(millis or '0').ljust(3, '0')}")
+    if ms < 0:
+        raise ValueError(f"Invalid time {value!r}, expected YYYY-MM-DDTHH:MM[:SS[,mmm]]")
+    return ms
+
+def parse_time_window(from_time: Optional[str], to_time: Optional[str]) -> Optional[tuple]:
+    """``(from_ms, to_ms)`` of a from (inclusive) / to (exclusive) pair, None when neither is set"""
+    if not from_time and not to_time:
+        return None
+    return (parse_time_bound(from_time) if from_time else None, parse_time_bound(to_time) if to_time else None)
+
+def time_window_range(path: str, window: Optional[tuple]) -> Optional[tuple]:
+    """
+    ``(start, end, first_line)`` of the bytes of ``path`` holding the entries
+    of ``window`` (the whole file without one), found by binary search in
+    its timestamp index; None when no entry falls inside.
+    """
+    if window is None:
+        return 0, None, 1
+    bounds = get_time_index(path, Config.INDEX_DIR, Config.TIME_INDEX_EVERY).window(*window)
+    if bounds is None:
+        return None
+    start, lines_before, end = bounds
+    return start, end, lines_before + 1
+
 def memory_safe(min_mb: int = 100) -> bool:
     """Check if system has sufficient memory"""
     return psutil.virtual_memory().available > min_mb * 1024 * 1024
@@ -262,124 +336,135 @@ def memory_safe(min_mb: int = 100) -> bool:
 def similarity(a: str, b: str) -> float:
     return difflib.SequenceMatcher(None, a, b).ratio()
 
+async def load_line_index(log_path) -> LineIndex:
+    """Get the line-offset index of a log, building it off the event loop if needed"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_line_index, str(log_path), Config.INDEX_DIR)
+
+async def load_level_index(log: str) -> LevelIndex:
+    """Get the FATAL/ERROR/WARN index of a log; a (re)scan runs in the process pool when enabled"""
+    executor = get_process_pool(Config.PARALLEL_WORKERS) if Config.PARALLEL_PARSE_ENABLED else None
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+        get_level_index, os.path.join(Config.LOG_DIR, log), Config.INDEX_DIR, Config.SCAN_MODE, executor))
+
+async def load_window_level_index(log: str, window: Optional[tuple]) -> Optional[LevelIndex]:
+    """The level index of a log cut down to a time window; None when no entry falls inside"""
+    index = await load_level_index(log)
+    if window is None:
+        return index
+    bounds = await asyncio.get_running_loop().run_in_executor(
+        None, time_window_range, os.path.join(Config.LOG_DIR, log), window)
+    return index.between(bounds[0], bounds[1]) if bounds is not None else None
+
 ################################
 # File Processing Classes
 ################################
-class AsyncLRUCache:
-    def __init__(self, maxsize: int = Config.MAX_CACHE_SIZE):
-        self.maxsize = maxsize
-        self.cache: Dict[str, Any] = {}
-        self.lock = asyncio.Lock()
-        self.order: List[str] = []
-
-    async def get(self, key: str) -> Optional[Any]:
-        async with self.lock:
-            if key in self.cache:
-                self.order.remove(key)
-                self.order.append(key)
-                return self.cache[key]
-            return None
-
-    async def set(self, key: str, value: Any) -> None:
-        async with self.lock:
-            if key in self.cache:
-                self.cache[key] = value
-                self.order.remove(key)
-                self.order.append(key)
-            elif len(self.cache) >= self.maxsize:
-                oldest = self.order.pop(0)
-                logger.info(f"[🗑️] Evicting oldest cache entry: {oldest}")
-                del self.cache[oldest]
-                self.cache[key] = value
-                self.order.append(key)
-            else:
-                self.cache[key] = value
-                self.order.append(key)
-
-    async def invalidate(self, key: str):
-        async with self.lock:
-            if key in self.cache:
-                del self.cache[key]
-                self.order.remove(key)
-
-    async def invalidate_all(self):
-        """Clear all items from the cache"""
-        async with self.lock:
-            self.cache.clear()
-            self.order.clear()
-            logger.info("🧹 Cache completely cleared (all items removed)")
-
 class FileProcessor:
-    def __init__(self):
-        self.active_tasks: Dict[str, asyncio.Task] = {}
-        self.pending_requests: Dict[str, asyncio.Event] = {}
-        self.results: Dict[str, dict] = {}
-        self.lock = asyncio.Lock()
+    """
+    Runs RQ/RS parses as JOB_SCHEDULER jobs, one per file at a time; results
+    live in LOG_CACHE.  A user request for a file that is already queued or
+    being parsed in the background promotes that job instead of restarting it.
+    """
     
-    async def process_file(self, filename: str, priority: Priority) -> dict:
-        async with self.lock:
-            if filename in self.results:
-                return self.results[filename]
-            
-            if filename in self.active_tasks:
-                if priority == Priority.USER_REQUEST and filename in self.pending_requests:
-                    self.active_tasks[filename].cancel()
-                    del self.active_tasks[filename]
-                else:
-                    await self.pending_requests[filename].wait()
-                    return self.results.get(filename)
-            
-            done_event = asyncio.Event()
-            self.pending_requests[filename] = done_event
-            
-            task = asyncio.create_task(
-                self._process_file(filename, done_event, priority),
-                name=f"process_{filename}"
-            )
-            self.active_tasks[filename] = task
-            
-        await done_event.wait()
-        return self.results.get(filename)
+    async def process_file(self, filename: str, priority: Priority) -> Optional[dict]:
+        previous = await LOG_CACHE.get(filename)
+        if previous is not None and parse_result_is_current(filename, previous):
+            return previous
+        
+        job = JOB_SCHEDULER.submit(
+            f"rqrs:{filename}",
+            functools.partial(self._process_file, filename, previous),
+            priority,
+            kind="rqrs"
+        )
+        try:
+            return await job.wait()
+        except asyncio.CancelledError:
+            if job.state is JobState.CANCELLED:
+                return None
+            raise  # the waiter itself was cancelled; the job goes on
     
-    async def _process_file(self, filename: str, done_event: asyncio.Event, priority: Priority):
+    def get_job(self, filename: str) -> Optional[Job]:
+        return JOB_SCHEDULER.get(f"rqrs:{filename}")
+    
+    async def get_status(self, filename: str) -> FileStatus:
+        job = self.get_job(filename)
+        if job is not None and job.state is JobState.RUNNING:
+            return FileStatus.PROCESSING
+        if job is not None and job.state is JobState.QUEUED:
+            return FileStatus.PENDING
+        tracked = progress_tracker.active_tasks.get(filename)
+        if tracked is not None and tracked['kind'] == 'rqrs' and tracked['status'] == 'error':
+            return FileStatus.ERROR
+        cached = LOG_CACHE.entries.get(filename)
+        if cached is not None and parse_result_is_current(filename, cached.value):
+            return FileStatus.COMPLETE
+        return FileStatus.PENDING
+    
+    async def _process_file(self, filename: str, previous: Optional[dict] = None) -> Optional[dict]:
         try:
-            result = await parse_log_file(filename)
-            async with self.lock:
-                self.results[filename] = result
+            return await parse_log_file(filename, previous)
         except asyncio.CancelledError:
-            logger.info(f"Processing of {filename} was cancelled (priority: {priority.name})")
+            logger.info(f"Processing of {filename} was cancelled")
+            raise
         except Exception as e:
             logger.error(f"Error processing {filename}: {str(e)}")
-        finally:
-            async with self.lock:
-                done_event.set()
-                if filename in self.active_tasks:
-                    del self.active_tasks[filename]
-                if filename in self.pending_requests:
-                    del self.pending_requests[filename]
+        return None
 
 class ProgressTracker:
+    """
+    Progress of the scan running (or last run) for each log.  The scanners
+    keep a ``ScanProgress`` up to date on their own; this only keeps track of
+    which one belongs to which log and how it ended.
+    """
     def __init__(self):
-        self.active_tasks = {}
+        self.active_tasks: Dict[str, Dict[str, Any]] = {}
         
-    def start(self, log_file: str):
+    def start(self, log_file: str, kind: str, total_bytes: int = 0) -> ScanProgress:
+        progress = ScanProgress(total_bytes)
         self.active_tasks[log_file] = {
-            'start_time': time.time(),
-            'lines_processed': 0,
-            'status': 'processing'
+            'kind': kind,
+            'status': 'processing',
+            'progress': progress,
+            'error': None
         }
-        
-    def update(self, log_file: str, lines_processed: int):
-        if log_file in self.active_tasks:
-            self.active_tasks[log_file]['lines_processed'] = lines_processed
-            self.active_tasks[log_file]['elapsed'] = time.time() - self.active_tasks[log_file]['start_time']
+        return progress
             
-    def complete(self, log_file: str):
-        if log_file in self.active_tasks:
-            self.active_tasks[log_file]['status'] = 'complete'
+    def complete(self, log_file: str, progress: ScanProgress):
+        task = self.active_tasks.get(log_file)
+        if task is not None and task['progress'] is progress:
+            task['status'] = 'complete'
+            if progress.finished is None:
+                progress.finish()
+
+    def fail(self, log_file: str, progress: ScanProgress, error: str):
+        task = self.active_tasks.get(log_file)
+        if task is not None and task['progress'] is progress:
+            task['status'] = 'error'
+            task['error'] = error
+
+    def get_progress(self, log_file: str) -> Optional[Dict[str, Any]]:
+        task = self.active_tasks.get(log_file)
+        if task is None:
+            return None
+        return {
+            'filename': log_file,
+            'kind': task['kind'],
+            'status': task['status'],
+            'error': task['error'],
+            **task['progress'].snapshot()
+        }
 
 # Initialize global instances
-LOG_CACHE = AsyncLRUCache()
+JOB_SCHEDULER = JobScheduler(Config.JOB_WORKERS, Config.JOB_RESERVED_USER_SLOTS,
+                             urgent_priority=Priority.USER_REQUEST, name="parse")
+RESULT_STORE = ResultStore(Config.RESULT_STORE_PATH)
+LOG_CACHE = AsyncLRUCache(Config.CACHE_MAX_MB * 1024 * 1024, name="RQ/RS cache")
+ERROR_CACHE = AsyncLRUCache(Config.ERROR_CACHE_MAX_MB * 1024 * 1024, name="error cache")
+XML_CACHE = AsyncLRUCache(Config.XML_CACHE_MAX_MB * 1024 * 1024, name="XML cache")
+AI_CACHE = AsyncLRUCache(Config.AI_CACHE_MAX_MB * 1024 * 1024, name="AI cache")
+AI_INSPECTIONS: Dict[str, Dict[str, Any]] = collections.OrderedDict()  # AI job id -> request and progress
+LIVE_RQRS: Dict[str, RqrsTable] = {}  # Tables still being filled by a running scan, for /get_rqrs_stream
 file_processor = FileProcessor()
 progress_tracker = ProgressTracker()
 
@@ -387,34 +472,350 @@ progress_tracker = ProgressTracker()
 # Core Functions
 ################################
 
-async def parse_log_file(log: str) -> Dict[str, Any]:
-    if (cached := await LOG_CACHE.get(log)) is not None:
-        return cached
-
+async def parse_log_file(log: str, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    RQ/RS entries of a log.  A cached result (or ``previous``) is returned
+    as-is while the file is unchanged and extended from its checkpoint when
+    the file only grew; truncated or rotated files are parsed from scratch.
+    """
     filepath = os.path.join(Config.LOG_DIR, log)
     
     try:
+        cached = previous if previous is not None else await LOG_CACHE.get(log)
+        from_store = False
+        if cached is None and (stored := await load_stored_result(log, "rqrs")) is not None:
+            cached, from_store = rqrs_from_payload(stored[1]), True
+        if cached is not None:
+            state = checkpoint_state(filepath, cached.get("metadata", {}).get("checkpoint"),
+                                     file_fingerprint(filepath))
+            if state == "unchanged":
+                if from_store:
+                    logger.info(f"💾 Loaded stored RQ/RS result for {log}")
+                    await LOG_CACHE.set(log, cached, cost=cached["metadata"].get("processing_time", 0))
+                return cached
+            if state == "appended":
+                checkpoint = cached["metadata"]["checkpoint"]
+                logger.info(f"🔁 Resuming {log} from byte {checkpoint['offset']:,} (line {checkpoint['line']:,})")
+                return (await scan_log_features(log, want_rqrs=True, want_errors=False, resume_from=cached))["rqrs"]
+            logger.info(f"♻️ {log} was truncated or replaced, parsing it again")
+
         file_size = os.path.getsize(filepath)
-        if file_size <= Config.LARGE_FILE_THRESHOLD_MB * 1024 * 1024:
-            logger.info(f"🔬 Processing {log} as normal file ({file_size/1024/1024:.2f} MB)")
-            result = await process_file_normal(filepath, log)
-        else:
-            logger.info(f"🔬 Processing {log} as large file ({file_size/1024/1024:.2f} MB)")
-            result = await process_large_file_chunked(filepath, log)
-        
-        # Standardize the response format
-        if "rqrs" not in result:
-            standardized_result = {"rqrs": result.get("entries", [])}
-        else:
-            standardized_result = result
-            
-        await LOG_CACHE.set(log, standardized_result)
-        return standardized_result
+        if Config.PARALLEL_PARSE_ENABLED and file_size > Config.PARALLEL_THRESHOLD_MB * 1024 * 1024:
+            logger.info(f"🔬 Processing {log} as parallel file ({file_size/1024/1024:.2f} MB)")
+            result = await process_large_file_parallel(filepath, log)
+            await LOG_CACHE.set(log, result, cost=result["metadata"]["processing_time"])
+            checkpoint = result["metadata"]["checkpoint"]
+            await save_stored_result(log, "rqrs", (checkpoint["inode"], checkpoint["size"], checkpoint["mtime_ns"]),
+                                     rqrs_to_payload(result))
+            return result
+
+        logger.info(f"🔬 Processing {log} in a single scan ({file_size/1024/1024:.2f} MB)")
+        want_errors = await get_cached_errors(log) is None
+        return (await scan_log_features(log, want_rqrs=True, want_errors=want_errors))["rqrs"]
         
     except Exception as e:
         logger.error(f"Failed to process {log}: {str(e)}")
         return {"rqrs": []}  # Always return valid format
 
+def parse_result_is_current(log: str, result: Optional[Dict[str, Any]]) -> bool:
+    """Whether a parse result still describes the file exactly as it is on disk"""
+    checkpoint = (result or {}).get("metadata", {}).get("checkpoint")
+    if not checkpoint:
+        return True  # failed parses carry no checkpoint; keep the old behaviour
+    try:
+        fingerprint = file_fingerprint(os.path.join(Config.LOG_DIR, log))
+    except OSError:
+        return True
+    return (checkpoint["inode"], checkpoint["size"], checkpoint["mtime_ns"]) == fingerprint
+
+def rqrs_response(log: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a cached RQ/RS result to the JSON shape clients expect (previews read from the log)"""
+    entries = result.get("rqrs")
+    if isinstance(entries, RqrsTable):
+        # Latency sketches are served by /rqrs_latency
+        return {**{k: v for k, v in result.items() if k != "latency"},
+                "rqrs": entries.to_dicts(os.path.join(Config.LOG_DIR, log))}
+    return result
+
+def rqrs_page(log: str, entries: RqrsTable, filters: Dict[str, Any], sort: str = "line",
+              descending: bool = False, cursor: Optional[str] = None,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+    """Filtered, sorted page of an RQ/RS table in the JSON shape of ``/get_rqrs`` (previews read from the log)"""
+    rows = select_rows(entries, **filters)
+    page, next_cursor = page_rows(entries, rows, sort, descending, cursor, limit)
+    return {
+        "rqrs": entries.to_dicts(os.path.join(Config.LOG_DIR, log), rows=page),
+        "total": len(rows),
+        "next_cursor": next_cursor
+    }
+
+def rqrs_live_batch(log: str, entries: RqrsTable, filters: Dict[str, Any], from_line: int,
+                    limit: Optional[int] = None) -> tuple:
+    """
+    NDJSON lines of the matching entries at or after ``from_line`` among the
+    rows a scan has finished appending so far.  Returns ``(chunk, count,
+    next_from_line, last_line_sent)``; progress is tracked by line number so
+    it carries over to a different table of the same file.
+    """
+    ready = entries.ready_count()
+    rows = select_rows(entries, **{**filters, "line_from": max(from_line, filters.get("line_from") or 1)}, stop=ready)
+    if limit is not None:
+        rows = rows[:limit]
+    chunk = "".join(json.dumps(entry) + "\n"
+                    for entry in entries.to_dicts(os.path.join(Config.LOG_DIR, log), rows=rows))
+    next_from_line = entries.line[ready - 1] + 1 if ready else from_line
+    return chunk, len(rows), max(next_from_line, from_line), entries.line[rows[-1]] if rows else None
+
+def describe_cached_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe view of a cached RQ/RS result for the debug endpoints (no previews)"""
+    entries = result.get("rqrs")
+    if isinstance(entries, RqrsTable):
+        return {**result, "rqrs": list(entries.iter_rows())}
+    return result
+
+async def find_rqrs_span(log: str, line_number: int) -> Optional[tuple]:
+    """
+    ``(start, end, fingerprint)`` of the XML payload starting at
+    ``line_number``: its byte range, taken from the cached RQ/RS table, and
+    the fingerprint of the file that table was parsed from.  None when the
+    log is not cached, has no payload there, or changed in a way that may
+    have moved it.
+    """
+    result = await LOG_CACHE.get(log)
+    entries = (result or {}).get("rqrs")
+    if not isinstance(entries, RqrsTable):
+        return None
+    row = entries.find_line(line_number)
+    if row is None:
+        return None
+    start, end = entries.span_start[row], entries.span_end[row]
+    checkpoint = result["metadata"].get("checkpoint")
+    if not checkpoint:
+        return None
+    if not parse_result_is_current(log, result):
+        # A grown log keeps every byte before its checkpoint; anything else may have moved
+        filepath = os.path.join(Config.LOG_DIR, log)
+        try:
+            state = checkpoint_state(filepath, checkpoint, file_fingerprint(filepath))
+        except OSError:
+            return None
+        if state != "appended" or end > checkpoint["offset"]:
+            return None
+    return start, end, (checkpoint["inode"], checkpoint["size"], checkpoint["mtime_ns"])
+
+def rqrs_to_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {**result, "rqrs": result["rqrs"].to_state()}
+
+def rqrs_from_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {**payload, "rqrs": RqrsTable.from_state(payload["rqrs"])}
+
+async def get_cached_errors(log: str) -> Optional[Dict[str, Any]]:
+    """Cached (or stored) error scan of a log, as long as the file has not changed since"""
+    cached = await ERROR_CACHE.get(log)
+    if cached is None:
+        stored = await load_stored_result(log, "errors")
+        if stored is None:
+            return None
+        cached = stored[1]
+        cached["fingerprint"] = stored[0]
+        await ERROR_CACHE.set(log, cached)
+    try:
+        if cached["fingerprint"] == file_fingerprint(os.path.join(Config.LOG_DIR, log)):
+            return cached
+    except OSError:
+        pass
+    await ERROR_CACHE.invalidate(log)
+    return None
+
+async def load_stored_result(log: str, kind: str) -> Optional[tuple]:
+    """``(fingerprint, payload)`` from the persistent result store, if any"""
+    if not Config.RESULT_STORE_ENABLED:
+        return None
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, RESULT_STORE.load, log, kind)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"⚠️ Result store read failed for {log} ({kind}): {e}")
+        return None
+
+async def save_stored_result(log: str, kind: str, fingerprint: tuple, payload: Dict[str, Any]) -> None:
+    if not Config.RESULT_STORE_ENABLED:
+        return
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, RESULT_STORE.save, log, kind, fingerprint, payload)
+    except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+        logger.warning(f"⚠️ Result store write failed for {log} ({kind}): {e}")
+
+async def handle_log_change(log: str, change: str):
+    """
+    Drop what a log change made stale.  A log that only grew keeps its RQ/RS
+    result (it is resumed from its checkpoint on the next request); anything
+    else loses every cached result, its line index and its stored results.
+    """
+    was_cached = log in LOG_CACHE.entries
+    await ERROR_CACHE.invalidate(log)
+    for key in [key for key, entry in AI_CACHE.entries.items() if log in entry.value["fingerprints"]]:
+        await AI_CACHE.invalidate(key)
+    if change != "appended":
+        await LOG_CACHE.invalidate(log)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, invalidate_line_index, os.path.join(Config.LOG_DIR, log), Config.INDEX_DIR)
+        await loop.run_in_executor(None, invalidate_level_index, os.path.join(Config.LOG_DIR, log), Config.INDEX_DIR)
+        await loop.run_in_executor(None, invalidate_time_index, os.path.join(Config.LOG_DIR, log), Config.INDEX_DIR)
+        if Config.RESULT_STORE_ENABLED:
+            try:
+                await loop.run_in_executor(None, RESULT_STORE.delete, log)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"⚠️ Result store delete failed for {log}: {e}")
+    logger.info(f"👀 {log} was {change}" + ("; cached results invalidated" if change != "appended" else ""))
+
+    if Config.WATCH_REPARSE_CHANGED and was_cached and change != "deleted":
+        asyncio.create_task(file_processor.process_file(log, Priority.BACKGROUND_PRELOAD))
+
+def start_log_watcher(loop: asyncio.AbstractEventLoop) -> LogWatcher:
+    """Watch Config.LOG_DIR and handle its changes on ``loop``"""
+    def on_change(log: str, change: str):
+        loop.call_soon_threadsafe(lambda: asyncio.ensure_future(handle_log_change(log, change)))
+
+    watcher = LogWatcher(
+        Config.LOG_DIR, on_change,
+        poll_interval=Config.WATCH_POLL_SECONDS,
+        use_inotify=Config.WATCH_USE_INOTIFY,
+        ignore=lambda name: name.startswith(".") or is_compressed_file(name)
+    )
+    watcher.start()
+    return watcher
+
+def prune_result_store():
+    """Drop stored results of logs that were deleted, rotated or truncated"""
+    try:
+        RESULT_STORE.prune(Config.LOG_DIR)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"⚠️ Result store prune failed: {e}")
+
+def summarize_rqrs(entries: RqrsTable) -> Dict[str, Any]:
+    """Pair every RQ with its RS and sketch their latencies (JSON-safe, stored with the result)"""
+    entries.pair_messages()
+    sketches = latency_sketches(entries)
+    return {
+        "pairs": sketches["pairs"],
+        "unpaired": sketches["unpaired"],
+        "overall": sketches["overall"].to_state(),
+        "by_service": {name: sketch.to_state() for name, sketch in sketches["by_service"].items()},
+        "by_tag": {name: sketch.to_state() for name, sketch in sketches["by_tag"].items()},
+    }
+
+async def scan_log_features(log: str, want_rqrs: bool = True, want_errors: bool = True,
+                            cache_errors: bool = True,
+                            resume_from: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run a single scanner pass over a log feeding every requested feature, so
+    RQ/RS parsing and the error scan of the same file cost one read.
+
+    ``resume_from`` is an earlier RQ/RS result of the same, grown file: only
+    the bytes after its checkpoint are scanned and the new entries appended.
+    """
+    filepath = os.path.join(Config.LOG_DIR, log)
+    fingerprint = file_fingerprint(filepath)
+    start, first_line, entries = 0, 1, RqrsTable()
+    if resume_from is not None:
+        checkpoint = resume_from["metadata"]["checkpoint"]
+        start, first_line = checkpoint["offset"], checkpoint["line"] + 1
+        # Entries of the checkpointed (possibly still growing) log entry are found again
+        previous = resume_from["rqrs"]
+        entries = previous.head(previous.count_through_line(first_line))
+    kept = len(entries)
+    rqrs = RqrsCollector(entries) if want_rqrs else None
+    errors = ErrorCollector(log) if want_errors else None
+    subscribers = [s for s in (rqrs, errors) if s is not None]
+
+    start_time = time.time()
+    loop = asyncio.get_running_loop()
+    if rqrs is not None:
+        LIVE_RQRS[log] = entries
+    progress = progress_tracker.start(log, "rqrs" if want_rqrs else "errors", fingerprint[1] - start)
+    try:
+        scanner = await loop.run_in_executor(None, functools.partial(
+            run_scan, filepath, subscribers, start, fingerprint[1], first_line, Config.SCAN_MODE, progress))
+    except BaseException as e:
+        progress_tracker.fail(log, progress, "cancelled" if isinstance(e, asyncio.CancelledError) else str(e))
+        raise
+    finally:
+        if LIVE_RQRS.get(log) is entries:
+            del LIVE_RQRS[log]
+    line_count = scanner.line_count
+    latency = await loop.run_in_executor(None, summarize_rqrs, entries) if rqrs is not None else None
+    processing_time = time.time() - start_time
+
+    result = {}
+    if rqrs is not None:
+        logger.info(f"Processed {log} - {line_count} lines, {len(entries)} entries in {processing_time:.2f}s"
+                    + (f" (resumed at byte {start:,}, {len(entries) - kept} new)" if start else ""))
+        result["rqrs"] = {
+            "metadata": {
+                "lines_processed": line_count,
+                "entries_found": len(entries),
+                "processing_time": round(processing_time, 2),
+                "file_size_mb": round(fingerprint[1]/(1024*1024), 2),
+                "bytes_scanned": fingerprint[1] - start,
+                "checkpoint": make_checkpoint(filepath, fingerprint, scanner.resume_offset, scanner.resume_line)
+            },
+            "rqrs": entries,
+            "latency": latency
+        }
+        # Weigh a resumed result by what a full rebuild would cost, not by the resume
+        rebuild_cost = processing_time * fingerprint[1] / max(fingerprint[1] - start, 1)
+        await LOG_CACHE.set(log, result["rqrs"], cost=rebuild_cost)
+        await save_stored_result(log, "rqrs", fingerprint, rqrs_to_payload(result["rqrs"]))
+    if errors is not None:
+        result["errors"] = {
+            "fingerprint": fingerprint,
+            "counts": errors.counts,
+            "errors": errors.errors
+        }
+        if cache_errors:
+            await ERROR_CACHE.set(log, result["errors"], cost=processing_time)
+            await save_stored_result(log, "errors", fingerprint, result["errors"])
+    progress_tracker.complete(log, progress)
+    return result
+
+async def scan_errors_parallel(log: str, cache_errors: bool = True) -> Dict[str, Any]:
+    """
+    Error scan of a log across the process pool, one timestamp-aligned byte
+    range per task.  Cancelling it drops the ranges no worker has started.
+    """
+    filepath = os.path.join(Config.LOG_DIR, log)
+    fingerprint = file_fingerprint(filepath)
+    workers = Config.PARALLEL_WORKERS
+    loop = asyncio.get_running_loop()
+    start_time = time.time()
+
+    parts = plan_range_count(fingerprint[1], workers, Config.ERROR_SCAN_RANGE_MB * 1024 * 1024)
+    ranges = await loop.run_in_executor(None, split_aligned_ranges, filepath, parts)
+    pool = get_process_pool(workers)
+    progress = progress_tracker.start(log, "errors", fingerprint[1])
+
+    async def scan_range(start: int, end: int):
+        range_result = await loop.run_in_executor(
+            pool, scan_errors_range, filepath, log, start, end, Config.SCAN_MODE)
+        progress.bytes_done += end - start
+        progress.lines_done += range_result[2]
+        return range_result
+
+    try:
+        results = await asyncio.gather(*[scan_range(start, end) for start, end in ranges])
+    except BaseException as e:
+        progress_tracker.fail(log, progress, "cancelled" if isinstance(e, asyncio.CancelledError) else str(e))
+        raise
+    counts, errors, _ = merge_error_results(results)
+    progress_tracker.complete(log, progress)
+    processing_time = time.time() - start_time
+
+    result = {"fingerprint": fingerprint, "counts": counts, "errors": errors}
+    if cache_errors:
+        await ERROR_CACHE.set(log, result, cost=processing_time)
+        await save_stored_result(log, "errors", fingerprint, result)
+    return result
+
 async def async_preload_logs():
     """Optimized log preloading that processes all files regardless of size"""
     process = psutil.Process(os.getpid())
@@ -431,45 +832,30 @@ async def async_preload_logs():
         'total_lines': 0
     }
 
-    semaphore = asyncio.Semaphore(2)
-
     async def process_single_file(file: str):
         nonlocal stats
         filepath = os.path.join(Config.LOG_DIR, file)
         
         try:
-            async with semaphore:
-                if not os.path.isfile(filepath):
-                    stats['skipped'] += 1
-                    return
-
-                if await LOG_CACHE.get(file) is not None:
-                    stats['skipped'] += 1
-                    return
+            if not os.path.isfile(filepath):
+                stats['skipped'] += 1
+                return
 
-                file_size = os.path.getsize(filepath) / (1024 * 1024)
-                logger.info(f"🔵 Processing single file {file} ({file_size:.2f} MB)")
+            cached = await LOG_CACHE.get(file)
+            if cached is not None and parse_result_is_current(file, cached):
+                stats['skipped'] += 1
+                return
 
-                if file_size > 50:
-                    logger.info(f"🔵 Processing large file {file} with chunked reading...")
-                    result = await process_large_file_chunked(filepath, file)
-                else:
-                    result = await process_file_normal(filepath, file)
-                
-                stats['processed'] += 1
-                stats['total_entries'] += len(result['entries'])
-                stats['total_lines'] += result['line_count']
-                
-                await LOG_CACHE.set(file, {
-                    "metadata": {
-                        "preloaded": True,
-                        "lines_processed": result['line_count'],
-                        "entries_found": len(result['entries']),
-                        "processing_time": round(time.time() - start_time, 2),
-                        "file_size_mb": round(file_size, 2)
-                    },
-                    "rqrs": result['entries']
-                })
+            # Queued as a background job: it only runs on a free non-reserved slot
+            result = await file_processor.process_file(file, Priority.BACKGROUND_PRELOAD)
+            if result is None or "metadata" not in result:  # the failure was already logged
+                stats['failed'] += 1
+                return
+            result["metadata"]["preloaded"] = True
+            
+            stats['processed'] += 1
+            stats['total_entries'] += len(result['rqrs'])
+            stats['total_lines'] += result['metadata']['lines_processed']
                 
         except Exception as e:
             logger.error(f"🔴 Failed to process {file}: {str(e)}")
@@ -490,191 +876,55 @@ async def async_preload_logs():
     logger.info(f"🔵  Memory usage: {start_mem:.2f} MB → {end_mem:.2f} MB")
     logger.info(f"🔵  Total time: {elapsed:.2f} seconds")
 
-async def process_file_normal(filepath: str, filename: str) -> Dict[str, Any]:
-    """Process normal-sized files with XML marker support"""
-    entries = []
-    line_count = 0
-    previous_line = ""
-    start_time = time.time()
-    xml_marker_found = False
-    xml_buffer = []
-    last_timestamp = ""
-    last_service = "UNKNOWN"
-    xml_start_line = 0
-    
+async def process_large_file_parallel(filepath: str, filename: str) -> Dict[str, Any]:
+    """Process very large files across the process pool, one timestamp-aligned byte range per task"""
+    file_start = time.time()
+    fingerprint = file_fingerprint(filepath)
+    file_size = fingerprint[1]
+    workers = Config.PARALLEL_WORKERS
+    loop = asyncio.get_running_loop()
+
+    parts = plan_range_count(file_size, workers, Config.PARALLEL_MIN_RANGE_MB * 1024 * 1024)
+    ranges = await loop.run_in_executor(None, split_aligned_ranges, filepath, parts)
+    pool = get_process_pool(workers)
+    # Worker processes cannot share a ScanProgress; progress advances as ranges finish
+    progress = progress_tracker.start(filename, "rqrs", file_size)
+
+    async def scan_range(start: int, end: int):
+        range_result = await loop.run_in_executor(pool, scan_rqrs_range, filepath, start, end, Config.SCAN_MODE)
+        progress.bytes_done += end - start
+        progress.lines_done += range_result[1]
+        return range_result
+
     try:
-        async with aiofiles.open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            async for line in f:
-                line_count += 1
-                stripped = line.strip()
-                
-                if not stripped:
-                    continue
-                    
-                # Check for timestamp line
-                if Patterns.TIMESTAMP.match(stripped):
-                    # If we were collecting XML, process it before starting new entry
-                    if xml_buffer:
-                        xml_content = '\n'.join(xml_buffer)
-                        if match := Patterns.RQRS.search(xml_content):
-                            entries.append({
-                                "line": xml_start_line,
-                                "thread": extract_thread_id(last_timestamp),
-                                "service": last_service,
-                                "tag": match.group(1),
-                                "raw": xml_content[:512],  # First 512 chars
-                                "has_issue": bool(Patterns.XML_ERRORS.search(xml_content))
-                            })
-                        xml_buffer = []
-                    
-                    last_timestamp = stripped
-                    last_service = extract_service(stripped)
-                    xml_marker_found = False
-                    
-                    # Check if this line contains an XML marker
-                    if "XML Request:" in stripped or "XML Response:" in stripped:
-                        xml_marker_found = True
-                        xml_start_line = line_count + 1  # Next line will be XML start
-                
-                # Handle XML content collection
-                elif xml_marker_found:
-                    if stripped.startswith("<"):
-                        xml_buffer.append(stripped)
-                    elif xml_buffer:  # If we're in XML and hit non-XML line
-                        # Process the collected XML
-                        xml_content = '\n'.join(xml_buffer)
-                        if match := Patterns.RQRS.search(xml_content):
-                            entries.append({
-                                "line": xml_start_line,
-                                "thread": extract_thread_id(last_timestamp),
-                                "service": last_service,
-                                "tag": match.group(1),
-                                "raw": xml_content[:512],
-                                "has_issue": bool(Patterns.XML_ERRORS.search(xml_content))
-                            })
-                        xml_buffer = []
-                        xml_marker_found = False
-                
-                previous_line = stripped
-            
-            # Process any remaining XML at end of file
-            if xml_buffer:
-                xml_content = '\n'.join(xml_buffer)
-                if match := Patterns.RQRS.search(xml_content):
-                    entries.append({
-                        "line": xml_start_line,
-                        "thread": extract_thread_id(last_timestamp),
-                        "service": last_service,
-                        "tag": match.group(1),
-                        "raw": xml_content[:512],
-                        "has_issue": bool(Patterns.XML_ERRORS.search(xml_content))
-                    })
-        
-        processing_time = time.time() - start_time
-        logger.info(f"Processed {filename} ({line_count} lines, {len(entries)} entries) in {processing_time:.2f}s")
-        
-        return {
-            "entries": entries,
-            "line_count": line_count,
-            "processing_time": processing_time
-        }
-        
-    except Exception as e:
-        logger.error(f"Error processing {filename}: {str(e)}")
+        results = await asyncio.gather(*[scan_range(start, end) for start, end in ranges])
+    except BaseException as e:
+        progress_tracker.fail(filename, progress, "cancelled" if isinstance(e, asyncio.CancelledError) else str(e))
         raise
+    entries, line_count = merge_range_results(results)
+    resume_offset, resume_line = await loop.run_in_executor(
+        None, find_resume_point, filepath, line_count, ranges[-1][1])
+    # Pairs may span range edges, so they are matched on the merged table
+    latency = await loop.run_in_executor(None, summarize_rqrs, entries)
+    progress_tracker.complete(filename, progress)
 
-async def process_large_file_chunked(filepath: str, filename: str) -> Dict[str, Any]:
-    """Process large files with accurate line numbers"""
-    entries = []
-    line_count = 0
-    file_start = time.time()
-    xml_buffer = []
-    xml_marker_found = False
-    xml_start_line = 0
-    last_timestamp = ""
-    last_service = "UNKNOWN"
-    
-    async with aiofiles.open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-        buffer = ""
-        while True:
-            chunk = await f.read(1024 * 1024)  # 1MB chunks
-            if not chunk:
-                break
-                
-            buffer += chunk
-            lines = buffer.splitlines(True)  # Keep line endings
-            
-            # Process complete lines (leave partial line in buffer)
-            for line in lines[:-1]:
-                line_count += 1
-                stripped = line.strip()
-                
-                if Patterns.TIMESTAMP.match(stripped):
-                    # Process any pending XML
-                    if xml_buffer:
-                        xml_content = '\n'.join(xml_buffer)
-                        if match := Patterns.RQRS.search(xml_content):
-                            entries.append({
-                                "line": xml_start_line,
-                                "thread": extract_thread_id(last_timestamp),
-                                "service": last_service,
-                                "tag": match.group(1),
-                                "raw": xml_content[:512],
-                                "has_issue": bool(Patterns.XML_ERRORS.search(xml_content))
-                            })
-                        xml_buffer = []
-                    
-                    last_timestamp = stripped
-                    last_service = extract_service(stripped)
-                    xml_marker_found = False
-                    
-                    if "XML Request:" in stripped or "XML Response:" in stripped:
-                        xml_marker_found = True
-                        xml_start_line = line_count + 1
-                
-                elif xml_marker_found:
-                    if stripped.startswith("<"):
-                        xml_buffer.append(stripped)
-                    elif xml_buffer:
-                        xml_content = '\n'.join(xml_buffer)
-                        if match := Patterns.RQRS.search(xml_content):
-                            entries.append({
-                                "line": xml_start_line,
-                                "thread": extract_thread_id(last_timestamp),
-                                "service": last_service,
-                                "tag": match.group(1),
-                                "raw": xml_content[:512],
-                                "has_issue": bool(Patterns.XML_ERRORS.search(xml_content))
-                            })
-                        xml_buffer = []
-                        xml_marker_found = False
-            
-            buffer = lines[-1]  # Save partial line for next chunk
-            
-    # Process any remaining XML at end of file
-    if xml_buffer:
-        xml_content = '\n'.join(xml_buffer)
-        if match := Patterns.RQRS.search(xml_content):
-            entries.append({
-                "line": xml_start_line,
-                "thread": extract_thread_id(last_timestamp),
-                "service": last_service,
-                "tag": match.group(1),
-                "raw": xml_content[:512],
-                "has_issue": bool(Patterns.XML_ERRORS.search(xml_content))
-            })
-    
     processing_time = time.time() - file_start
-    logger.info(f"Processed {filename} - {line_count} lines, {len(entries)} entries in {processing_time:.2f}s")
-    
+    logger.info(f"Processed {filename} in parallel ({len(ranges)} ranges, {workers} workers) - "
+                f"{line_count} lines, {len(entries)} entries in {processing_time:.2f}s")
+
     return {
         "metadata": {
             "lines_processed": line_count,
             "entries_found": len(entries),
             "processing_time": round(processing_time, 2),
-            "file_size_mb": round(os.path.getsize(filepath)/(1024*1024), 2)
+            "file_size_mb": round(file_size/(1024*1024), 2),
+            "ranges": len(ranges),
+            "workers": workers,
+            "bytes_scanned": file_size,
+            "checkpoint": make_checkpoint(filepath, fingerprint, resume_offset, resume_line)
         },
-        "rqrs": entries
+        "rqrs": entries,
+        "latency": latency
     }
 
 ################################
@@ -1101,13 +1351,159 @@ def abort_scp():
     GlobalState.scp_aborted = True
     return {"status": "Abort requested"}
 
+ERROR_LEVELS = ("FATAL", "ERROR", "WARN")
+
+async def scan_log_errors(file_path: Path, single: bool) -> Dict[str, Any]:
+    """Error scan of one log, from the cache when the file has not changed"""
+    scan = await get_cached_errors(file_path.name)
+    if scan is None:
+        # Piggyback RQ/RS parsing on the same pass when a single log is inspected
+        want_rqrs = single and await LOG_CACHE.get(file_path.name) is None
+        if want_rqrs or not Config.PARALLEL_PARSE_ENABLED:
+            scan = (await scan_log_features(
+                file_path.name, want_rqrs=want_rqrs, cache_errors=single
+            ))["errors"]
+        else:
+            scan = await scan_errors_parallel(file_path.name, cache_errors=single)
+    return scan
+
+async def iter_prefetched(log_files: List[Path], load):
+    """
+    ``(file_path, await load(file_path))`` for each log in order (the
+    exception when it failed).  Up to Config.PARALLEL_WORKERS logs are loaded
+    ahead so small logs keep every worker busy; closing the generator cancels them.
+    """
+    pending = collections.deque()
+    remaining = iter(log_files)
+
+    def schedule():
+        while len(pending) < max(Config.PARALLEL_WORKERS, 1):
+            file_path = next(remaining, None)
+            if file_path is None:
+                return
+            pending.append((file_path, asyncio.ensure_future(load(file_path))))
+
+    try:
+        schedule()
+        while pending:
+            file_path, task = pending.popleft()
+            try:
+                result = await task
+            except Exception as e:
+                result = e
+            schedule()
+            yield file_path, result
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+def pick_level_entries(index: LevelIndex, levels: List[str], after_line: int,
+                       room: Optional[int]) -> tuple:
+    """``(entries, more)``: up to ``room`` indexed lines past ``after_line``, and whether more follow"""
+    entries = index.entries(levels, after_line)
+    if room is None:
+        return list(entries), False
+    picked = list(itertools.islice(entries, room + 1))
+    return picked[:room], len(picked) > room
+
+async def iter_error_analysis(log_files: List[Path], levels: Optional[List[str]],
+                              limit: Optional[int], after: Optional[tuple], window: Optional[tuple] = None):
+    """
+    Paged /analyze_logs over ``log_files`` in name order: per log a ``counts``
+    event followed by its matching rows in ``errors`` batches, then a
+    ``done`` event with the totals and the cursor of the next page.
+
+    Counts and row positions come from the level index of each log, so only
+    the rows of the page are read from disk.  The first page counts every
+    log; later pages (``after`` is the decoded cursor) stop once full.  A
+    time ``window`` (from/to ms) narrows each index to the entries inside.
+    """
+    loop = asyncio.get_running_loop()
+    totals = dict.fromkeys(ERROR_LEVELS, 0)
+    wanted = list(levels or ERROR_LEVELS)
+    after_log, after_line = after if after is not None else (None, 0)
+    sent, last_row, more, stopped, scanned = 0, None, False, False, 0
+    if after_log is not None:
+        log_files = [f for f in log_files if f.name >= after_log]
+    async with aclosing(iter_prefetched(log_files, lambda f: load_window_level_index(f.name, window))) as indexes:
+        async for file_path, index in indexes:
+            name = file_path.name
+            if after is not None and limit is not None and sent >= limit:
+                stopped = True  # the page is full; rows of later logs may follow on the next one
+                break
+            if isinstance(index, Exception):
+                print(f"[WARN] Failed to index {name}: {index}")
+                traceback.print_exception(index)
+                continue
+            scanned += 1
+            counts = index.counts if index is not None else dict.fromkeys(ERROR_LEVELS, 0)
+            for level, count in counts.items():
+                totals[level] += count
+            yield {"type": "counts", "log": name, "counts": counts, "total": dict(totals)}
+            if more or index is None:
+                continue  # the page is full and a following row was seen: only counting goes on
+
+            entries, more = await loop.run_in_executor(None, pick_level_entries, index, wanted,
+                                                       after_line if name == after_log else 0,
+                                                       None if limit is None else limit - sent)
+            for i in range(0, len(entries), Config.ANALYZE_BATCH_ROWS):
+                rows = await loop.run_in_executor(None, index.read_rows, name,
+                                                  entries[i:i + Config.ANALYZE_BATCH_ROWS])
+                yield {"type": "errors", "log": name, "errors": rows}
+                last_row = rows[-1]
+            sent += len(entries)
+
+    yield {
+        "type": "done",
+        "counts": totals,
+        "counts_complete": after is None,
+        "logs_scanned": scanned,
+        "returned": sent,
+        "next_cursor": encode_cursor((last_row["log_file"], last_row["line_number"]))
+                       if (more or stopped) and last_row is not None else None,
+    }
+
 @app.post("/analyze_logs")
 async def analyze_logs(request: Request):
+    """
+    Error counts and rows (FATAL/ERROR/WARN lines) of one log or of every log.
+
+    Without paging options the whole result comes back as one JSON body.
+    ``levels`` (e.g. ``["FATAL", "ERROR"]``), ``limit`` (rows per page) or
+    ``cursor`` (``next_cursor`` of the previous page) switch to paged mode,
+    served from the per-log level indexes, and ``stream: true`` sends the
+    same page as NDJSON events instead.  ``from``/``to`` (e.g.
+    ``2025-06-01T10:00``, to exclusive) keep the entries of a time window,
+    also in paged mode.
+    """
     try:
         data = await request.json()
         mode = data.get("mode")
         specific_log = data.get("log")
-        
+        levels, limit, cursor = data.get("levels"), data.get("limit"), data.get("cursor")
+        stream = bool(data.get("stream"))
+        try:
+            window = parse_time_window(data.get("from"), data.get("to"))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        paged = stream or levels is not None or limit is not None or cursor is not None or window is not None
+
+        if levels is not None:
+            if not isinstance(levels, list) or any(str(level).upper() not in ERROR_LEVELS for level in levels):
+                return JSONResponse({"error": f"levels must be a list of: {', '.join(ERROR_LEVELS)}"},
+                                    status_code=400)
+            levels = [str(level).upper() for level in levels]
+        if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+            return JSONResponse({"error": "limit must be a positive integer."}, status_code=400)
+        after = None
+        if cursor is not None:
+            try:
+                after = decode_cursor(str(cursor))
+            except ValueError as e:
+                return JSONResponse({"error": str(e)}, status_code=400)
+            if not isinstance(after[0], str):
+                return JSONResponse({"error": f"Invalid cursor: {cursor!r}"}, status_code=400)
+
         log_dir = Path(Config.LOG_DIR)
         error_counts = {"FATAL": 0, "ERROR": 0, "WARN": 0}
         error_details = []
@@ -1122,38 +1518,33 @@ async def analyze_logs(request: Request):
                 return JSONResponse({"error": f"File '{specific_log}' not found."}, status_code=400)
             log_files = [specific_path]
 
-        for file_path in log_files:
-            try:
-                with file_path.open("r", encoding="utf-8", errors="ignore") as f:
-                    for line_number, line in enumerate(f, 1):
-                        if any(x in line for x in ["[FATAL]", "[ERROR]", "[WARN]"]):
-                            level = None
-                            for lvl in ["FATAL", "ERROR", "WARN"]:
-                                if f"[{lvl}]" in line:
-                                    level = lvl
-                                    error_counts[level] += 1
-                                    break
-
-                            thread_match = re.findall(r"\[([^\[\]]*)\]", line)
-                            thread_id = thread_match[1] if len(thread_match) > 1 else "N/A"
-
-                            service = "N/A"
-                            for val in thread_match:
-                                if "." in val:
-                                    service = val.split(".")[-1]
-                                    break
-
-                            error_details.append({
-                                "log_file": file_path.name,
-                                "line_number": line_number,
-                                "thread_id": thread_id,
-                                "service": service,
-                                "error_message": line.strip()
-                            })
-            except Exception as file_error:
-                print(f"[WARN] Failed to scan {file_path.name}: {file_error}")
-                traceback.print_exc()
-                continue
+        if paged:
+            events = iter_error_analysis(sorted(log_files, key=lambda f: f.name), levels, limit, after, window)
+            if stream:
+                async def generate():
+                    try:
+                        async for event in events:
+                            yield json.dumps(event) + "\n"
+                    except Exception as e:
+                        logger.error(f"analyze_logs stream failed: {e}")
+                        yield json.dumps({"type": "error", "error": "Internal Server Error"}) + "\n"
+                return StreamingResponse(generate(), media_type="application/x-ndjson",
+                                         headers={"Cache-Control": "no-cache"})
+            async for event in events:
+                if event["type"] == "errors":
+                    error_details.extend(event["errors"])
+                elif event["type"] == "done":
+                    return {"errors": error_details, **{k: v for k, v in event.items() if k != "type"}}
+
+        async with aclosing(iter_prefetched(log_files, lambda f: scan_log_errors(f, mode != "all"))) as scans:
+            async for file_path, scan in scans:
+                if isinstance(scan, Exception):
+                    print(f"[WARN] Failed to scan {file_path.name}: {scan}")
+                    traceback.print_exception(scan)
+                    continue
+                for level, count in scan["counts"].items():
+                    error_counts[level] += count
+                error_details.extend(scan["errors"])
 
         return {
             "counts": error_counts,
@@ -1173,39 +1564,200 @@ async def get_rqrs(log: str):
         result = await file_processor.process_file(log, Priority.USER_REQUEST)
         if result is None:
             raise HTTPException(500, detail="Processing failed")
-        return result
+        return await asyncio.get_running_loop().run_in_executor(None, rqrs_response, log, result)
     except asyncio.CancelledError:
         raise HTTPException(503, detail="Service unavailable, please retry")
     except Exception as e:
         raise HTTPException(500, detail=str(e))
 
+def rqrs_filters(tag: Optional[str], service: Optional[str], thread: Optional[str],
+                 has_issue: Optional[bool], line_from: Optional[int], line_to: Optional[int]) -> Dict[str, Any]:
+    return {"tag": tag, "service": service, "thread": thread, "has_issue": has_issue,
+            "line_from": line_from, "line_to": line_to}
+
+def check_rqrs_order(sort: str, order: str, cursor: Optional[str]) -> None:
+    if sort not in SORT_KEYS:
+        raise HTTPException(400, detail=f"sort must be one of: {', '.join(SORT_KEYS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(400, detail="order must be 'asc' or 'desc'")
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(400, detail=str(e))
+
+@app.get("/get_rqrs_page")
+async def get_rqrs_page(log: str, tag: Optional[str] = None, service: Optional[str] = None,
+                        thread: Optional[str] = None, has_issue: Optional[bool] = None,
+                        line_from: Optional[int] = None, line_to: Optional[int] = None,
+                        sort: str = "line", order: str = "asc", cursor: Optional[str] = None,
+                        limit: int = Query(Config.RQRS_PAGE_SIZE, ge=1)):
+    """
+    One page of RQ/RS entries, filtered and sorted on the server.
+    Text filters are case-insensitive substrings; pass ``next_cursor`` of
+    the response as ``cursor`` to get the following page.
+    """
+    check_rqrs_order(sort, order, cursor)
+    result = await file_processor.process_file(log, Priority.USER_REQUEST)
+    if result is None or not isinstance(result.get("rqrs"), RqrsTable):
+        raise HTTPException(500, detail="Processing failed")
+    try:
+        page = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            rqrs_page, log, result["rqrs"], rqrs_filters(tag, service, thread, has_issue, line_from, line_to),
+            sort, order == "desc", cursor, limit))
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+    return {"metadata": result.get("metadata", {}), **page}
+
+@app.get("/rqrs_latency")
+async def rqrs_latency(log: str, quantiles: str = Config.LATENCY_QUANTILES):
+    """
+    RQ→RS latency percentiles of a log in milliseconds: overall, per service
+    and per response tag, slowest (by the last requested quantile) first.
+    Percentiles come from quantile sketches, accurate to about 1%.
+    """
+    try:
+        wanted = [float(q) for q in quantiles.split(",") if q.strip()]
+    except ValueError:
+        raise HTTPException(400, detail=f"Invalid quantiles: {quantiles}")
+    if not wanted or any(not 0 <= q <= 1 for q in wanted):
+        raise HTTPException(400, detail="Quantiles must be between 0 and 1")
+
+    result = await file_processor.process_file(log, Priority.USER_REQUEST)
+    if result is None or not isinstance(result.get("rqrs"), RqrsTable):
+        raise HTTPException(500, detail="Processing failed")
+    latency = result.get("latency")
+    if latency is None:  # stored before RQs and RSs were paired
+        latency = result["latency"] = await asyncio.get_running_loop().run_in_executor(
+            None, summarize_rqrs, result["rqrs"])
+
+    slowest_key = f"p{wanted[-1] * 100:g}"
+    def groups(states: Dict[str, Any]) -> Dict[str, Any]:
+        stats = {name: QuantileSketch.from_state(state).summary(wanted) for name, state in states.items()}
+        return dict(sorted(stats.items(), key=lambda item: -(item[1][slowest_key] or 0)))
+
+    return {
+        "metadata": result.get("metadata", {}),
+        "unit": "ms",
+        "pairs": latency["pairs"],
+        "unpaired": latency["unpaired"],
+        "overall": QuantileSketch.from_state(latency["overall"]).summary(wanted),
+        "by_service": groups(latency["by_service"]),
+        "by_tag": groups(latency["by_tag"]),
+    }
+
+@app.get("/get_rqrs_stream")
+async def get_rqrs_stream(log: str, tag: Optional[str] = None, service: Optional[str] = None,
+                          thread: Optional[str] = None, has_issue: Optional[bool] = None,
+                          line_from: Optional[int] = None, line_to: Optional[int] = None,
+                          sort: str = "line", order: str = "asc", cursor: Optional[str] = None,
+                          limit: Optional[int] = Query(None, ge=1)):
+    """
+    RQ/RS entries as NDJSON: one entry per line, then a ``{"done": true}``
+    summary line with the metadata and the next cursor.
+
+    In line order the entries of a parse still in progress are sent as soon
+    as the scan finds them; other orders need the complete table and are sent
+    once parsing is done.
+    """
+    check_rqrs_order(sort, order, cursor)
+    if not os.path.isfile(os.path.join(Config.LOG_DIR, log)):
+        raise HTTPException(404, detail="Log file not found")
+    filters = rqrs_filters(tag, service, thread, has_issue, line_from, line_to)
+    live = sort == "line" and order == "asc"
+    loop = asyncio.get_running_loop()
+
+    async def generate():
+        task = asyncio.create_task(file_processor.process_file(log, Priority.USER_REQUEST))
+        sent, last_line, next_cursor = 0, None, None
+        from_line = decode_cursor(cursor)[1] + 1 if cursor and live else 1
+        try:
+            while live and not task.done():
+                entries = LIVE_RQRS.get(log)
+                if entries is not None:
+                    chunk, count, from_line, batch_last = await loop.run_in_executor(None, functools.partial(
+                        rqrs_live_batch, log, entries, filters, from_line, None if limit is None else limit - sent))
+                    sent, last_line = sent + count, batch_last or last_line
+                    if chunk:
+                        yield chunk
+                    if limit is not None and sent >= limit:
+                        # The page is full; the parse goes on in the background
+                        yield json.dumps({"done": True, "count": sent, "in_progress": True,
+                                          "next_cursor": encode_cursor((last_line, last_line))}) + "\n"
+                        return
+                await asyncio.wait({task}, timeout=Config.RQRS_STREAM_POLL_SECONDS)
+
+            result = await task
+            if result is None or not isinstance(result.get("rqrs"), RqrsTable):
+                yield json.dumps({"error": "Processing failed", "code": 500}) + "\n"
+                return
+            entries = result["rqrs"]
+            if live:
+                if limit is None or sent < limit:
+                    chunk, count, _, batch_last = await loop.run_in_executor(None, functools.partial(
+                        rqrs_live_batch, log, entries, filters, from_line, None if limit is None else limit - sent))
+                    sent, last_line = sent + count, batch_last or last_line
+                    if chunk:
+                        yield chunk
+                if limit is not None and sent >= limit:
+                    next_cursor = encode_cursor((last_line, last_line))
+            else:
+                page = await loop.run_in_executor(None, functools.partial(
+                    rqrs_page, log, entries, filters, sort, order == "desc", cursor, limit))
+                sent, next_cursor = len(page["rqrs"]), page["next_cursor"]
+                if page["rqrs"]:
+                    yield "".join(json.dumps(entry) + "\n" for entry in page["rqrs"])
+            yield json.dumps({"done": True, "count": sent, "in_progress": False, "next_cursor": next_cursor,
+                              "metadata": result.get("metadata", {})}) + "\n"
+        except ValueError as e:
+            yield json.dumps({"error": str(e), "code": 400}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache"})
+
 @app.get("/file_status/{filename}")
 async def get_file_status(filename: str):
     status = await file_processor.get_status(filename)
     return {
         "filename": filename,
         "status": status.value,
-        "is_ready": status == FileStatus.COMPLETE
+        "is_ready": status == FileStatus.COMPLETE,
+        "progress": progress_tracker.get_progress(filename)
     }
 
 @app.get("/get_progress")
 async def get_progress(filename: str) -> dict:
-    """Check progress of background processing"""
+    """Bytes/lines scanned, throughput and ETA of the current (or last) scan of a log"""
     progress = progress_tracker.get_progress(filename)
     if not progress:
         raise HTTPException(404, detail="No such task or task completed")
     return {
-        "status": "processing" if filename in file_processor.active_tasks else "ready",
-        "filename": filename,
-        "in_cache": filename in file_processor.results
+        **progress,
+        "in_cache": filename in LOG_CACHE.entries
     }
 
 @app.get("/parse_progress")
 async def get_parse_progress(log: str):
     """Check progress of parsing"""
-    if log in progress_tracker.active_tasks:
-        return progress_tracker.active_tasks[log]
-    return {"status": "not_found"}
+    return progress_tracker.get_progress(log) or {"status": "not_found"}
+
+@app.get("/progress_stream")
+async def progress_stream(filename: str):
+    """Server-sent progress updates of a log's scan until it completes or fails"""
+    async def event_stream():
+        last_sent = None
+        while True:
+            progress = progress_tracker.get_progress(filename)
+            if progress is None:
+                yield f"data: {json.dumps({'filename': filename, 'status': 'not_found'})}\n\n"
+                break
+            if progress != last_sent:
+                yield f"data: {json.dumps(progress)}\n\n"
+                last_sent = progress
+            if progress["status"] != "processing":
+                break
+            await asyncio.sleep(Config.PROGRESS_INTERVAL_SECONDS)
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/get_log_context")
 async def get_log_context(log_file: str, line_number: int):
@@ -1216,18 +1768,14 @@ async def get_log_context(log_file: str, line_number: int):
 
     try:
         line_number = int(line_number)
-        start = max(0, line_number - 11)
-        end = line_number + 10
+        start = max(1, line_number - 10)
+        end = line_number + 11
 
-        lines = []
-        with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-            for i, line in enumerate(f):
-                if i < start:
-                    continue
-                if i > end:
-                    break
-                prefix = f"{i+1:>6}: "
-                lines.append(prefix + line.rstrip())
+        index = await load_line_index(log_path)
+        lines = [
+            f"{start + i:>6}: " + line.rstrip()
+            for i, line in enumerate(index.read_lines(start, end))
+        ]
 
         return PlainTextResponse("\n".join(lines))
 
@@ -1245,123 +1793,188 @@ async def get_log_context(log: str, line: int):
     context_lines = []
 
     try:
-        with log_path.open("r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-
-        start_index = max(0, line - 1)
-
-        while start_index > 0:
-            if re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},", lines[start_index]):
+        index = await load_line_index(log_path)
+        if line < 1 or line > index.line_count:
+            raise HTTPException(status_code=400, detail=f"Line number {line} out of range")
+
+        # Walk back to the timestamp line that opens this entry
+        start_line, start_text = 1, index.read_line(1)
+        for line_no, text in index.iter_lines_backward(line):
+            if Patterns.TIMESTAMP.match(text):
+                start_line, start_text = line_no, text
                 break
-            start_index -= 1
 
-        context_lines.append(lines[start_index].rstrip())
+        context_lines.append(start_text.rstrip())
 
-        for i in range(start_index + 1, len(lines)):
-            if re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2},", lines[i]):
+        for line_no, text in index.iter_lines(start_line + 1):
+            if Patterns.TIMESTAMP.match(text):
                 break
-            context_lines.append(lines[i].rstrip())
+            context_lines.append(text.rstrip())
 
         return {"lines": context_lines}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_levels(levels: str) -> List[str]:
+    wanted = [level.strip().upper() for level in levels.split(",") if level.strip()]
+    if not wanted or any(level not in ERROR_LEVELS for level in wanted):
+        raise HTTPException(400, detail=f"levels must be a comma-separated list of: {', '.join(ERROR_LEVELS)}")
+    return wanted
+
+@app.get("/level_counts")
+async def level_counts(log: str):
+    """FATAL/ERROR/WARN counts of a log, from its level index (built on first use)"""
+    if not os.path.isfile(os.path.join(Config.LOG_DIR, log)):
+        raise HTTPException(404, detail="Log file not found")
+    index = await load_level_index(log)
+    return {"log": log, "counts": index.counts, "size": index.fingerprint[1]}
+
+@app.get("/next_level_line")
+async def next_level_line(log: str, line: int, levels: str = "FATAL,ERROR", direction: str = "next"):
+    """
+    Number of the closest line after (``direction=next``) or before
+    (``direction=prev``) ``line`` carrying one of ``levels``; null when none.
+    """
+    if direction not in ("next", "prev"):
+        raise HTTPException(400, detail="direction must be 'next' or 'prev'")
+    wanted = parse_levels(levels)
+    if not os.path.isfile(os.path.join(Config.LOG_DIR, log)):
+        raise HTTPException(404, detail="Log file not found")
+    index = await load_level_index(log)
+    return {"log": log, "line_number": index.next_line(line, wanted, backward=direction == "prev")}
+
+XML_VIEWS = ("full", "truncated", "collapsed")
+
+def format_rqrs_xml(full_xml: str, view: str, limit: int) -> Dict[str, Any]:
+    """Pretty-print a payload for the XML viewer (runs in a worker thread)"""
+    if view == "truncated":
+        formatted = pretty_print_xml(full_xml, max_chars=limit)
+        formatted["raw_xml"] = full_xml[:limit]
+    else:
+        formatted = pretty_print_xml(full_xml, collapse_depth=limit if view == "collapsed" else None)
+        formatted["raw_xml"] = full_xml
+    formatted["size"] = len(full_xml)
+    return formatted
+
 @app.get("/get_rqrs_content")
-async def get_rqrs_content(log: str, line_number: int, tag: str):
+async def get_rqrs_content(log: str, line_number: int, tag: str, view: str = "full",
+                           max_chars: Optional[int] = None, depth: Optional[int] = None):
+    """
+    The XML payload starting at ``line_number``, pretty-printed.  ``view``
+    "truncated" cuts it at ``max_chars`` characters; "collapsed" hides the
+    elements nested deeper than ``depth``.  Formatted payloads are memoized
+    per (file fingerprint, start offset, view).
+    """
     log_path = os.path.join(Config.LOG_DIR, log)
     if not os.path.exists(log_path):
         return JSONResponse({"error": "Log file not found"}, status_code=404)
+    if view not in XML_VIEWS:
+        return JSONResponse({"error": f"Unknown view {view!r}, expected one of {', '.join(XML_VIEWS)}"},
+                            status_code=400)
+    if view == "truncated":
+        limit = max(1, max_chars or Config.XML_TRUNCATED_VIEW_CHARS)
+    elif view == "collapsed":
+        limit = max(0, depth if depth is not None else Config.XML_COLLAPSED_VIEW_DEPTH)
+    else:
+        limit = 0
 
     try:
-        with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = [line.strip() for line in f.readlines()]
-            
-            # Convert to 0-based index
-            line_idx = line_number - 1
-            
+        # The parser recorded where every payload lives: read just those bytes
+        index = None
+        span = await find_rqrs_span(log, line_number)
+        if span is not None:
+            start, fingerprint = span[0], span[2]
+        else:
+            index = await load_line_index(log_path)
             # Safety check
-            if line_idx < 0 or line_idx >= len(lines):
+            if line_number < 1 or line_number > index.line_count:
                 return JSONResponse(
                     {"error": f"Line number {line_number} out of range"},
                     status_code=400
                 )
-            
+            start, fingerprint = index.offset_of(line_number), index.fingerprint
+
+        cache_key = f"{log}:{':'.join(map(str, fingerprint))}:{start}:{tag}:{view}:{limit}"
+        cached = await XML_CACHE.get(cache_key)
+        if cached is not None:
+            return JSONResponse(cached)
+        started = time.time()
+
+        xml_lines = None
+        if span is not None:
+            xml_lines = await asyncio.get_running_loop().run_in_executor(
+                None, read_span_lines, log_path, span[0], span[1])
+            if not any(f"<{tag}" in text for text in xml_lines):
+                xml_lines = None
+        
+        if xml_lines is None:
+            # Not parsed yet (or changed since): search the log around the line
+            if index is None:
+                index = await load_line_index(log_path)
+        
             # Get the XML content starting from the specified line
             xml_lines = []
             closing_tag = f"</{tag}>"
             found_closing = False
-            
+        
             # Search forward to find the complete XML content
-            for i in range(line_idx, len(lines)):
-                xml_lines.append(lines[i])
-                if closing_tag in lines[i]:
+            for _, text in index.iter_lines(line_number):
+                text = text.strip()
+                xml_lines.append(text)
+                if closing_tag in text:
                     found_closing = True
                     break
-            
+        
             if not found_closing:
                 # If closing tag not found, search backward (for cases where XML might start before the marker)
-                for i in range(line_idx - 1, -1, -1):
-                    if f"<{tag}" in lines[i]:
+                for i, text in index.iter_lines_backward(line_number - 1):
+                    if f"<{tag}" in text:
                         # Found opening tag, now search forward from here
                         xml_lines = []
-                        for j in range(i, len(lines)):
-                            xml_lines.append(lines[j])
-                            if closing_tag in lines[j]:
+                        for _, forward in index.iter_lines(i):
+                            forward = forward.strip()
+                            xml_lines.append(forward)
+                            if closing_tag in forward:
                                 found_closing = True
                                 break
                         if found_closing:
-                            line_number = i + 1  # Update the line number to the actual start
+                            line_number = i  # Update the line number to the actual start
                         break
-            
+        
             if not found_closing:
                 return JSONResponse(
                     {"error": f"Closing tag {closing_tag} not found in the log file"},
                     status_code=400
                 )
-            
-            full_xml = '\n'.join(xml_lines)
-            
-            # Verify the tag matches
-            if not (full_xml.startswith(f"<{tag}") or not full_xml.endswith(f"</{tag}>")):
-                return JSONResponse(
-                    {"error": f"Invalid XML structure for tag {tag}"},
-                    status_code=400
-                )
-            
-            # Try to pretty-print the XML
-            try:
-                # First try with xml.etree.ElementTree
-                parser = ET.XMLParser(encoding="utf-8")
-                root = ET.fromstring(full_xml, parser=parser)
-                ET.indent(root, space="  ", level=0)
-                pretty_xml = ET.tostring(root, encoding="unicode", method="xml")
-                
-                return JSONResponse({
-                    "pretty_xml": pretty_xml,
-                    "raw_xml": full_xml,
-                    "actual_start_line": line_number,
-                    "actual_end_line": line_number + len(xml_lines) - 1,
-                    "status": "success"
-                })
-            except ET.ParseError as e:
-                # If ET fails, try with minidom as fallback
-                try:
-                    dom = minidom.parseString(full_xml)
-                    pretty_xml = dom.toprettyxml(indent="  ")
-                    return JSONResponse({
-                        "pretty_xml": pretty_xml,
-                        "raw_xml": full_xml,
-                        "actual_start_line": line_number,
-                        "actual_end_line": line_number + len(xml_lines) - 1,
-                        "status": "success"
-                    })
-                except Exception as dom_error:
-                    return JSONResponse({
-                        "error": f"XML parsing failed with both parsers: {str(e)} and {str(dom_error)}",
-                        "raw_xml": full_xml,
-                        "status": "partial_success"
-                    }, status_code=200)
+        
+        full_xml = '\n'.join(xml_lines)
+        
+        # Verify the tag matches
+        if not (full_xml.startswith(f"<{tag}") or not full_xml.endswith(f"</{tag}>")):
+            return JSONResponse(
+                {"error": f"Invalid XML structure for tag {tag}"},
+                status_code=400
+            )
+        
+        # Stream-format the payload off the event loop; no tree is built, so
+        # multi-megabyte responses and malformed XML are both fine
+        formatted = await asyncio.get_running_loop().run_in_executor(
+            None, format_rqrs_xml, full_xml, view, limit)
+        response = {
+            **formatted,
+            "view": view,
+            "actual_start_line": line_number,
+            "actual_end_line": line_number + len(xml_lines) - 1,
+            "status": "success"
+        }
+        if formatted["balanced"] is False:
+            response["status"] = "partial_success"
+            response["warning"] = "XML is malformed or cut off; formatted as far as it goes"
+        await XML_CACHE.set(cache_key, response, cost=time.time() - started)
+        return JSONResponse(response)
 
     except Exception as e:
         logger.error(f"File processing failed: {str(e)}")
@@ -1389,6 +2002,11 @@ async def search_logs(req: SearchRequest):
     files_with_matches = set()
 
     try:
+        try:
+            window = parse_time_window(req.from_time, req.to_time)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
         if search_mode == 'all':
             files_to_search = [
                 f for f in os.listdir(Config.LOG_DIR)
@@ -1414,41 +2032,19 @@ async def search_logs(req: SearchRequest):
                 continue
 
             GlobalState.status['files_scanned'] += 1
-            file_has_matches = False
-            section_buffer = []
-            last_timestamp_idx = -1
-            current_thread = "UNKNOWN"
-            current_service = "UNKNOWN"
-
-            with open(fpath, 'r', encoding='utf-8', errors='ignore') as f:
-                for idx, line in enumerate(f):
-                    line = line.rstrip('\n')
-
-                    if Patterns.TIMESTAMP.match(line):
-                        last_timestamp_idx = idx
-                        section_buffer = [line]
-                        current_thread = extract_thread_id(line)
-                        current_service = extract_service(line)
-                    else:
-                        section_buffer.append(line)
-
-                    if re.search(re.escape(search_text), line, re.IGNORECASE):
-                        if not file_has_matches:
-                            files_with_matches.add(fname)
-                            file_has_matches = True
-
-                        snippet = line if Patterns.TIMESTAMP.match(line) else '\n'.join(section_buffer)
-
-                        match_info = {
-                            'log_file': fname,
-                            'line_number': idx + 1,
-                            'thread_id': current_thread,
-                            'service': current_service,
-                            'snippet': snippet
-                        }
-                        results.append(match_info)
-                        GlobalState.status['matches_found'] += 1
-                        print(f"[Match Found] {fname}:{idx + 1}")
+            span = await asyncio.get_running_loop().run_in_executor(None, time_window_range, fpath, window)
+            if span is None:
+                continue  # nothing logged inside the time window
+            collector = SearchCollector(fname, search_text, mode="line")
+
+            for _ in iter_search_batches(fpath, collector, Config.SEARCH_BATCH_LINES, Config.SCAN_MODE, *span):
+                for match_info in collector.drain():
+                    files_with_matches.add(fname)
+                    results.append(match_info)
+                    GlobalState.status['matches_found'] += 1
+                    print(f"[Match Found] {fname}:{match_info['line_number']}")
+                if GlobalState.abort_event.is_set():
+                    break
 
         elapsed = time.time() - start_time
         print(f"[Search Completed] Files Scanned: {GlobalState.status['files_scanned']} | " +
@@ -1483,6 +2079,11 @@ async def search_logs_stream(req: SearchRequest):
             files_with_matches = set()
             total_files_scanned = 0
             total_occurrences = 0
+            try:
+                window = parse_time_window(req.from_time, req.to_time)
+            except ValueError as e:
+                yield f'data: {json.dumps({"error": str(e), "code": 400})}\n\n'
+                return
             
             start_time_str = time.strftime("%H:%M:%S", time.localtime(start_time))
             print(f"\n[Search Started] {start_time_str} | Pattern: '{search_text}' | Mode: {search_mode}")
@@ -1518,54 +2119,30 @@ async def search_logs_stream(req: SearchRequest):
                     continue
 
                 total_files_scanned += 1
-                file_has_matches = False  
-                current_entry = []  # Buffer for current log entry
-                current_thread = "UNKNOWN"
-                current_service = "UNKNOWN"
-                in_entry = False  # Flag to track if we're inside a log entry
+                collector = SearchCollector(fname, search_text, mode="entry")
 
                 try:
-                    with open(fpath, 'r', encoding='utf-8', errors='ignore') as f:
-                        for line_idx, line in enumerate(f):
-                            # Check abort flag more frequently
-                            if line_idx % 10 == 0 and GlobalState.abort_event.is_set():
-                                logger.info(f"🔴 [Search Aborted] During file processing")
-                                yield 'data: {"status": "aborted", "code": 499}\n\n'
-                                GlobalState.abort_event.clear()
-                                return
-                            
-                            line = line.rstrip('\n')
-                            
-                            # Check for timestamp line (start of new entry)
-                            if Patterns.TIMESTAMP.match(line):
-                                # If we were in an entry and it had a match, send it
-                                if in_entry and file_has_matches:
-                                    snippet = '\n'.join(current_entry)
-                                    data = {
-                                        "log_file": fname,
-                                        "line_number": line_idx + 1 - len(current_entry),  # Start line of entry
-                                        "thread_id": current_thread,
-                                        "service": current_service,
-                                        "snippet": snippet
-                                    }
-                                    yield f'data: {json.dumps(data)}\n\n'
-                                
-                                # Start new entry
-                                current_entry = [line]
-                                in_entry = True
-                                current_thread = extract_thread_id(line)
-                                current_service = extract_service(line)
-                                file_has_matches = False  # Reset for new entry
-                            elif in_entry:
-                                current_entry.append(line)
-                            
-                            # Check for search text match
-                            if in_entry and re.search(re.escape(search_text), line, re.IGNORECASE):
-                                if not file_has_matches:
-                                    files_with_matches.add(fname)
-                                    file_has_matches = True
-                                    print(f"✅ [Match Found] File: {fname}")
-                                total_occurrences += 1
+                    span = await asyncio.get_running_loop().run_in_executor(None, time_window_range, fpath,
+                                                                            window)
+                    if span is None:
+                        continue  # nothing logged inside the time window
+                    for _ in iter_search_batches(fpath, collector, Config.SEARCH_BATCH_LINES, Config.SCAN_MODE,
+                                                 *span):
+                        # Check abort flag between batches
+                        if GlobalState.abort_event.is_set():
+                            logger.info(f"🔴 [Search Aborted] During file processing")
+                            yield 'data: {"status": "aborted", "code": 499}\n\n'
+                            GlobalState.abort_event.clear()
+                            return
+
+                        # Send every log entry that contained a match
+                        for data in collector.drain():
+                            if fname not in files_with_matches:
+                                files_with_matches.add(fname)
+                                print(f"✅ [Match Found] File: {fname}")
+                            yield f'data: {json.dumps(data)}\n\n'
+
+                    total_occurrences += collector.occurrences
 
                 except Exception as e:
                     logger.error(f"🔴 [File Processing Error] {fname}: {str(e)}")
@@ -1672,24 +2249,31 @@ async def list_log_files_simple():
 @app.get("/debug_rqrs_cache")
 async def debug_rqrs_cache():
     return {
-        "file_count": len(LOG_CACHE.cache),
-        "sample_entry": list(LOG_CACHE.cache.items())[0] if LOG_CACHE.cache else None
+        "file_count": len(LOG_CACHE.entries),
+        "sample_entry": next(((k, describe_cached_result(e.value)) for k, e in LOG_CACHE.entries.items()), None)
     }
 
 @app.get("/debug_cache")
 async def debug_cache():
     return {
-        "cache_contents": LOG_CACHE.cache,
-        "cache_order": LOG_CACHE.order
+        "cache_contents": {k: describe_cached_result(e.value) for k, e in LOG_CACHE.entries.items()},
+        "cache_order": list(LOG_CACHE.entries)
     }
 
 @app.get("/cache_status")
 async def cache_status():
     """Check cache status"""
     return {
-        "cached_logs": list(LOG_CACHE.cache.keys()),
-        "cache_size": f"{len(LOG_CACHE.cache)}/{Config.MAX_CACHE_SIZE}",
-        "next_to_evict": LOG_CACHE.order[0] if LOG_CACHE.order else None
+        "cached_logs": list(LOG_CACHE.entries.keys()),
+        "cache_size": f"{LOG_CACHE.total_bytes/(1024*1024):.1f}/{Config.CACHE_MAX_MB} MB",
+        "next_to_evict": next(iter(LOG_CACHE.entries), None),
+        "rqrs_cache": LOG_CACHE.stats(),
+        "error_cache": ERROR_CACHE.stats(),
+        "xml_cache": XML_CACHE.stats(),
+        "ai_cache": AI_CACHE.stats(),
+        "result_store": (await asyncio.get_running_loop().run_in_executor(None, RESULT_STORE.stats))
+                        if Config.RESULT_STORE_ENABLED else None,
+        "watcher": GlobalState.log_watcher.stats() if GlobalState.log_watcher is not None else None
     }
 
 @app.post("/clear_cache")
@@ -1697,10 +2281,15 @@ async def clear_cache():
     """Clear the entire cache"""
     try:
         # Get count before clearing (for logging/reporting)
-        keys_count = len(LOG_CACHE.cache)
+        keys_count = len(LOG_CACHE.entries)
         
         # Clear all cached items at once
         await LOG_CACHE.invalidate_all()
+        await ERROR_CACHE.invalidate_all()
+        await XML_CACHE.invalidate_all()
+        await AI_CACHE.invalidate_all()
+        if Config.RESULT_STORE_ENABLED:
+            await asyncio.get_running_loop().run_in_executor(None, RESULT_STORE.clear)
         
         logger.info(f"🧹 Cleared cache with {keys_count} items")
         return {
@@ -1722,9 +2311,23 @@ async def clear_cache():
 async def refresh_cache():
     """Manually trigger a full cache refresh"""
     files = [f for f in os.listdir(Config.LOG_DIR) if os.path.isfile(os.path.join(Config.LOG_DIR, f))]
-    await asyncio.gather(*[file_processor.process_file(f, Priority.BACKGROUND_PRELOAD) for f in files])
+    # Background jobs: the scheduler bounds how many run at once and keeps a slot free for users
+    await asyncio.gather(*[file_processor.process_file(f, Priority.BACKGROUND_PRELOAD) for f in files],
+                         return_exceptions=True)
     return {"status": "Cache refreshed", "files_processed": len(files)}
 
+@app.get("/jobs")
+async def list_jobs():
+    """Queued, running and recently finished parse jobs"""
+    return JOB_SCHEDULER.stats()
+
+@app.get("/jobs/{filename}")
+async def get_job_status(filename: str):
+    job = file_processor.get_job(filename)
+    if job is None:
+        raise HTTPException(404, detail=f"No parse job for {filename}")
+    return job.snapshot()
+
 ################################
 # View Logs API Endpoints
 ################################
@@ -2447,38 +3050,223 @@ async def monitor_page():
 # AI Modules
 ################################
 
-@app.post("/ai/inspect_log")
-async def ai_inspect_log(req: Request):
+def ai_cache_key(logs: List[str], window: Optional[tuple]) -> str:
+    from_ms, to_ms = window if window is not None else (None, None)
+    return f"{','.join(logs)}|{from_ms}|{to_ms}"
+
+def ai_job_id(logs: List[str], window: Optional[tuple]) -> str:
+    """Same logs and window, same id: a second submission joins the job already running"""
+    return hashlib.sha1(ai_cache_key(logs, window).encode("utf-8")).hexdigest()[:16]
+
+async def run_ai_inspection(logs: List[str], window: Optional[tuple], progress: ScanProgress) -> Dict[str, Any]:
     """
-    Endpoint that runs AI analysis on a selected log file.
-    Also logs user behavior for future ML personalization.
+    AI analysis of one or more logs (or of their from/to window) across the
+    process pool, map-reduce style: every timestamp-aligned byte range is
+    analyzed on its own, the ranges of a log are merged in file order and
+    the logs are folded into one capped analyzer as they finish, so memory
+    does not grow with the number of logs.  The result is memoized against
+    the logs' fingerprints; cancelling drops the ranges no worker has started.
+    """
+    key = ai_cache_key(logs, window)
+    loop = asyncio.get_running_loop()
+    fingerprints = {log: file_fingerprint(os.path.join(Config.LOG_DIR, log)) for log in logs}
+    cached = await AI_CACHE.get(key)
+    if cached is not None and cached["fingerprints"] == fingerprints:
+        progress.total_bytes = cached["bytes"]
+        progress.finish()
+        return cached["result"]
+
+    start_time = time.time()
+    workers = Config.PARALLEL_WORKERS
+    planned: Dict[str, List[tuple]] = {}
+    first_lines: Dict[str, int] = {}  # file line the window of each log starts on
+    for log in logs:
+        # ✅ Bytes to analyze: the whole file, or the from/to window found in the timestamp index
+        filepath = os.path.join(Config.LOG_DIR, log)
+        span = await loop.run_in_executor(None, time_window_range, filepath, window)
+        if span is None:
+            planned[log] = []
+            continue
+        start, end = span[0], span[1] if span[1] is not None else fingerprints[log][1]
+        first_lines[log] = span[2]
+        parts = plan_range_count(end - start, workers, Config.AI_RANGE_MB * 1024 * 1024)
+        planned[log] = await loop.run_in_executor(None, split_aligned_ranges, filepath, parts, start, end)
+    progress.total_bytes = sum(end - start for ranges in planned.values() for start, end in ranges)
+    pool = get_process_pool(workers) if Config.PARALLEL_PARSE_ENABLED else None
+
+    async def analyze_range(filepath: str, log: str, start: int, end: int) -> LogContentAnalyzer:
+        analyzer = await loop.run_in_executor(pool, functools.partial(analyze_log_range, filepath, start, end,
+                                                                      source=log))
+        progress.bytes_done += end - start
+        progress.lines_done += analyzer.total_lines
+        return analyzer
+
+    async def analyze_log(file_path: Path) -> LogContentAnalyzer:
+        log = file_path.name
+        analyzers = await asyncio.gather(*[analyze_range(str(file_path), log, start, end)
+                                           for start, end in planned[log]])
+        return merge_log_ranges(analyzers, first_lines.get(log, 1), source=log)
+
+    combined = LogContentAnalyzer()
+    paths = [Path(Config.LOG_DIR) / log for log in logs]
+    async with aclosing(iter_prefetched(paths, analyze_log)) as analyses:
+        async for _, analyzer in analyses:
+            if isinstance(analyzer, Exception):
+                raise analyzer
+            if len(logs) == 1:
+                combined = analyzer
+            else:
+                combined.merge_log(analyzer)  # the per-log analyzer is dropped right after
+    result = combined.result()
+    progress.finish()
+
+    processing_time = time.time() - start_time
+    logger.info(f"🤖 AI inspection of {len(logs)} log(s) ({sum(map(len, planned.values()))} ranges) "
+                f"took {processing_time:.2f}s")
+    await AI_CACHE.set(key, {"fingerprints": fingerprints, "bytes": progress.total_bytes, "result": result},
+                       cost=processing_time)
+    return result
+
+def submit_ai_inspection(logs: List[str], window: Optional[tuple], from_time: Optional[str],
+                         to_time: Optional[str]) -> str:
+    """Queue (or join) the AI inspection of ``logs``/``window``; returns its job id"""
+    job_id = ai_job_id(logs, window)
+    job = JOB_SCHEDULER.get(f"ai:{job_id}")
+    if job is not None and job.active:
+        return job_id
+    # A finished job is run again: it returns at once while its memoized result is current
+    progress = ScanProgress()
+    AI_INSPECTIONS.pop(job_id, None)
+    AI_INSPECTIONS[job_id] = {"logs": logs, "from": from_time, "to": to_time, "progress": progress}
+    while len(AI_INSPECTIONS) > Config.AI_JOB_HISTORY:
+        AI_INSPECTIONS.popitem(last=False)
+    JOB_SCHEDULER.submit(f"ai:{job_id}", functools.partial(run_ai_inspection, logs, window, progress),
+                         Priority.USER_REQUEST, kind="ai")
+    return job_id
+
+def describe_ai_job(job_id: str) -> Dict[str, Any]:
+    """Job state and progress of an AI inspection, plus its result once done"""
+    inspection = AI_INSPECTIONS.get(job_id)
+    job = JOB_SCHEDULER.get(f"ai:{job_id}")
+    if inspection is None or job is None:
+        raise HTTPException(404, detail=f"No AI inspection job {job_id}")
+    status = {
+        "job_id": job_id,
+        "logs": inspection["logs"],
+        "from": inspection["from"],
+        "to": inspection["to"],
+        **job.snapshot(),
+        "progress": inspection["progress"].snapshot()
+    }
+    if job.state is JobState.DONE:
+        status["result"] = job.future.result()
+    return status
+
+def resolve_ai_logs(patterns: List[str]) -> List[str]:
+    """Logs named by ``patterns`` (names or shell-style globs such as ``matrixtdp4.log*``), sorted"""
+    available = list_log_files()
+    logs = set()
+    for pattern in patterns:
+        matches = fnmatch.filter(available, pattern)
+        if not matches:
+            raise HTTPException(status_code=404, detail=f"No log file matches '{pattern}'")
+        logs.update(matches)
+    return sorted(logs)
+
+async def read_ai_request(req: Request):
+    """
+    ``(logs, window, from, to)`` of an AI inspection request body: one
+    ``log``, or a list of ``logs`` (names or glob patterns) analyzed together
     """
     data = await req.json()
     log_name = data.get("log")
+    patterns = data.get("logs")
 
-    # ❌ Guard clause: no log name sent
-    if not log_name:
-        raise HTTPException(status_code=400, detail="Missing log name")
+    if patterns is not None:
+        # ❌ Guard clause: logs must be a non-empty list of names/patterns
+        if not isinstance(patterns, list) or not patterns or not all(isinstance(p, str) and p for p in patterns):
+            raise HTTPException(status_code=400, detail="logs must be a non-empty list of log names or patterns")
+        logs = resolve_ai_logs(patterns)
+    else:
+        # ❌ Guard clause: no log name sent
+        if not log_name:
+            raise HTTPException(status_code=400, detail="Missing log name")
 
-    # ❌ Guard clause: file not found in ./logs
-    filepath = os.path.join(Config.LOG_DIR, log_name)
-    if not os.path.isfile(filepath):
-        raise HTTPException(status_code=404, detail="Log file not found")
+        # ❌ Guard clause: file not found in ./logs
+        filepath = os.path.join(Config.LOG_DIR, log_name)
+        if not os.path.isfile(filepath):
+            raise HTTPException(status_code=404, detail="Log file not found")
+        logs = [log_name]
 
     try:
-        # ✅ Read full log file (streamed)
-        async with aiofiles.open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            log_content = await f.read()
-
-        # ✅ Run the AI analyzer on the log content
-        result = analyze_log_content(log_content)
-
-        return result
+        window = parse_time_window(data.get("from"), data.get("to"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return logs, window, data.get("from"), data.get("to")
 
+@app.post("/ai/inspect_log")
+async def ai_inspect_log(req: Request):
+    """
+    Endpoint that runs AI analysis on a selected log file (or on several,
+    see ``read_ai_request``) and waits for it.
+    Also logs user behavior for future ML personalization.
+    """
+    logs, window, from_time, to_time = await read_ai_request(req)
+    job_id = submit_ai_inspection(logs, window, from_time, to_time)
+    try:
+        return await JOB_SCHEDULER.get(f"ai:{job_id}").wait()
+    except asyncio.CancelledError:
+        job = JOB_SCHEDULER.get(f"ai:{job_id}")
+        if job is not None and job.state is JobState.CANCELLED:
+            raise HTTPException(status_code=409, detail="AI analysis was cancelled")
+        raise
     except Exception as e:
         logger.error(f"AI inspection failed: {str(e)}")
         raise HTTPException(status_code=500, detail="AI analysis failed")
-        
+
+@app.post("/ai/inspect_jobs")
+async def submit_ai_job(req: Request):
+    """Start an AI inspection in the background; poll, stream or cancel it by the returned job id"""
+    logs, window, from_time, to_time = await read_ai_request(req)
+    job_id = submit_ai_inspection(logs, window, from_time, to_time)
+    return describe_ai_job(job_id)
+
+@app.get("/ai/inspect_jobs/{job_id}")
+async def get_ai_job(job_id: str):
+    return describe_ai_job(job_id)
+
+@app.get("/ai/inspect_jobs/{job_id}/stream")
+async def stream_ai_job(job_id: str):
+    """Server-sent progress of an AI inspection; the last event carries its result (or why there is none)"""
+    describe_ai_job(job_id)  # 404 before the stream starts
+
+    async def event_stream():
+        last_sent = None
+        while True:
+            try:
+                status = describe_ai_job(job_id)
+            except HTTPException:
+                yield f"data: {json.dumps({'job_id': job_id, 'state': 'not_found'})}\n\n"
+                break
+            if status != last_sent:
+                yield f"data: {json.dumps(status)}\n\n"
+                last_sent = status
+            if status["state"] not in (JobState.QUEUED.value, JobState.RUNNING.value):
+                break
+            await asyncio.sleep(Config.PROGRESS_INTERVAL_SECONDS)
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.delete("/ai/inspect_jobs/{job_id}")
+async def cancel_ai_job(job_id: str):
+    """Cancel a queued or running AI inspection"""
+    job = JOB_SCHEDULER.get(f"ai:{job_id}")
+    if job is None:
+        raise HTTPException(404, detail=f"No AI inspection job {job_id}")
+    if not job.active:
+        return {"job_id": job_id, "cancelled": False, "state": job.state.value}
+    JOB_SCHEDULER.cancel(job.key)
+    return {"job_id": job_id, "cancelled": True}
+
 
 ########################################################
 # Starting FastAPI server in port 8001 by default
@@ -0,0 +1,143 @@
+# ✅ Byte-budgeted LRU cache for parse results
+#
+# Entries are weighed by an estimate of their in-memory size instead of being
+# counted, so one result from a multi-GB log and a hundred tiny ones share the
+# same budget fairly.  Recency lives in an OrderedDict: hits and evictions are
+# O(1) instead of the list.remove()/pop(0) of a plain key list.
+
+import asyncio, logging, sys
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("fastapi_logger")
+
+SAMPLE_ITEMS = 32  # container items actually measured by estimate_size
+EVICTION_SAMPLE = 5  # least recently used entries weighed against each other on eviction
+
+
+def estimate_size(obj: Any, sample: int = SAMPLE_ITEMS) -> int:
+    """
+    Approximate deep size in bytes of JSON-like data (dicts, lists, tuples,
+    strings, numbers).  Containers with more than ``sample`` items are not
+    walked completely: evenly spaced items are measured and extrapolated.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        count = len(obj)
+        if not count:
+            return size
+        items = list(obj.items())
+        picked = items[::max(1, count // sample)][:sample]
+        measured = sum(estimate_size(k, sample) + estimate_size(v, sample) for k, v in picked)
+        return size + measured * count // len(picked)
+    if isinstance(obj, (list, tuple)):
+        count = len(obj)
+        if not count:
+            return size
+        picked = obj[::max(1, count // sample)][:sample]
+        measured = sum(estimate_size(item, sample) for item in picked)
+        return size + measured * count // len(picked)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "size", "cost")
+
+    def __init__(self, value: Any, size: int, cost: float):
+        self.value = value
+        self.size = size
+        self.cost = cost
+
+
+class AsyncLRUCache:
+    """
+    Async LRU cache bounded by the estimated size of its values.
+
+    ``cost`` is what an entry took to build (seconds).  When over budget the
+    ``EVICTION_SAMPLE`` least recently used entries are compared and the one
+    that is cheapest to rebuild per byte goes first; with equal costs this is
+    plain LRU.  A value larger than the whole budget is not cached at all.
+    """
+
+    def __init__(self, max_bytes: int, name: str = "cache"):
+        self.max_bytes = max_bytes
+        self.name = name
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        async with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    async def set(self, key: str, value: Any, cost: float = 0.0) -> bool:
+        """Store ``value``; returns False when it is too large to be cached."""
+        size = estimate_size(value)
+        async with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            if size > self.max_bytes:
+                self.rejected += 1
+                logger.warning(f"[🗑️] Not caching {key}: ~{size/(1024*1024):.1f} MB exceeds the "
+                               f"{self.max_bytes/(1024*1024):.0f} MB {self.name} budget")
+                return False
+            self.entries[key] = _Entry(value, size, cost)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self._evict_one(keep=key)
+            return True
+
+    def _evict_one(self, keep: str) -> None:
+        candidates = []
+        for key, entry in self.entries.items():  # least recently used first
+            if key != keep:
+                candidates.append((key, entry))
+                if len(candidates) == EVICTION_SAMPLE:
+                    break
+        key, entry = min(candidates, key=lambda c: c[1].cost / max(c[1].size, 1))
+        del self.entries[key]
+        self.total_bytes -= entry.size
+        self.evictions += 1
+        logger.info(f"[🗑️] Evicting {self.name} entry {key} (~{entry.size/(1024*1024):.1f} MB, "
+                    f"rebuild {entry.cost:.2f}s)")
+
+    async def invalidate(self, key: str):
+        async with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry.size
+
+    async def invalidate_all(self):
+        """Clear all items from the cache"""
+        async with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            logger.info(f"🧹 {self.name} completely cleared (all items removed)")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "size_mb": round(self.total_bytes / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+            "items": [  # least recently used first
+                {"key": key, "size_mb": round(entry.size / (1024 * 1024), 3), "cost_s": round(entry.cost, 2)}
+                for key, entry in self.entries.items()
+            ],
+        }
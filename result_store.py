@@ -0,0 +1,131 @@
+# ✅ Persistent on-disk store for parse results (RQ/RS tables, error scans)
+#
+# One SQLite file under ./applog keeps the last result of every kind for every
+# log, tagged with the fingerprint of the file it was computed from, so a
+# restarted server can serve warm results instead of re-parsing.
+
+import json, logging, os, sqlite3, threading, time, zlib
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("fastapi_logger")
+
+SCHEMA_VERSION = 2  # bump whenever a payload format changes; old rows are dropped
+COMPRESS_LEVEL = 1  # results are mostly repetitive JSON; fast compression already shrinks them ~10x
+
+
+class ResultStore:
+    """
+    ``(log, kind) -> payload`` rows with the ``(inode, size, mtime_ns)``
+    fingerprint of the log they describe.
+
+    Payloads are JSON, zlib-compressed.  Every call opens its own short-lived
+    connection, so the store can be used from any executor thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    self._create_schema(conn)
+                    self._ready = True
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS results")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                log TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (log, kind)
+            )
+        """)
+        conn.commit()
+
+    def save(self, log: str, kind: str, fingerprint: Tuple[int, int, int], payload: Any) -> None:
+        blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), COMPRESS_LEVEL)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (log, kind, inode, size, mtime_ns, stored_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (log, kind, *fingerprint, time.time(), blob),
+            )
+        conn.close()
+
+    def load(self, log: str, kind: str) -> Optional[Tuple[Tuple[int, int, int], Any]]:
+        """``(fingerprint, payload)`` last stored for ``log``, whatever the file looks like now."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT inode, size, mtime_ns, payload FROM results WHERE log = ? AND kind = ?", (log, kind)
+            ).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        try:
+            payload = json.loads(zlib.decompress(row[3]))
+        except (zlib.error, ValueError):
+            self.delete(log, kind)
+            return None
+        return (row[0], row[1], row[2]), payload
+
+    def delete(self, log: str, kind: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            if kind is None:
+                conn.execute("DELETE FROM results WHERE log = ?", (log,))
+            else:
+                conn.execute("DELETE FROM results WHERE log = ? AND kind = ?", (log, kind))
+        conn.close()
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
+        conn.close()
+
+    def prune(self, log_dir: str) -> int:
+        """
+        Drop rows of logs that disappeared, were replaced (new inode) or
+        shrank.  Rows of logs that only grew are kept: RQ/RS results resume
+        from their checkpoint instead of starting over.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT log, kind, inode, size FROM results").fetchall()
+            stale = []
+            for log, kind, inode, size in rows:
+                try:
+                    stat = os.stat(os.path.join(log_dir, log))
+                except OSError:
+                    stale.append((log, kind))
+                    continue
+                if stat.st_ino != inode or stat.st_size < size:
+                    stale.append((log, kind))
+            conn.executemany("DELETE FROM results WHERE log = ? AND kind = ?", stale)
+        conn.close()
+        if stale:
+            logger.info(f"🧹 Pruned {len(stale)} stale stored result(s)")
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT kind, COUNT(*), SUM(LENGTH(payload)) FROM results GROUP BY kind").fetchall()
+        conn.close()
+        return {
+            "path": self.path,
+            "size_mb": round(os.path.getsize(self.path) / (1024 * 1024), 2) if os.path.exists(self.path) else 0,
+            "kinds": {kind: {"entries": count, "payload_mb": round((size or 0) / (1024 * 1024), 2)}
+                      for kind, count, size in rows},
+        }
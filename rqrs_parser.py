@@ -0,0 +1,152 @@
+# ✅ RQ/RS XML extraction shared by the sequential and the parallel parsers
+
+import os, re, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from log_scanner import (
+    TIMESTAMP_BYTES, ScanSubscriber, XmlSpan, scan_file, timestamp_ms
+)
+from log_tokenizer import header_fields
+from rqrs_table import RqrsTable
+from xml_issues import detect_xml_issues
+
+# 🔍 Regex patterns mirrored from main.Patterns (worker processes never import main)
+RQRS = re.compile(r'<([a-zA-Z_][\w]*?(RQ|RS))[\s>]')
+
+
+class RqrsCollector(ScanSubscriber):
+    """
+    Turns the scanner's XML spans into RQ/RS table entries.
+
+    A timestamp line resets every piece of scanner state, so a scan that
+    starts on a timestamp line produces exactly the entries a full-file scan
+    would for that region (shifted by the number of preceding lines).
+    """
+
+    wants_spans = True
+
+    def __init__(self, entries: Optional[RqrsTable] = None):
+        # New entries are appended to ``entries`` (e.g. the kept part of a resumed result)
+        self.entries = entries if entries is not None else RqrsTable()
+
+    def on_xml_span(self, span: XmlSpan) -> None:
+        xml_content = span.content
+        if match := RQRS.search(xml_content):
+            has_issue, codes = detect_xml_issues(xml_content)
+            thread, service = header_fields(span.header)
+            self.entries.append(
+                span.start_line,
+                thread,
+                service,
+                match.group(1),
+                has_issue,
+                span.start_offset,  # the raw preview is re-read from here on demand
+                span.end_offset,
+                ",".join(codes),
+                timestamp_ms(span.header)  # to pair RQs with RSs afterwards
+            )
+
+
+def scan_rqrs_range(filepath: str, start: int = 0, end: Optional[int] = None,
+                    mode: str = "stream") -> Tuple[RqrsTable, int]:
+    """
+    Extract RQ/RS entries from bytes ``start``..``end`` of a file.
+
+    Returns ``(entries, line_count)`` with line numbers relative to ``start``.
+    ``mode`` is passed on to :func:`log_scanner.scan_file`.
+    """
+    collector = RqrsCollector()
+    line_count = scan_file(filepath, [collector], start, end, mode=mode)
+    return collector.entries, line_count
+
+
+def _next_timestamp_line(f, pos: int, size: int) -> Optional[int]:
+    """Offset of the first timestamp line starting at or after ``pos``."""
+    if pos <= 0:
+        return 0
+    f.seek(pos - 1)
+    line_start = pos - 1 + len(f.readline())  # finish the line containing pos - 1
+    while line_start < size:
+        line = f.readline()
+        if not line:
+            break
+        if TIMESTAMP_BYTES.match(line):
+            return line_start
+        line_start += len(line)
+    return None
+
+
+def split_aligned_ranges(filepath: str, parts: int, start: int = 0,
+                         end: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Split a file (or its bytes ``start``..``end``, ``start`` being the start
+    of a line) into up to ``parts`` byte ranges whose edges sit on the start
+    of a timestamp line, so each range can be parsed independently.
+    """
+    size = os.path.getsize(filepath) if end is None else end
+    boundaries = [start]
+    with open(filepath, "rb") as f:
+        for k in range(1, max(parts, 1)):
+            target = start + (size - start) * k // parts
+            if target <= boundaries[-1]:
+                continue
+            pos = _next_timestamp_line(f, target, size)
+            if pos is None:
+                break
+            if pos > boundaries[-1]:
+                boundaries.append(pos)
+    if size > boundaries[-1] or size == start:
+        boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def merge_range_results(results: List[Tuple[RqrsTable, int]]) -> Tuple[RqrsTable, int]:
+    """Concatenate per-range entries in file order, rebasing line numbers to the whole file."""
+    merged = RqrsTable()
+    line_offset = 0
+    for entries, line_count in results:
+        merged.extend(entries, line_offset)
+        line_offset += line_count
+    return merged, line_offset
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared worker pool; spawned (not forked) so workers never inherit the event loop's threads."""
+    global _process_pool, _process_pool_workers
+    if _process_pool is None or _process_pool_workers != workers:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _process_pool_workers = workers
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool, _process_pool_workers
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        _process_pool_workers = 0
+
+
+def plan_range_count(file_size: int, workers: int, min_range_bytes: int) -> int:
+    """A few ranges per worker for load balancing, but never ranges smaller than ``min_range_bytes``."""
+    return max(1, min(workers * 4, file_size // max(min_range_bytes, 1)))
+
+
+def parse_rqrs_parallel(filepath: str, workers: int, min_range_bytes: int = 32 * 1024 * 1024,
+                        mode: str = "stream") -> Tuple[RqrsTable, int]:
+    """Blocking helper: scan a whole file across the shared process pool."""
+    parts = plan_range_count(os.path.getsize(filepath), workers, min_range_bytes)
+    ranges = split_aligned_ranges(filepath, parts)
+    pool = get_process_pool(workers)
+    futures = [pool.submit(scan_rqrs_range, filepath, start, end, mode) for start, end in ranges]
+    return merge_range_results([future.result() for future in futures])
@@ -0,0 +1,457 @@
+# ✅ Compact columnar storage for RQ/RS entries
+#
+# A parsed log can hold hundreds of thousands of RQ/RS entries.  As one dict per
+# entry (plus a 512-char preview) that is hundreds of MB for a big file; as a
+# handful of typed arrays and a shared string pool it is a few bytes per entry.
+
+import base64, json, sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sketches import QuantileSketch
+
+RAW_PREVIEW_CHARS = 512
+SORT_KEYS = ("line", "thread", "service", "tag", "has_issue")
+
+
+class StringPool:
+    """Interns strings to small integer codes (dictionary encoding)."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def read_preview(f, start: int, end: int, limit: int = RAW_PREVIEW_CHARS) -> str:
+    """
+    First ``limit`` characters of an XML span as the parser joins it: the
+    span's non-blank lines, stripped, joined with ``\\n``.
+    """
+    f.seek(start)
+    lines: List[str] = []
+    pos, size = start, 0
+    while pos < end and size <= limit:
+        raw = f.readline()
+        if not raw:
+            break
+        pos += len(raw)
+        stripped = raw.decode("utf-8", "ignore").strip()
+        if stripped:
+            lines.append(stripped)
+            size += len(stripped) + 1
+    return '\n'.join(lines)[:limit]
+
+
+def read_span_lines(path: str, start: int, end: int) -> List[str]:
+    """The stripped, non-blank lines of the XML span in bytes ``start``..``end`` of ``path``."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(max(end - start, 0))
+    return [text for text in (raw.decode("utf-8", "ignore").strip() for raw in data.split(b"\n")) if text]
+
+
+class RqrsTable:
+    """
+    RQ/RS entries stored column by column.
+
+    ``line`` (the line after the ``XML Request:``/``XML Response:`` header),
+    the byte range of the XML span, the header's timestamp (epoch ms, -1 if
+    unknown) and ``pair`` (row of the matching RQ or RS, -1 if none, see
+    :meth:`pair_messages`) are int64 arrays; thread, service, tag and the
+    comma-joined issue codes are codes into one shared :class:`StringPool`;
+    ``has_issue`` is a bytearray.  The ``raw`` preview is not kept at all: :meth:`to_dicts`
+    re-reads it from the span's bytes in the log, so it is only built for the
+    entries actually sent to a client.
+    """
+
+    __slots__ = ("strings", "line", "span_start", "span_end", "timestamp", "pair", "thread", "service", "tag",
+                 "issues", "has_issue")
+
+    def __init__(self):
+        self.strings = StringPool()
+        self.line = array("q")
+        self.span_start = array("q")
+        self.span_end = array("q")
+        self.timestamp = array("q")
+        self.pair = array("q")
+        self.thread = array("I")
+        self.service = array("I")
+        self.tag = array("I")
+        self.issues = array("I")
+        self.has_issue = bytearray()
+
+    def append(self, line: int, thread: str, service: str, tag: str, has_issue: bool,
+               span_start: int, span_end: int, issues: str = "", timestamp: int = -1) -> None:
+        code = self.strings.code
+        self.line.append(line)
+        self.span_start.append(span_start)
+        self.span_end.append(span_end)
+        self.timestamp.append(timestamp)
+        self.pair.append(-1)
+        self.thread.append(code(thread))
+        self.service.append(code(service))
+        self.tag.append(code(tag))
+        self.issues.append(code(issues))
+        self.has_issue.append(1 if has_issue else 0)
+
+    def __len__(self) -> int:
+        return len(self.line)
+
+    def ready_count(self) -> int:
+        """Rows that are completely appended; safe to read while a scan thread is still appending."""
+        return len(self.has_issue)  # append() fills has_issue last
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RqrsTable):
+            return NotImplemented
+        return list(self.iter_rows()) == list(other.iter_rows())
+
+    def __sizeof__(self) -> int:
+        size = object.__sizeof__(self) + sys.getsizeof(self.strings.values) + sys.getsizeof(self.strings.codes)
+        size += sum(sys.getsizeof(value) for value in self.strings.values)
+        for column in (self.line, self.span_start, self.span_end, self.timestamp, self.pair,
+                       self.thread, self.service, self.tag, self.issues, self.has_issue):
+            size += sys.getsizeof(column)
+        return size
+
+    def extend(self, other: "RqrsTable", line_offset: int = 0) -> None:
+        """Append ``other``'s entries, shifting their line numbers by ``line_offset``."""
+        remap = [self.strings.code(value) for value in other.strings.values]
+        self.line.extend(array("q", (line + line_offset for line in other.line)) if line_offset else other.line)
+        self.span_start.extend(other.span_start)
+        self.span_end.extend(other.span_end)
+        self.timestamp.extend(other.timestamp)
+        base = len(self.pair)
+        self.pair.extend(array("q", (row + base if row >= 0 else -1 for row in other.pair)))
+        self.thread.extend(array("I", (remap[c] for c in other.thread)))
+        self.service.extend(array("I", (remap[c] for c in other.service)))
+        self.tag.extend(array("I", (remap[c] for c in other.tag)))
+        self.issues.extend(array("I", (remap[c] for c in other.issues)))
+        self.has_issue.extend(other.has_issue)
+
+    def head(self, count: int) -> "RqrsTable":
+        """A new table with the first ``count`` entries (sharing the string pool values)."""
+        table = RqrsTable()
+        table.strings = StringPool(self.strings.values)
+        table.line = self.line[:count]
+        table.span_start = self.span_start[:count]
+        table.span_end = self.span_end[:count]
+        table.timestamp = self.timestamp[:count]
+        table.pair = array("q", (row if row < count else -1 for row in self.pair[:count]))
+        table.thread = self.thread[:count]
+        table.service = self.service[:count]
+        table.tag = self.tag[:count]
+        table.issues = self.issues[:count]
+        table.has_issue = self.has_issue[:count]
+        return table
+
+    def find_line(self, line: int) -> Optional[int]:
+        """Row of the entry whose XML starts on ``line``, if any."""
+        row = bisect_left(self.line, line)
+        return row if row < len(self) and self.line[row] == line else None
+
+    def count_through_line(self, line: int) -> int:
+        """Number of entries whose ``line`` is at most ``line`` (entries are in file order)."""
+        return bisect_right(self.line, line)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_rows()
+
+    def iter_rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Entries as dicts without the ``raw`` preview, plus their span byte range."""
+        values = self.strings.values
+        for i in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield {
+                "line": self.line[i],
+                "thread": values[self.thread[i]],
+                "service": values[self.service[i]],
+                "tag": values[self.tag[i]],
+                "has_issue": bool(self.has_issue[i]),
+                "issues": values[self.issues[i]],
+                "timestamp": self.timestamp[i],
+                "pair": self.pair[i],
+                "span_start": self.span_start[i],
+                "span_end": self.span_end[i],
+            }
+
+    def to_dicts(self, path: str, start: int = 0, stop: Optional[int] = None,
+                 rows: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Entries ``start``..``stop`` (or the row numbers in ``rows``) in the
+        JSON shape of the RQ/RS table, previews read from ``path``.
+        """
+        values = self.strings.values
+        if rows is None:
+            rows = range(start, len(self) if stop is None else min(stop, len(self)))
+        entries = []
+        with open(path, "rb") as f:
+            for i in rows:
+                pair = self.pair[i]
+                entries.append({
+                    "line": self.line[i],
+                    "thread": values[self.thread[i]],
+                    "service": values[self.service[i]],
+                    "tag": values[self.tag[i]],
+                    "raw": read_preview(f, self.span_start[i], self.span_end[i]),
+                    "has_issue": bool(self.has_issue[i]),
+                    "issue_codes": values[self.issues[i]].split(",") if values[self.issues[i]] else [],
+                    "paired_line": self.line[pair] if pair >= 0 else None,
+                    "latency_ms": self.latency(i)
+                })
+        return entries
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-safe form for the persistent result store (arrays as base64)."""
+        def pack(column) -> str:
+            return base64.b64encode(column.tobytes() if isinstance(column, array) else bytes(column)).decode("ascii")
+
+        return {
+            "strings": self.strings.values,
+            "line": pack(self.line),
+            "span_start": pack(self.span_start),
+            "span_end": pack(self.span_end),
+            "timestamp": pack(self.timestamp),
+            "pair": pack(self.pair),
+            "thread": pack(self.thread),
+            "service": pack(self.service),
+            "tag": pack(self.tag),
+            "issues": pack(self.issues),
+            "has_issue": pack(self.has_issue),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RqrsTable":
+        table = cls()
+        table.strings = StringPool(state["strings"])
+        for name in ("line", "span_start", "span_end", "thread", "service", "tag"):
+            getattr(table, name).frombytes(base64.b64decode(state[name]))
+        table.has_issue = bytearray(base64.b64decode(state["has_issue"]))
+        if "issues" in state:
+            table.issues.frombytes(base64.b64decode(state["issues"]))
+        else:  # stored before issue codes were recorded
+            table.issues = array("I", [table.strings.code("")]) * len(table.has_issue)
+        for name in ("timestamp", "pair"):
+            if name in state:
+                getattr(table, name).frombytes(base64.b64decode(state[name]))
+            else:  # stored before RQs and RSs were paired
+                setattr(table, name, array("q", [-1]) * len(table.has_issue))
+        return table
+
+    def latency(self, row: int) -> Optional[int]:
+        """Milliseconds from a paired RQ to its RS (for either row); 0 if the RS was logged with an earlier time."""
+        pair = self.pair[row]
+        if pair < 0 or self.timestamp[row] < 0 or self.timestamp[pair] < 0:
+            return None
+        request, response = min(row, pair), max(row, pair)
+        return max(self.timestamp[response] - self.timestamp[request], 0)
+
+    def pair_messages(self) -> int:
+        """
+        Match every RS with the oldest unanswered RQ of the same thread and
+        message family (``OTA_AirBookRQ`` -> ``OTA_AirBookRS``), in one pass
+        over the rows.  Entries of unknown threads are never paired.
+        Returns the number of pairs.
+        """
+        values = self.strings.values
+        unknown = self.strings.codes.get("UNKNOWN")
+        families: Dict[int, Tuple[str, bool]] = {}  # tag code -> (family, is request)
+        waiting: Dict[Tuple[int, str], deque] = {}
+        pair = array("q", [-1]) * len(self)
+        pairs = 0
+        for i in range(len(self)):
+            thread = self.thread[i]
+            if thread == unknown:
+                continue
+            tag = self.tag[i]
+            family = families.get(tag)
+            if family is None:
+                name = values[tag]
+                family = families[tag] = (name[:-2], name.endswith("RQ"))
+            key = (thread, family[0])
+            if family[1]:
+                queue = waiting.get(key)
+                if queue is None:
+                    queue = waiting[key] = deque()
+                queue.append(i)
+            else:
+                queue = waiting.get(key)
+                if queue:
+                    request = queue.popleft()
+                    pair[request], pair[i] = i, request
+                    pairs += 1
+        self.pair = pair
+        return pairs
+
+
+################################
+# Latency analytics
+################################
+
+def latency_sketches(table: RqrsTable, start: int = 0) -> Dict[str, Any]:
+    """
+    Latency sketches of the paired rows from ``start`` on: overall, per
+    service and per response tag, plus how many RQs and RSs found no pair.
+    """
+    values = table.strings.values
+    timestamp, pair, tag, service = table.timestamp, table.pair, table.tag, table.service
+    requests = {code for code, value in enumerate(values) if value.endswith("RQ")}
+    overall = QuantileSketch()
+    groups: Tuple[Dict[int, QuantileSketch], Dict[int, QuantileSketch]] = ({}, {})  # by service, by tag
+    # Latencies wait in small per-group buffers and reach the sketches in batches
+    pending: Dict[Tuple[int, int], List[int]] = {}
+    unpaired = {"requests": 0, "responses": 0}
+
+    def flush(group: int, code: int, batch: List[int]) -> None:
+        sketch = groups[group].get(code)
+        if sketch is None:
+            sketch = groups[group][code] = QuantileSketch()
+        sketch.update(batch)
+        batch.clear()
+
+    latencies: List[int] = []
+    for i in range(start, len(table)):
+        request = pair[i]
+        if request < 0:
+            unpaired["requests" if tag[i] in requests else "responses"] += 1
+            continue
+        if request > i or timestamp[i] < 0 or timestamp[request] < 0:
+            continue  # a request (counted once, on its response) or an untimed pair
+        latency = timestamp[i] - timestamp[request]
+        latency = latency if latency > 0 else 0
+        latencies.append(latency)
+        for key in ((0, service[i]), (1, tag[i])):
+            batch = pending.get(key)
+            if batch is None:
+                batch = pending[key] = []
+            batch.append(latency)
+            if len(batch) >= 4096:
+                flush(key[0], key[1], batch)
+        if len(latencies) >= 4096:
+            overall.update(latencies)
+            latencies.clear()
+    overall.update(latencies)
+    for (group, code), batch in pending.items():
+        flush(group, code, batch)
+    return {
+        "pairs": overall.count,
+        "unpaired": unpaired,
+        "overall": overall,
+        "by_service": {values[code]: sketch for code, sketch in groups[0].items()},
+        "by_tag": {values[code]: sketch for code, sketch in groups[1].items()},
+    }
+
+
+################################
+# Filtering, sorting and cursors
+################################
+
+def _matching_codes(strings: StringPool, needle: Optional[str]) -> Optional[set]:
+    """Codes of the pooled strings containing ``needle`` (case-insensitive); None means no filter."""
+    if not needle:
+        return None
+    needle = needle.lower()
+    return {code for code, value in enumerate(strings.values) if needle in value.lower()}
+
+
+def select_rows(table: RqrsTable, tag: Optional[str] = None, service: Optional[str] = None,
+                thread: Optional[str] = None, has_issue: Optional[bool] = None,
+                line_from: Optional[int] = None, line_to: Optional[int] = None,
+                start: int = 0, stop: Optional[int] = None) -> List[int]:
+    """
+    Row numbers (in file order) of the entries matching every given filter.
+    Text filters are case-insensitive substrings, like the table filters of
+    the UI; they are resolved once against the string pool, so each row only
+    costs a few set lookups.  ``start``/``stop`` limit the rows considered.
+    """
+    stop = len(table) if stop is None else min(stop, len(table))
+    if line_from is not None:
+        start = max(start, bisect_right(table.line, line_from - 1))
+    if line_to is not None:
+        stop = min(stop, bisect_right(table.line, line_to))
+    checks = [(column, codes) for column, codes in (
+        (table.tag, _matching_codes(table.strings, tag)),
+        (table.service, _matching_codes(table.strings, service)),
+        (table.thread, _matching_codes(table.strings, thread)),
+    ) if codes is not None]
+    issue = None if has_issue is None else (1 if has_issue else 0)
+
+    rows = []
+    for i in range(start, stop):
+        if issue is not None and table.has_issue[i] != issue:
+            continue
+        if all(column[i] in codes for column, codes in checks):
+            rows.append(i)
+    return rows
+
+
+def encode_cursor(key: Tuple[Any, int]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key), separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """Inverse of :func:`encode_cursor`; raises ValueError on a malformed cursor."""
+    try:
+        value, line = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(line, int) or isinstance(value, (list, dict)):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return value, line
+
+
+def page_rows(table: RqrsTable, rows: List[int], sort: str = "line", descending: bool = False,
+              cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[int], Optional[str]]:
+    """
+    One page of ``rows`` ordered by ``sort`` (ties broken by line number)
+    and the cursor of the next page, or None on the last page.
+
+    Cursors hold the sort key of the last row sent rather than a position,
+    so pages stay consistent while a growing log gains new entries.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key {sort!r}, expected one of {', '.join(SORT_KEYS)}")
+    if sort == "line":
+        def key(i):
+            return table.line[i], table.line[i]
+    elif sort == "has_issue":
+        def key(i):
+            return table.has_issue[i], table.line[i]
+    else:
+        column, values = getattr(table, sort), table.strings.values
+
+        def key(i):
+            return values[column[i]], table.line[i]
+
+    if sort != "line":  # rows come in file order, which already is line order
+        rows = sorted(rows, key=key)
+    keys = [key(i) for i in rows]
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        try:
+            if descending:
+                cut = bisect_left(keys, after)
+                rows, keys = rows[:cut], keys[:cut]
+            else:
+                cut = bisect_right(keys, after)
+                rows, keys = rows[cut:], keys[cut:]
+        except TypeError as e:
+            raise ValueError(f"Cursor {cursor!r} does not belong to a {sort!r} sort") from e
+    if descending:
+        rows, keys = rows[::-1], keys[::-1]
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor(keys[limit - 1])
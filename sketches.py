@@ -0,0 +1,171 @@
+# ✅ Mergeable streaming sketches: quantiles and most frequent keys
+#
+# A log with millions of RQ/RS pairs cannot keep every latency just to report
+# p50/p99.  QuantileSketch (the DDSketch idea) counts values in logarithmic
+# buckets instead: every quantile it returns is within ``relative_accuracy``
+# of the true value, memory depends on the spread of the values (about 800
+# buckets from 1 ms to 1 h at 1%) rather than on their number, and two
+# sketches merge by adding bucket counts.
+#
+# Likewise a log has a new thread id for every request, so "top threads"
+# cannot count them all.  TopKCounter keeps the most counted keys only.
+
+import math
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+DEFAULT_ACCURACY = 0.01
+MAX_BUCKETS = 2048  # beyond this the lowest buckets are folded together
+DEFAULT_TOP_KEYS = 4096  # keys a TopKCounter keeps counting
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch over non-negative values."""
+
+    __slots__ = ("relative_accuracy", "gamma", "log_gamma", "buckets", "zero_count",
+                 "count", "total", "min", "max")
+
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0  # values too small for a bucket (0 ms latencies)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1) -> None:
+        value = max(value, 0.0)
+        if value < 1e-9:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+            if len(self.buckets) > MAX_BUCKETS:
+                self._collapse()
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add many values; repeated ones (latencies in whole ms) cost one bucket update each."""
+        for value, count in Counter(values).items():
+            self.add(value, count)
+
+    def _collapse(self) -> None:
+        """Fold the lowest buckets into one, keeping MAX_BUCKETS; only low quantiles lose accuracy."""
+        keys = sorted(self.buckets)
+        folded = keys[:len(keys) - MAX_BUCKETS + 1]
+        target = folded[-1]
+        self.buckets[target] = sum(self.buckets.pop(key) for key in folded[:-1]) + self.buckets[target]
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with a different relative accuracy")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        while len(self.buckets) > MAX_BUCKETS:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` (0..1); None for an empty sketch."""
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self, quantiles: Iterable[float]) -> Dict[str, Any]:
+        """Count, mean, min, max and the requested quantiles (as ``p50``, ``p99.9``, ...)."""
+        stats: Dict[str, Any] = {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2) if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q in quantiles:
+            value = self.quantile(q)
+            stats[f"p{q * 100:g}"] = round(value, 2) if value is not None else None
+        return stats
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-safe form (bucket keys as strings)."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(key): count for key, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"])
+        sketch.buckets = {int(key): count for key, count in state["buckets"].items()}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        sketch.total = state["total"]
+        if sketch.count:
+            sketch.min, sketch.max = state["min"], state["max"]
+        return sketch
+
+
+class TopKCounter:
+    """
+    Counts of the most frequent keys in bounded memory (lossy counting).
+
+    Up to ``capacity`` keys the counts are exact.  Past twice that, the
+    least counted keys are dropped down to ``capacity``; ``floor`` is the
+    highest count ever dropped, so a count is at most ``floor`` too low and
+    any key counted more than ``floor`` times since its first drop is kept.
+    """
+
+    __slots__ = ("capacity", "counts", "floor")
+
+    def __init__(self, capacity: int = DEFAULT_TOP_KEYS):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.floor = 0
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        counts = self.counts
+        counts[key] = counts.get(key, 0) + count
+        if len(counts) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self) -> None:
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        self.floor = max(self.floor, ranked[self.capacity][1])
+        self.counts = dict(ranked[:self.capacity])
+
+    def merge(self, other: "TopKCounter") -> None:
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.floor += other.floor
+        if len(self.counts) > 2 * self.capacity:
+            self._prune()
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Like ``Counter.most_common``."""
+        return Counter(self.counts).most_common(n)
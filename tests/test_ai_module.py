@@ -1,4 +1,5 @@
 import os
+import random
 import sys
 
 import pytest
@@ -6,7 +7,16 @@ import pytest
 # Ensure the repository root is on sys.path for direct script execution
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from ai_module import detect_similar_errors
+from difflib import SequenceMatcher
+
+from ai_module import (
+    LogContentAnalyzer, analyze_log_content, analyze_log_file, analyze_log_range, detect_similar_errors,
+    merge_log_ranges,
+)
+from error_clusters import ErrorClusterer, cluster_errors, error_template
+from log_index import get_time_index
+from log_scanner import scan_errors_range, timestamp_ms
+from rqrs_parser import split_aligned_ranges
 
 
 def test_detect_similar_errors_counts_duplicates():
@@ -29,3 +39,227 @@ def test_detect_similar_errors_no_similar_lines():
     ]
 
     assert detect_similar_errors(error_lines) == 0
+
+
+def test_cluster_errors_groups_lines_that_differ_in_variable_tokens():
+    """IDs, numbers and timestamps are masked; groups report size and first line."""
+    error_lines = [
+        (1, "2025-07-28T10:00:01,120 [ERROR] [task-1] Timeout after 3000 ms for booking 81723"),
+        (2, "2025-07-28T10:00:02,450 [WARN] [task-2] Cache miss for key 5f3a9c0d1e"),
+        (3, "2025-07-28T10:00:03,001 [ERROR] [task-7] Timeout after 15000 ms for booking 9"),
+        (4, "2025-07-28T10:00:04,999 [ERROR] [task-3] Timeout after 500 ms for booking 100200300"),
+        (5, "2025-07-28T10:00:05,000 [FATAL] [task-4] Out of memory"),
+    ]
+
+    assert error_template(error_lines[0][1]) == "<TS> [ERROR] [task-<NUM>] Timeout after <NUM> ms for booking <NUM>"
+    groups = cluster_errors(error_lines)
+    assert [(g["size"], g["line_number"]) for g in groups] == [(3, 1), (1, 2), (1, 5)]
+    assert groups[0]["representative"] == error_lines[0][1]
+    assert detect_similar_errors(error_lines) == 2
+
+
+def _legacy_similar_count(error_lines, threshold=0.85):
+    """The pairwise loop detect_similar_errors used to run."""
+    matched, count = set(), 0
+    for i, (_, line_i) in enumerate(error_lines):
+        for j in range(i + 1, len(error_lines)):
+            if j not in matched and SequenceMatcher(None, line_i, error_lines[j][1]).ratio() >= threshold:
+                matched.update({i, j})
+                count += 1
+                break
+    return count
+
+
+def test_detect_similar_errors_matches_pairwise_count_on_repeated_messages():
+    """Repeats of a few messages and some one-off lines count as the pairwise loop does on their templates."""
+    rnd = random.Random(3)
+    messages = [
+        "[ERROR] Supplier call failed for booking {} with status {}",
+        "[WARN] Retrying fare search {} attempt {}",
+        "[ERROR] java.lang.NullPointerException at PricingService.price(PricingService.java:{}) id={}",
+    ]
+    one_offs = iter([
+        "[FATAL] Disk quota exhausted on /var/log",
+        "[ERROR] Unexpected EOF while reading the session store",
+        "[WARN] Deprecated configuration key matrix.cache.ttl",
+        "[FATAL] OutOfMemoryError: Java heap space",
+        "[ERROR] SSL handshake with ndc.example.com aborted",
+        "[WARN] Slow query on PNR table",
+        "[ERROR] Queue listener stopped unexpectedly",
+        "[FATAL] Could not bind port",
+    ])
+    error_lines = []
+    for n in range(1, 201):
+        if n % 25 == 0:
+            line = next(one_offs)
+        else:
+            line = rnd.choice(messages).format(rnd.randint(10000, 99999), rnd.randint(100, 599))
+        error_lines.append((n, line))
+
+    templates = [(n, error_template(line)) for n, line in error_lines]
+    assert detect_similar_errors(error_lines) == _legacy_similar_count(templates) == 200 - 8 - 3
+
+
+def test_analyze_log_content_lists_repeating_error_groups():
+    """The AI summary reports the largest groups of similar error lines."""
+    log_text = "\n".join(
+        [f"2025-07-28T10:00:{i:02d},000 [ERROR] [com.datalex.matrix.Pricing] Call {i} failed" for i in range(6)]
+        + ["2025-07-28T10:01:00,000 [INFO] [com.datalex.matrix.Pricing] done"]
+    )
+
+    result = analyze_log_content(log_text)
+
+    assert result["error_groups"] == [{"size": 6, "line_number": 1, "representative": log_text.splitlines()[0]}]
+    assert any("5 repeating error lines" in anomaly for anomaly in result["anomalies"])
+
+
+def test_level_markers_on_continuation_lines_count_like_the_error_table(tmp_path):
+    """A [WARN]/[ERROR] marker anywhere on any line is counted, as /analyze_logs counts it."""
+    lines = [
+        "2025-07-28T10:00:00,000 [INFO] [default task-1] [1722145600062_1062] [com.datalex.matrix.Pricing] Retry",
+        "  [WARN] supplier answered late",
+        "2025-07-28T10:00:01,000 [ERROR] [default task-2] [1722145600062_1063] [com.datalex.matrix.Booking] Failed",
+        "Caused by: [ERROR] [FATAL] connection reset",
+        "<Errors>[ERROR]</Errors>",
+        "2025-07-28T10:00:02,000 [DEBUG] [default task-3] [1722145600062_1064] [com.datalex.matrix.Booking] ok",
+    ]
+    log = tmp_path / "app.log"
+    log.write_text("\n".join(lines))
+    counts, rows, _ = scan_errors_range(str(log), "app.log")
+
+    analyzer = LogContentAnalyzer()
+    analyzer.feed_text("\n".join(lines))
+    assert {level: count for level, count in analyzer.level_counter.items() if count} == \
+        {level: count for level, count in counts.items() if count} == {"WARN": 1, "ERROR": 2, "FATAL": 1}
+    groups = analyzer.error_groups.groups()
+    assert sum(group["size"] for group in groups) == len(rows) == 4
+    assert {group["line_number"] for group in groups} <= {row["line_number"] for row in rows}
+    # Only the timestamp line's own service failed; continuation lines have none
+    assert dict(analyzer.error_services_counter) == {"Booking": 1}
+
+    by_line = LogContentAnalyzer()
+    by_line.feed_lines(lines)
+    assert by_line.result() == analyzer.result()
+
+
+def _sample_log(lines=400):
+    rnd = random.Random(11)
+    out = []
+    for i in range(lines):
+        level = rnd.choice(["INFO", "INFO", "DEBUG", "WARN", "ERROR", "FATAL"])
+        thread = f"17221456000{rnd.randint(10, 14)}_10{rnd.randint(10, 99)}"
+        service = rnd.choice(["Pricing", "Booking", "AirShopping"])
+        out.append(f"2025-07-28T10:{i // 60 % 60:02d}:{i % 60:02d},000 [{level}] [default task-{i % 7}] "
+                   f"[{thread}] [com.datalex.matrix.{service}] Step {rnd.randint(1, 5)} result ñ={rnd.random():.3f}")
+        if level == "ERROR":
+            out.append("java.lang.IllegalStateException: supplier timeout")
+    return "\r\n".join(out)
+
+
+def test_streamed_analysis_matches_whole_text_analysis(tmp_path):
+    """Bytes fed in arbitrary chunks (lines and UTF-8 characters split) give the same insights."""
+    text = _sample_log()
+    expected = analyze_log_content(text)
+
+    data = text.encode("utf-8")
+    rnd = random.Random(5)
+    analyzer = LogContentAnalyzer()
+    pos = 0
+    while pos < len(data):
+        size = rnd.randint(1, 300)
+        analyzer.feed_bytes(data[pos:pos + size])
+        pos += size
+    assert analyzer.result() == expected
+
+    log = tmp_path / "app.log"
+    log.write_bytes(data)
+    assert analyze_log_file(str(log), chunk_bytes=4096) == expected
+    start = data.index(b"\n", 1000) + 1
+    end = data.index(b"\n", 5000) + 1
+    assert analyze_log_file(str(log), start, end, chunk_bytes=777) == analyze_log_content(
+        data[start:end].decode("utf-8"))
+
+
+def test_merged_range_analyses_match_sequential_analysis(tmp_path):
+    """Byte ranges analyzed separately (as the process pool does) and merged in order give the same insights."""
+    data = (_sample_log(1500) + "\r\n").encode("utf-8")
+    log = tmp_path / "app.log"
+    log.write_bytes(data)
+    expected = analyze_log_file(str(log))
+
+    edges = [0] + [data.index(b"\n", pos) + 1 for pos in (7000, 41000, 90000)] + [len(data)]
+    merged = LogContentAnalyzer()
+    for start, end in zip(edges, edges[1:]):
+        merged.merge(analyze_log_range(str(log), start, end, chunk_bytes=999))
+    assert merged.result() == expected
+
+
+def test_window_range_analyses_report_file_line_numbers(tmp_path):
+    """Ranges of a from/to window are numbered from the window's first line in the file, not from 1."""
+    text = _sample_log(1500) + "\r\n"
+    log = tmp_path / "app.log"
+    data = text.encode("utf-8")
+    log.write_bytes(data)
+    lines = text.split("\r\n")
+
+    from_ms = timestamp_ms(lines[0].replace("T10:00:00", "T10:08:00"))
+    to_ms = timestamp_ms(lines[0].replace("T10:00:00", "T10:16:00"))
+    start, lines_before, end = get_time_index(str(log), str(tmp_path / "index"), 64).window(from_ms, to_ms)
+    assert lines_before > 0
+    ranges = split_aligned_ranges(str(log), 3, start, end)
+    merged = merge_log_ranges([analyze_log_range(str(log), a, b, chunk_bytes=999) for a, b in ranges],
+                              lines_before + 1, source="app.log")
+
+    groups = merged.error_groups.groups()
+    assert groups and merged.total_lines == data.count(b"\n", start, end)
+    for group in groups:
+        assert lines[group["line_number"] - 1] == group["representative"]
+        assert from_ms <= timestamp_ms(group["representative"]) < to_ms
+
+
+def test_merge_log_combines_files_and_keeps_their_line_numbers(tmp_path):
+    """Per-file analyses fold into one summary; groups and rows say which log they come from."""
+    first = "\n".join(f"2025-07-28T10:00:{i:02d},000 [ERROR] [default task-1] [com.datalex.tdp.Booking] "
+                      f"Call {i} failed" for i in range(4)) + "\n"
+    second = ("2025-07-28T11:00:00,000 [INFO] [default task-2] [com.datalex.matrix.Pricing] ok\n"
+              + "\n".join(f"2025-07-28T11:00:{i:02d},000 [ERROR] [default task-2] [com.datalex.tdp.Booking] "
+                          f"Call {i} failed" for i in range(1, 3)) + "\n")
+    (tmp_path / "server.log.1").write_text(first, encoding="utf-8")
+    (tmp_path / "server.log.2").write_text(second, encoding="utf-8")
+
+    combined = LogContentAnalyzer()
+    for name in ["server.log.1", "server.log.2"]:
+        combined.merge_log(analyze_log_range(str(tmp_path / name), source=name))
+    result = combined.result()
+    together = analyze_log_content(first + second)
+
+    assert result["failing_services"] == together["failing_services"] == ["Booking (6)"]
+    assert result["top_services"] == together["top_services"]
+    assert result["logs"] == [{"log": "server.log.1", "lines": 4, "errors": 4},
+                              {"log": "server.log.2", "lines": 3, "errors": 2}]
+    assert result["error_groups"] == [{"size": 6, "line_number": 1, "representative": first.splitlines()[0],
+                                       "log": "server.log.1"}]
+    assert result["summary"].startswith("The 2 log files contain 7 lines.")
+    assert "logs" not in together
+
+
+def test_error_clusterer_merge_shifts_line_numbers_and_joins_groups():
+    """Groups of a later clusterer join the similar groups already known, numbered after our lines."""
+    first, second = ErrorClusterer(), ErrorClusterer()
+    first.add(1, "[ERROR] supplier timeout after 3000 ms")
+    second.add(1, "[WARN] cache miss for key 42")
+    second.add(2, "[ERROR] supplier timeout after 5000 ms")
+    first.merge(second, line_offset=10)
+
+    assert [(g["size"], g["line_number"]) for g in first.groups()] == [(2, 1), (1, 11)]
+
+
+def test_error_clusterer_keeps_a_bounded_number_of_groups():
+    """Past max_groups, lines unlike every kept group are only counted."""
+    clusterer = ErrorClusterer(max_groups=2)
+    for n, line in enumerate(["[ERROR] disk full", "[WARN] slow query on table", "[ERROR] disk full",
+                              "[FATAL] heap exhausted", "[WARN] slow query on table"], 1):
+        clusterer.add(n, line)
+
+    assert [(g["size"], g["line_number"]) for g in clusterer.groups()] == [(2, 1), (2, 2)]
+    assert clusterer.ungrouped == 1
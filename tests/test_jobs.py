@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from jobs import JobScheduler, JobState
+
+USER, BACKGROUND = 1, 2
+
+
+def test_background_jobs_leave_a_slot_for_users():
+    """Background work is bounded and queued by priority; a user job starts at once."""
+    async def scenario():
+        scheduler = JobScheduler(workers=3, reserved=1, urgent_priority=USER)
+        release = asyncio.Event()
+        started = []
+
+        def work(name):
+            async def run():
+                started.append(name)
+                await release.wait()
+                return name
+            return run
+
+        preload = [scheduler.submit(f"bg{i}", work(f"bg{i}"), BACKGROUND) for i in range(5)]
+        await asyncio.sleep(0)
+        assert started == ["bg0", "bg1"]
+        assert [job.state for job in preload[2:]] == [JobState.QUEUED] * 3
+
+        user = scheduler.submit("user", work("user"), USER)
+        await asyncio.sleep(0)
+        assert started[-1] == "user" and scheduler.running == 3
+
+        release.set()
+        assert await user.wait() == "user"
+        assert await scheduler.wait_all(preload) == [f"bg{i}" for i in range(5)]
+        assert scheduler.running == 0 and scheduler.get("bg4").state is JobState.DONE
+
+    asyncio.run(scenario())
+
+
+def test_user_request_promotes_instead_of_restarting():
+    """Resubmitting an active key returns the same job, raised in priority, started only once."""
+    async def scenario():
+        scheduler = JobScheduler(workers=2, reserved=1, urgent_priority=USER)
+        release = asyncio.Event()
+        runs = []
+
+        def work(name):
+            async def run():
+                runs.append(name)
+                await release.wait()
+                if name == "broken":
+                    raise RuntimeError("parse failed")
+                return name
+            return run
+
+        running = scheduler.submit("a.log", work("a.log"), BACKGROUND)
+        queued = scheduler.submit("b.log", work("b.log"), BACKGROUND)
+        await asyncio.sleep(0)
+        assert (running.state, queued.state) == (JobState.RUNNING, JobState.QUEUED)
+
+        assert scheduler.submit("a.log", work("again"), USER) is running
+        assert scheduler.submit("b.log", work("again"), USER) is queued
+        await asyncio.sleep(0)
+        assert queued.state is JobState.RUNNING, "the promoted job may use the reserved slot"
+        assert running.priority == queued.priority == USER
+
+        broken = scheduler.submit("c.log", work("broken"), USER)
+        release.set()
+        assert await scheduler.wait_all([running, queued, broken]) == ["a.log", "b.log", None]
+        assert runs == ["a.log", "b.log", "broken"]
+        assert broken.state is JobState.FAILED and broken.error == "parse failed"
+        with pytest.raises(RuntimeError):
+            await broken.wait()
+
+    asyncio.run(scenario())
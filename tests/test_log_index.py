@@ -0,0 +1,157 @@
+import os
+import sys
+
+import pytest
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from log_index import LevelIndex, LineIndex, TimeIndex, get_level_index, get_line_index, get_time_index, sidecar_path
+from log_scanner import ErrorCollector, scan_file, timestamp_ms
+
+
+def _write_log(path, lines, trailing_newline=True):
+    data = "\n".join(lines) + ("\n" if trailing_newline else "")
+    path.write_bytes(data.encode("utf-8"))
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_line_index_maps_lines_to_offsets(tmp_path, trailing_newline):
+    """Every indexed line should start exactly where the file says it does."""
+    log = tmp_path / "app.log"
+    lines = ["first", "", "third line", "fourth"]
+    _write_log(log, lines, trailing_newline)
+
+    index = get_line_index(str(log), str(tmp_path / "index"))
+
+    assert index.line_count == len(lines)
+    assert index.read_lines(1, 10) == lines
+    assert index.read_line(3) == "third line"
+    assert list(index.iter_lines(3)) == [(3, "third line"), (4, "fourth")]
+    assert [n for n, _ in index.iter_lines_backward(4, block=2)] == [4, 3, 2, 1]
+
+
+def test_line_index_sidecar_is_reused_and_rebuilt_on_change(tmp_path):
+    """The sidecar is loaded while the fingerprint matches and rebuilt once the file changes."""
+    log = tmp_path / "app.log"
+    index_dir = str(tmp_path / "index")
+    _write_log(log, ["a", "b"])
+
+    built = get_line_index(str(log), index_dir)
+    target = sidecar_path(str(log), index_dir, ".lidx")
+    assert os.path.isfile(target)
+
+    loaded = LineIndex.load(str(log), target, built.fingerprint)
+    assert loaded is not None and list(loaded.offsets) == list(built.offsets)
+
+    _write_log(log, ["a", "b", "c"])
+    rebuilt = get_line_index(str(log), index_dir)
+    assert rebuilt.line_count == 3
+    assert LineIndex.load(str(log), target, built.fingerprint) is None
+
+
+def _level_lines(start, count):
+    levels = ["INFO", "WARN", "ERROR", "INFO", "FATAL", "WARN"]
+    lines = []
+    for i in range(start, start + count):
+        level = levels[i % len(levels)]
+        lines.append(f"2025-07-28T10:00:{i % 60:02d},000 [{level}] [task-{i}] [{i}_1] [com.x.Svc{i % 3}] event {i}")
+        if level == "ERROR":
+            lines.append("java.lang.IllegalStateException: [WARN] nested marker")
+    return lines
+
+
+@pytest.mark.parametrize("mode", ["stream", "mmap"])
+def test_level_index_matches_error_scan_and_grows_incrementally(tmp_path, mode):
+    """Counts and rows come from the index alone; an appended file is indexed from its checkpoint."""
+    log = tmp_path / "app.log"
+    index_dir = str(tmp_path / "index")
+    _write_log(log, _level_lines(0, 40))
+
+    index = get_level_index(str(log), index_dir, mode)
+    errors = ErrorCollector("app.log")
+    scan_file(str(log), [errors])
+    assert index.counts == errors.counts
+    assert index.read_rows("app.log", index.entries()) == errors.errors
+    assert [n for n, _ in index.entries(["FATAL"], after_line=10)] == [
+        row["line_number"] for row in errors.errors if row["line_number"] > 10 and "[FATAL]" in row["error_message"]]
+
+    first_error = index.lines["ERROR"][0]
+    assert index.next_line(first_error, ["ERROR", "FATAL"]) == min(index.lines["FATAL"][0], index.lines["ERROR"][1])
+    assert index.next_line(first_error, ["ERROR"], backward=True) is None
+    assert index.next_line(10 ** 6) is None
+
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("\n".join(_level_lines(40, 25)) + "\n")
+    grown = get_level_index(str(log), index_dir, mode)
+    assert grown.checkpoint["offset"] > 0
+    rebuilt = LevelIndex.build(str(log), mode)
+    assert (grown.lines, grown.offsets, grown.checkpoint) == (rebuilt.lines, rebuilt.offsets, rebuilt.checkpoint)
+
+    loaded = LevelIndex.load(str(log), sidecar_path(str(log), index_dir, ".vidx"))
+    assert (loaded.lines, loaded.offsets, loaded.checkpoint) == (rebuilt.lines, rebuilt.offsets, rebuilt.checkpoint)
+
+
+def _timed_lines(start, count):
+    """Entries a second apart (every seventh one logged a little late), some spanning two lines."""
+    lines = []
+    for i in range(start, start + count):
+        second = i - 3 if i % 7 == 6 else i
+        lines.append(f"2025-07-28T10:{second // 60:02d}:{second % 60:02d},{i % 1000:03d} [INFO] [t] event {i}")
+        if i % 5 == 0:
+            lines.append("    continued")
+    return lines
+
+
+def _expected_window(lines, from_ms, to_ms):
+    """Brute force: first line from the first entry >= from_ms to the last entry < to_ms, inclusive."""
+    entries = [(n, timestamp_ms(line)) for n, line in enumerate(lines, 1) if line[:1].isdigit()]
+    first = next((n for n, ms in entries if from_ms is None or ms >= from_ms), None)
+    last = max((n for n, ms in entries if to_ms is None or ms < to_ms), default=None)
+    if first is None or last is None or last < first:
+        return None
+    ends = [n for n, _ in entries if n > last]
+    return first, (ends[0] - 1 if ends else len(lines))
+
+
+def test_time_index_windows_match_brute_force_and_grow_incrementally(tmp_path):
+    """A from/to window maps to exactly the byte range of its entries, also after the log grew."""
+    log = tmp_path / "app.log"
+    index_dir = str(tmp_path / "index")
+    lines = _timed_lines(0, 230)
+    _write_log(log, lines)
+
+    def check(index):
+        data = log.read_bytes()
+        base = timestamp_ms("2025-07-28T10:00:00,000")
+        for from_s, to_s in [(None, None), (0, 5), (17, 18), (40, 41), (100, None), (None, 64), (250, 300),
+                             (-5, 0), (50, 40), (3, 200)]:
+            from_ms = None if from_s is None else base + from_s * 1000
+            to_ms = None if to_s is None else base + to_s * 1000
+            expected = _expected_window(lines, from_ms, to_ms)
+            found = index.window(from_ms, to_ms)
+            if expected is None:
+                assert found is None
+                continue
+            start, lines_before, end = found
+            assert lines_before == expected[0] - 1
+            assert data[start:end].decode().splitlines() == lines[expected[0] - 1:expected[1]]
+
+    index = get_time_index(str(log), index_dir, every=16)
+    assert len(index.offsets) > 2
+    check(index)
+
+    with open(log, "a", encoding="utf-8") as f:
+        appended = _timed_lines(230, 70)
+        f.write("\n".join(appended) + "\n")
+    lines += appended
+    grown = get_time_index(str(log), index_dir, every=16)
+    assert grown.checkpoint["offset"] > 0
+    rebuilt = TimeIndex.build(str(log), 16)
+    assert (grown.offsets, grown.lines, grown.mins, grown.maxs) == (rebuilt.offsets, rebuilt.lines,
+                                                                   rebuilt.mins, rebuilt.maxs)
+    check(grown)
+    check(TimeIndex.load(str(log), sidecar_path(str(log), index_dir, ".tidx")))
+
+    full = get_level_index(str(log), index_dir)
+    assert full.between(0, os.path.getsize(log)).lines == full.lines
@@ -0,0 +1,167 @@
+import os
+import sys
+
+import pytest
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from log_index import file_fingerprint
+from log_scanner import (
+    ErrorCollector, LogScanner, ScanProgress, ScanSubscriber, SearchCollector, checkpoint_state,
+    iter_search_batches, make_checkpoint, run_scan, scan_file,
+)
+from rqrs_parser import RqrsCollector
+
+LOG_LINES = [
+    "2025-07-28T10:00:00,001 [INFO] [task-1] [1722145600001_1001] [com.datalex.matrix.AirShopping] XML Request:",
+    '<OTA_AirLowFareSearchRQ Version="1.0">',
+    "",
+    "  <Item>1</Item>",
+    "</OTA_AirLowFareSearchRQ>",
+    "2025-07-28T10:00:01,002 [ERROR] [task-2] [1722145600002_1002] [com.datalex.tdp.Booking] Call failed",
+    "java.lang.RuntimeException: supplier timeout",
+    "2025-07-28T10:00:02,003 [INFO] [task-3] [1722145600003_1003] [com.datalex.tdp.Booking] XML Response:",
+    "<OTA_AirBookRS><Errors><Error Code=\"42\"/></Errors></OTA_AirBookRS>",
+    "2025-07-28T10:00:03,004 [WARN] [task-4] [1722145600004_1004] [com.datalex.tdp.Booking] Supplier slow",
+]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(LOG_LINES) + "\n", encoding="utf-8")
+    return str(path)
+
+
+class _CountingSubscriber(ScanSubscriber):
+    wants_records = True
+
+    def __init__(self):
+        self.records = []
+
+    def on_record(self, record):
+        self.records.append((record.line_number, record.offset, record.is_entry_start, record.thread))
+
+
+def test_one_pass_feeds_every_subscriber(log_file):
+    """RQ/RS, error and raw record consumers are all served by a single scan."""
+    rqrs, errors, counter = RqrsCollector(), ErrorCollector("app.log"), _CountingSubscriber()
+
+    assert scan_file(log_file, [rqrs, errors, counter]) == len(LOG_LINES)
+
+    assert [(e["line"], e["tag"], e["service"], e["has_issue"]) for e in rqrs.entries] == [
+        (2, "OTA_AirLowFareSearchRQ", "AirShopping", False),
+        (9, "OTA_AirBookRS", "Booking", True),
+    ]
+    assert errors.counts == {"FATAL": 0, "ERROR": 1, "WARN": 1}
+    assert errors.errors[0]["thread_id"] == "task-2" and errors.errors[0]["service"] == "Booking"
+
+    with open(log_file, "rb") as f:
+        data = f.read()
+    for line_number, offset, is_entry_start, thread in counter.records:
+        assert data[offset:].startswith(LOG_LINES[line_number - 1].encode())
+    assert counter.records[6][3] == "1722145600002_1002", "continuation lines inherit the entry thread"
+
+
+def test_search_modes(log_file):
+    """Line mode reports each matching line; entry mode reports whole entries, including the last one."""
+    by_line = SearchCollector("app.log", "SUPPLIER", mode="line")
+    by_entry = SearchCollector("app.log", "supplier", mode="entry")
+    scan_file(log_file, [by_line, by_entry])
+
+    assert [r["line_number"] for r in by_line.results] == [7, 10]
+    assert by_line.results[0]["snippet"] == "\n".join(LOG_LINES[5:7])
+    assert [r["line_number"] for r in by_entry.drain()] == [6, 10]
+    assert by_entry.occurrences == 2
+
+
+def test_iter_batches_yields_progress(log_file):
+    """Batched scanning hands control back to the caller between batches."""
+    collector = SearchCollector("app.log", "xml", mode="line")
+    progress = list(LogScanner(log_file, [collector]).iter_batches(batch_lines=3))
+
+    assert progress == [3, 6, 9, 10]
+    assert len(collector.drain()) == 2
+
+
+def test_progress_is_published_between_batches(log_file):
+    """The line scanner updates its ScanProgress once per batch and completes it at the end."""
+    progress = ScanProgress()
+    scanner = LogScanner(log_file, [RqrsCollector()], progress=progress)
+    seen = [(progress.bytes_done, progress.lines_done) for _ in scanner.iter_batches(batch_lines=4)]
+
+    size = os.path.getsize(log_file)
+    assert seen[0] == (sum(len(line) + 1 for line in LOG_LINES[:4]), 4)
+    assert seen[-1] == (size, len(LOG_LINES))
+    assert progress.finished is not None and progress.snapshot()["percent"] == 100.0
+
+    fast = ScanProgress()
+    run_scan(log_file, [RqrsCollector(), ErrorCollector("app.log")], mode="mmap", progress=fast)
+    assert (fast.total_bytes, fast.bytes_done, fast.lines_done) == (size, size, len(LOG_LINES))
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_mmap_mode_matches_stream_mode(tmp_path, trailing_newline):
+    """The byte-level scanner must report exactly what the line scanner reports."""
+    lines = ["orphan line mentioning a supplier before the first entry"] + LOG_LINES + [
+        "XML Request: marker on a continuation line",
+        "<NotASpanRQ/>",
+        "2025-07-28T10:00:04,005 [INFO] [task-5] [1722145600005_1005] [com.datalex.tdp.Booking] XML Request:",
+        "plain text before the XML",
+        "\u00a0<OTA_AirPriceRQ>\r",
+        "\u00a0",
+        "  <Fare>caf\u00e9</Fare>",
+        "</OTA_AirPriceRQ>",
+        "trailer closes the span",
+        "<Ignored/>",
+    ]
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""), encoding="utf-8")
+    log_file = str(path)
+
+    def run(mode):
+        rqrs, errors = RqrsCollector(), ErrorCollector("app.log")
+        line_count = scan_file(log_file, [rqrs, errors], mode=mode)
+        searches = []
+        for text in ("supplier", "XML", "caf"):
+            for search_mode in ("line", "entry"):
+                collector = SearchCollector("app.log", text, mode=search_mode)
+                progress = list(iter_search_batches(log_file, collector, 2, mode=mode))
+                searches.append((progress[-1], collector.results, collector.occurrences))
+        return line_count, rqrs.entries, errors.counts, errors.errors, searches
+
+    stream, fast = run("stream"), run("mmap")
+    assert fast == stream
+    assert [e["tag"] for e in stream[1]] == ["OTA_AirLowFareSearchRQ", "OTA_AirBookRS", "OTA_AirPriceRQ"]
+
+
+@pytest.mark.parametrize("mode", ["stream", "mmap"])
+def test_resume_after_append_matches_full_scan(tmp_path, mode):
+    """Resuming from a checkpoint after the file grew must equal rescanning the whole file."""
+    path = tmp_path / "app.log"
+    log_file = str(path)
+    # The file is cut in the middle of an entry that is still being written
+    head, tail = "\n".join(LOG_LINES[:9]) + "\n", "\n".join(LOG_LINES[9:]) + "\n"
+    path.write_text(head, encoding="utf-8")
+
+    first = RqrsCollector()
+    scanner = run_scan(log_file, [first], mode=mode)
+    checkpoint = make_checkpoint(log_file, file_fingerprint(log_file), scanner.resume_offset, scanner.resume_line)
+    assert checkpoint["line"] == 7, "resume from the last timestamp line seen"
+    assert checkpoint_state(log_file, checkpoint, file_fingerprint(log_file)) == "unchanged"
+
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write(tail)
+    assert checkpoint_state(log_file, checkpoint, file_fingerprint(log_file)) == "appended"
+
+    resumed = RqrsCollector()
+    line_count = scan_file(log_file, [resumed], checkpoint["offset"], first_line=checkpoint["line"] + 1, mode=mode)
+    merged = first.entries.head(first.entries.count_through_line(checkpoint["line"] + 1))
+    merged.extend(resumed.entries)
+    full = RqrsCollector()
+    assert line_count == scan_file(log_file, [full], mode=mode) == len(LOG_LINES)
+    assert merged == full.entries
+
+    path.write_text((head + tail).replace("task-1", "task-9"), encoding="utf-8")  # rewritten in place
+    assert checkpoint_state(log_file, checkpoint, file_fingerprint(log_file)) == "replaced"
@@ -0,0 +1,83 @@
+import os
+import sys
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from log_scanner import error_row
+from log_tokenizer import header_fields, tokenize_line, tokenize_text
+from rqrs_parser import scan_rqrs_range
+
+HEADER = ("2025-07-28T10:00:05,715 [ERROR] [default task-9] [1722145600062_1062] "
+          "[com.datalex.matrix.AirShopping] Call failed [org.example.Retry]")
+# JBoss HTTP connector threads carry the bind address in the task name
+DOTTED_TASK = ("2025-07-28T10:00:05,715 [INFO] [http-/10.0.0.1:8080-3] [1722145600062_1062] "
+               "[com.datalex.matrix.AirShopping] XML Request:")
+
+
+def test_tokenize_line_reads_the_prefix_fields():
+    """One match yields timestamp, level, task, thread, category and service."""
+    assert tokenize_line(HEADER) == ("2025-07-28T10:00:05,715", "ERROR", "default task-9", "1722145600062_1062",
+                                     "com.datalex.matrix.AirShopping", "AirShopping")
+
+
+def test_tokenize_line_tolerates_missing_prefix_fields():
+    """Task, thread and category are optional; a thread id is never taken for a task."""
+    assert tokenize_line("2025-07-28T10:00:05,715 [WARN] [1722145600062_1062] [com.x.Pricing] slow") == (
+        "2025-07-28T10:00:05,715", "WARN", None, "1722145600062_1062", "com.x.Pricing", "Pricing")
+    assert tokenize_line("2025-07-28T10:00:05,715 [INFO] [com.datalex.matrix.Pricing] done") == (
+        "2025-07-28T10:00:05,715", "INFO", None, None, "com.datalex.matrix.Pricing", "Pricing")
+    assert tokenize_line("2025-07-28T10:00:05,715 started") == ("2025-07-28T10:00:05,715", None, None, None,
+                                                                None, None)
+
+
+def test_tokenize_line_reads_a_dotted_task_name():
+    """A task name with dots is still the task when a thread id follows it."""
+    assert tokenize_line(DOTTED_TASK) == ("2025-07-28T10:00:05,715", "INFO", "http-/10.0.0.1:8080-3",
+                                          "1722145600062_1062", "com.datalex.matrix.AirShopping", "AirShopping")
+    assert header_fields(DOTTED_TASK) == ("1722145600062_1062", "AirShopping")
+
+
+def test_continuation_lines_are_rejected():
+    for line in ["", "    at com.datalex.Foo.bar(Foo.java:12)", "<AirShoppingRQ>", "2025-07-28 10:00 not a header"]:
+        assert tokenize_line(line) is None
+    assert header_fields("Caused by: [ERROR] x") == ("UNKNOWN", "UNKNOWN")
+
+
+def test_tokenize_text_matches_line_by_line_tokenizing():
+    """The batch API numbers lines like splitting on \\n and skips continuation lines."""
+    lines = [HEADER, "java.lang.IllegalStateException: boom", "", "\tat x.y(Z.java:1)",
+             "2025-07-28T10:00:06,001 [INFO] [default task-1] [com.datalex.tdp.Booking] XML Request:\r",
+             "<BookRQ/>", "2025-07-28T10:00:07,002 [DEBUG] done"]
+    text = "\n".join(lines)
+    expected = [(n, tokenize_line(line.rstrip("\r"))) for n, line in enumerate(lines, 41)
+                if tokenize_line(line) is not None]
+
+    batched = list(tokenize_text(text, first_line=41))
+    assert [(n, tokens) for n, _, tokens in batched] == expected
+    assert all(text.startswith(lines[n - 41], start) for n, start, _ in batched)
+
+
+def test_error_row_uses_the_prefix_fields():
+    """Bracketed values in the message no longer stand in for the service."""
+    row = error_row("server.log", 7, HEADER)
+    assert (row["thread_id"], row["service"]) == ("default task-9", "AirShopping")
+    row = error_row("server.log", 8, "Caused by: [ERROR] [pool-1] [org.example.Retry] gave up")
+    assert (row["thread_id"], row["service"]) == ("pool-1", "Retry")
+
+
+def test_error_row_of_a_dotted_task_name():
+    row = error_row("server.log", 9, DOTTED_TASK.replace("[INFO]", "[ERROR]"))
+    assert (row["thread_id"], row["service"]) == ("http-/10.0.0.1:8080-3", "AirShopping")
+
+
+def test_rqrs_entries_of_a_dotted_task_name_are_paired(tmp_path):
+    path = tmp_path / "server.log"
+    path.write_text("\n".join([
+        DOTTED_TASK, '<OTA_AirLowFareSearchRQ Version="1.0">', "</OTA_AirLowFareSearchRQ>",
+        DOTTED_TASK.replace("10:00:05,715", "10:00:06,020").replace("Request", "Response"),
+        '<OTA_AirLowFareSearchRS Version="1.0">', "</OTA_AirLowFareSearchRS>",
+    ]) + "\n")
+    entries, _ = scan_rqrs_range(str(path))
+    assert [(row["thread"], row["service"]) for row in entries] == [("1722145600062_1062", "AirShopping")] * 2
+    assert entries.pair_messages() == 1
@@ -0,0 +1,68 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import log_watcher
+from log_watcher import LogWatcher, classify_change
+
+
+def test_changes_are_classified_by_fingerprint(tmp_path):
+    """Growth keeps the inode and size only goes up; everything else counts as a replacement."""
+    assert classify_change((1, 10, 5), (1, 10, 5)) is None
+    assert classify_change(None, (1, 10, 5)) == "created"
+    assert classify_change((1, 10, 5), None) == "deleted"
+    assert classify_change((1, 10, 5), (1, 20, 6)) == "appended"
+    assert classify_change((1, 10, 5), (2, 20, 6)) == "replaced"
+    assert classify_change((1, 10, 5), (1, 4, 6)) == "replaced"
+    assert classify_change((1, 10, 5), (1, 10, 6)) == "replaced"
+
+    seen = []
+    (tmp_path / "old.log").write_text("a\n")
+    (tmp_path / "app.log.gz").write_bytes(b"\x1f\x8b")
+    watcher = LogWatcher(str(tmp_path), lambda name, change: seen.append((name, change)),
+                         ignore=lambda name: name.endswith(".gz"))
+    watcher.fingerprints = watcher._scan_all()
+    assert set(watcher.fingerprints) == {"old.log"}
+
+    with open(tmp_path / "old.log", "a") as f:
+        f.write("b\n")
+    (tmp_path / "new.log").write_text("x\n")
+    (tmp_path / "app.log.gz").write_bytes(b"\x1f\x8b\x08")
+    assert watcher.check() == 2
+    os.replace(tmp_path / "new.log", tmp_path / "old.log")
+    assert watcher.check({"old.log", "new.log"}) == 2
+    assert seen == [("new.log", "created"), ("old.log", "appended"), ("new.log", "deleted"), ("old.log", "replaced")]
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_background_thread_reports_changes(tmp_path, monkeypatch, use_inotify):
+    """Both backends notice a file rotated in place of a watched log."""
+    monkeypatch.setattr(log_watcher, "DEBOUNCE_SECONDS", 0.05)
+    seen, changed = [], threading.Event()
+
+    def on_change(name, change):
+        seen.append((name, change))
+        changed.set()
+
+    (tmp_path / "app.log").write_text("first\n")
+    watcher = LogWatcher(str(tmp_path), on_change, poll_interval=0.05, use_inotify=use_inotify)
+    watcher.start()
+    try:
+        if use_inotify and watcher.backend != "inotify":
+            pytest.skip("inotify is not available here")
+        (tmp_path / "app.log.1").write_text("rotated\n")
+        os.replace(tmp_path / "app.log.1", tmp_path / "app.log")
+        deadline = time.time() + 5
+        while ("app.log", "replaced") not in seen and time.time() < deadline:
+            changed.wait(0.1)
+            changed.clear()
+    finally:
+        watcher.stop()
+
+    assert ("app.log", "replaced") in seen
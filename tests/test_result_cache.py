@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from result_cache import AsyncLRUCache, estimate_size
+
+
+def _result(entries):
+    return {"metadata": {"entries_found": entries},
+            "rqrs": [{"line": i, "thread": "1722145600001_1001", "tag": "OTA_AirPriceRQ", "raw": "x" * 200}
+                     for i in range(entries)]}
+
+
+def test_estimate_size_scales_with_content():
+    """Sampled estimates should grow linearly with the number of entries."""
+    small, large = estimate_size(_result(100)), estimate_size(_result(10_000))
+
+    assert small > 100 * 200
+    assert 80 < large / small < 120
+
+
+def test_cache_is_bounded_by_bytes_and_keeps_expensive_entries():
+    """Eviction respects the byte budget, prefers cheap-to-rebuild entries and is counted."""
+    async def scenario():
+        unit = estimate_size(_result(100))
+        cache = AsyncLRUCache(int(unit * 3.5))
+        await cache.set("slow.log", _result(100), cost=60.0)
+        await cache.set("a.log", _result(100), cost=0.1)
+        await cache.set("b.log", _result(100), cost=0.1)
+        assert await cache.get("missing.log") is None
+        await cache.set("c.log", _result(100), cost=0.1)  # over budget: a.log is the cheapest old entry
+
+        assert list(cache.entries) == ["slow.log", "b.log", "c.log"]
+        assert cache.total_bytes <= cache.max_bytes
+
+        assert await cache.get("slow.log") is not None
+        assert list(cache.entries)[-1] == "slow.log", "hits move entries to the most recent end"
+        assert await cache.set("huge.log", _result(1000)) is False
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["rejected"]) == (1, 1, 1, 1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+import os
+import sys
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from log_index import file_fingerprint
+from result_store import ResultStore
+
+
+def test_store_round_trip_survives_new_instances(tmp_path):
+    """A result saved by one store instance is loaded, unchanged, by the next one."""
+    log = tmp_path / "app.log"
+    log.write_text("line\n")
+    payload = {"metadata": {"entries_found": 1}, "rqrs": [{"line": 2, "tag": "OTA_AirPriceRQ", "raw": "é" * 10}]}
+    fingerprint = file_fingerprint(str(log))
+
+    ResultStore(str(tmp_path / "store" / "results.db")).save("app.log", "rqrs", fingerprint, payload)
+    loaded = ResultStore(str(tmp_path / "store" / "results.db")).load("app.log", "rqrs")
+
+    assert loaded == (fingerprint, payload)
+
+
+def test_prune_drops_deleted_and_replaced_logs_only(tmp_path):
+    """Missing, rotated and truncated logs are pruned; logs that only grew are kept."""
+    store = ResultStore(str(tmp_path / "results.db"))
+    for name in ("grown.log", "deleted.log", "truncated.log"):
+        (tmp_path / name).write_text("0123456789\n")
+        store.save(name, "rqrs", file_fingerprint(str(tmp_path / name)), {"rqrs": []})
+
+    with open(tmp_path / "grown.log", "a") as f:
+        f.write("more\n")
+    os.remove(tmp_path / "deleted.log")
+    (tmp_path / "truncated.log").write_text("0\n")
+
+    assert store.prune(str(tmp_path)) == 2
+    assert store.load("grown.log", "rqrs") is not None
+    assert store.load("deleted.log", "rqrs") is None and store.load("truncated.log", "rqrs") is None
@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks")))
+
+from log_scanner import merge_error_results, scan_errors_range
+from rqrs_parser import (
+    TIMESTAMP_BYTES, get_process_pool, merge_range_results, parse_rqrs_parallel, scan_rqrs_range,
+    shutdown_process_pool, split_aligned_ranges,
+)
+from synthetic_log import write_synthetic_log
+
+
+@pytest.fixture(scope="module")
+def synthetic_log(tmp_path_factory):
+    path = tmp_path_factory.mktemp("logs") / "synthetic.log"
+    write_synthetic_log(str(path), 256 * 1024)
+    return str(path)
+
+
+def test_split_aligned_ranges_start_on_timestamp_lines(synthetic_log):
+    """Every range edge must be the start of a timestamp line and ranges must tile the file."""
+    ranges = split_aligned_ranges(synthetic_log, 9)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == os.path.getsize(synthetic_log)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    with open(synthetic_log, "rb") as f:
+        for start, _ in ranges:
+            f.seek(start)
+            assert TIMESTAMP_BYTES.match(f.readline())
+
+
+def test_split_aligned_ranges_of_a_byte_span(synthetic_log):
+    """Splitting only start..end keeps both ends and aligns the edges in between."""
+    size = os.path.getsize(synthetic_log)
+    start, end = split_aligned_ranges(synthetic_log, 4)[1][0], size // 2
+    ranges = split_aligned_ranges(synthetic_log, 5, start, end)
+
+    assert ranges[0][0] == start and ranges[-1][1] == end
+    assert len(ranges) > 1 and all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    with open(synthetic_log, "rb") as f:
+        for range_start, _ in ranges:
+            f.seek(range_start)
+            assert TIMESTAMP_BYTES.match(f.readline())
+
+
+def test_range_scans_merge_to_sequential_result(synthetic_log):
+    """Scanning the ranges separately and merging must equal one sequential scan."""
+    expected = scan_rqrs_range(synthetic_log)
+    results = [scan_rqrs_range(synthetic_log, start, end)
+               for start, end in split_aligned_ranges(synthetic_log, 13)]
+
+    assert merge_range_results(results) == expected
+    assert expected[0], "synthetic log should contain RQ/RS entries"
+
+
+def test_parse_rqrs_parallel_matches_sequential(synthetic_log):
+    """The process-pool path must return exactly what the sequential parser returns."""
+    try:
+        assert parse_rqrs_parallel(synthetic_log, 2, min_range_bytes=16 * 1024) == scan_rqrs_range(synthetic_log)
+    finally:
+        shutdown_process_pool()
+
+
+def test_error_range_scans_merge_to_sequential_result(synthetic_log):
+    """Error scans of byte ranges, run in the pool, add up to one sequential scan."""
+    counts, rows, line_count = scan_errors_range(synthetic_log, "synthetic.log")
+    ranges = split_aligned_ranges(synthetic_log, 7)
+    try:
+        pool = get_process_pool(2)
+        futures = [pool.submit(scan_errors_range, synthetic_log, "synthetic.log", start, end, "mmap")
+                   for start, end in ranges]
+        merged = merge_error_results([future.result() for future in futures])
+    finally:
+        shutdown_process_pool()
+
+    assert len(ranges) > 1 and counts["ERROR"] and counts["WARN"]
+    assert merged == (counts, rows, line_count)
@@ -0,0 +1,141 @@
+import os
+import pickle
+import sys
+
+import pytest
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks")))
+
+from log_scanner import ScanSubscriber, scan_file
+from rqrs_parser import RQRS, RqrsCollector
+from rqrs_table import RqrsTable, latency_sketches, page_rows, read_span_lines, select_rows
+from synthetic_log import write_synthetic_log
+
+
+@pytest.fixture(scope="module")
+def synthetic_log(tmp_path_factory):
+    path = tmp_path_factory.mktemp("logs") / "synthetic.log"
+    write_synthetic_log(str(path), 128 * 1024)
+    return str(path)
+
+
+class _SpanContents(ScanSubscriber):
+    wants_spans = True
+
+    def __init__(self):
+        self.previews = []
+        self.contents = []
+
+    def on_xml_span(self, span):
+        if RQRS.search(span.content):
+            self.previews.append(span.content[:512])
+            self.contents.append(span.content)
+
+
+def test_previews_are_read_back_from_the_log(synthetic_log):
+    """``to_dicts`` rebuilds exactly the 512-char previews the parser used to keep in memory."""
+    collector, spans = RqrsCollector(), _SpanContents()
+    scan_file(synthetic_log, [collector, spans])
+
+    entries = collector.entries.to_dicts(synthetic_log)
+
+    assert [e["raw"] for e in entries] == spans.previews
+    assert set(entries[0]) == {"line", "thread", "service", "tag", "raw", "has_issue", "issue_codes",
+                                "paired_line", "latency_ms"}
+    assert collector.entries.to_dicts(synthetic_log, 3, 5) == entries[3:5]
+
+
+def test_span_offsets_locate_whole_payloads(synthetic_log):
+    """Reading a row's byte range gives back the complete XML the parser saw for that line."""
+    collector, spans = RqrsCollector(), _SpanContents()
+    scan_file(synthetic_log, [collector, spans])
+    table = collector.entries
+
+    for row in (0, len(table) // 2, len(table) - 1):
+        assert table.find_line(table.line[row]) == row
+        lines = read_span_lines(synthetic_log, table.span_start[row], table.span_end[row])
+        assert '\n'.join(lines) == spans.contents[row]
+    assert table.find_line(0) is None
+
+
+def test_tables_merge_persist_and_pickle(synthetic_log):
+    """Merging re-maps string codes; state and pickle round trips keep every row."""
+    full = RqrsCollector()
+    scan_file(synthetic_log, [full])
+    table = full.entries
+    split = table.count_through_line(table.line[len(table) // 2])
+
+    # Build the second half with its own string pool, in a different code order
+    tail = RqrsTable()
+    tail.strings.code("unrelated")
+    for row in list(table.iter_rows())[split:]:
+        tail.append(row["line"] - 100, row["thread"], row["service"], row["tag"],
+                    row["has_issue"], row["span_start"], row["span_end"],
+                    row["issues"], row["timestamp"])
+    merged = table.head(split)
+    merged.extend(tail, line_offset=100)
+
+    assert merged == table
+    assert RqrsTable.from_state(table.to_state()) == table
+    assert pickle.loads(pickle.dumps(table)) == table
+    assert sys.getsizeof(table) < sum(sys.getsizeof(e["raw"]) for e in table.to_dicts(synthetic_log))
+
+
+def test_filtered_sorted_pages_follow_cursors(synthetic_log):
+    """Walking the cursors yields every matching entry exactly once, in sort order."""
+    collector = RqrsCollector()
+    scan_file(synthetic_log, [collector])
+    table = collector.entries
+    rows = list(table.iter_rows())
+    first, last = rows[2]["line"], rows[-3]["line"]
+
+    selected = select_rows(table, tag="rq", has_issue=False, line_from=first, line_to=last)
+    assert [rows[i] for i in selected] == [
+        r for r in rows if "rq" in r["tag"].lower() and not r["has_issue"] and first <= r["line"] <= last
+    ]
+
+    for sort, descending in (("line", False), ("service", True), ("has_issue", False)):
+        expected = sorted(selected, key=lambda i: (rows[i][sort], rows[i]["line"]), reverse=descending)
+        walked, cursor = [], None
+        while True:
+            page, cursor = page_rows(table, selected, sort, descending, cursor, limit=3)
+            walked += page
+            if cursor is None:
+                break
+        assert walked == expected
+
+    with pytest.raises(ValueError):
+        page_rows(table, selected, "raw")
+
+
+def test_requests_pair_with_responses_per_thread_and_family():
+    """The oldest open RQ of a thread and message family takes the next RS; latencies feed the sketches."""
+    table = RqrsTable()
+    rows = [
+        ("t1", "AirShopping", "OTA_AirLowFareSearchRQ", 1000),
+        ("t2", "AirShopping", "OTA_AirLowFareSearchRQ", 1100),
+        ("t1", "Pricing", "OTA_AirPriceRQ", 1200),
+        ("t1", "AirShopping", "OTA_AirLowFareSearchRQ", 1300),
+        ("t1", "AirShopping", "OTA_AirLowFareSearchRS", 1450),  # answers the RQ at 1000
+        ("t2", "AirShopping", "OTA_AirLowFareSearchRS", 1600),
+        ("t1", "Pricing", "OTA_AirPriceRS", 1250),
+        ("UNKNOWN", "Booking", "OTA_AirBookRQ", 1700),
+        ("UNKNOWN", "Booking", "OTA_AirBookRS", 1800),
+        ("t3", "Booking", "OTA_AirBookRS", 1900),
+    ]
+    for line, (thread, service, tag, timestamp) in enumerate(rows, start=1):
+        table.append(line * 10, thread, service, tag, False, 0, 0, "", timestamp)
+
+    assert table.pair_messages() == 3
+    assert list(table.pair) == [4, 5, 6, -1, 0, 1, 2, -1, -1, -1]
+    assert [table.latency(i) for i in (0, 4, 5, 6, 3)] == [450, 450, 500, 50, None]
+    assert table.head(5).pair.tolist() == [4, -1, -1, -1, 0]
+
+    sketches = latency_sketches(table)
+    assert sketches["pairs"] == 3
+    assert sketches["unpaired"] == {"requests": 2, "responses": 2}
+    assert {name: s.count for name, s in sketches["by_service"].items()} == {"AirShopping": 2, "Pricing": 1}
+    assert round(sketches["by_tag"]["OTA_AirPriceRS"].quantile(0.5)) == 50
+    assert RqrsTable.from_state(table.to_state()).pair == table.pair
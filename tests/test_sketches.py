@@ -0,0 +1,67 @@
+import os
+import random
+import sys
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collections import Counter
+
+from sketches import MAX_BUCKETS, QuantileSketch, TopKCounter
+
+
+def test_quantiles_stay_within_relative_accuracy():
+    """Every quantile is within 1% of the exact one, for skewed data, merged or restored."""
+    rnd = random.Random(3)
+    values = [int(rnd.lognormvariate(5, 1.5)) for _ in range(20000)] + [0] * 300
+    first, second = QuantileSketch(), QuantileSketch()
+    first.update(values[:12000])
+    for value in values[12000:]:
+        second.add(value)
+    first.merge(second)
+    restored = QuantileSketch.from_state(first.to_state())
+
+    ordered = sorted(values)
+    for q in (0.01, 0.5, 0.9, 0.99, 0.999):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        for sketch in (first, restored):
+            assert abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-9
+    summary = restored.summary([0.5, 0.999])
+    assert summary["count"] == len(values) and summary["min"] == 0 and summary["max"] == max(values)
+    assert set(summary) == {"count", "mean", "min", "max", "p50", "p99.9"}
+    assert len(first.buckets) < 1000
+
+
+def test_bucket_count_is_bounded():
+    """Values spread over many orders of magnitude fold the lowest buckets instead of growing."""
+    sketch = QuantileSketch(relative_accuracy=0.001)
+    values = [10.0 ** (exponent / 10) for exponent in range(-300, 300)]
+    for value in values:
+        sketch.add(value)
+    assert len(sketch.buckets) <= MAX_BUCKETS
+    assert sketch.quantile(1.0) == sketch.max
+    exact = values[int(0.99 * (len(values) - 1))]
+    assert abs(sketch.quantile(0.99) - exact) <= 0.001 * exact
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_top_k_counter_keeps_heavy_hitters_in_bounded_memory():
+    """Exact while few keys are seen; with many, the frequent keys and their counts survive."""
+    small = TopKCounter(capacity=8)
+    for key in "abracadabra":
+        small.add(key)
+    assert small.most_common(2) == Counter("abracadabra").most_common(2) and small.floor == 0
+
+    rnd = random.Random(9)
+    keys = [f"thread-{rnd.randint(0, 9)}" if rnd.random() < 0.3 else f"once-{i}" for i in range(50000)]
+    first, second = TopKCounter(capacity=64), TopKCounter(capacity=64)
+    for i, key in enumerate(keys):
+        (first if i % 2 else second).add(key)
+    first.merge(second)
+
+    exact = Counter(keys).most_common(3)
+    top = first.most_common(3)
+    assert [key for key, _ in top] == [key for key, _ in exact]
+    for (_, count), (_, true_count) in zip(top, exact):
+        assert true_count - first.floor <= count <= true_count
+    assert len(first.counts) <= 128
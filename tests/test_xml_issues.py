@@ -0,0 +1,46 @@
+import os
+import random
+import re
+import sys
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from xml_issues import detect_xml_issues, has_xml_issue
+
+# The regex has_issue used to be computed with
+LEGACY_XML_ERRORS = re.compile(r'<(ns1:)?Errors>|<.*Error.*>|ErrorCode|WarningCode', re.IGNORECASE)
+
+
+def test_matches_the_legacy_regex():
+    """Same verdict as the old regex on hand-picked and random fragments."""
+    samples = [
+        "<OTA_AirLowFareSearchRS><Success/></OTA_AirLowFareSearchRS>",
+        "<Errors>\n<Error Code=\"450\"/>\n</Errors>",
+        "<Text>no ERROR here</Text>",
+        "<a>\nerror\n</a>",
+        "error <a>",
+        "<a> error",
+        "<a>error>",
+        "x ErrorCode y",
+        "warningcode",
+        "<ns1:Errors>",
+    ]
+    rnd = random.Random(7)
+    pieces = ["<", ">", "\n", "e", "r", "o", "R", " ", "error", "Error>", "<Err", "Code", "warningCode", "/"]
+    samples += ["".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 12))) for _ in range(20000)]
+
+    for text in samples:
+        assert has_xml_issue(text) == bool(LEGACY_XML_ERRORS.search(text)), repr(text)
+
+
+def test_reports_issue_codes():
+    """Codes come from ErrorCode/WarningCode values and Code attributes of Error/Warning elements."""
+    payload = (
+        '<OTA_AirBookRS><Errors><Error Type="3" Code="450" ShortText="Unable"/>'
+        '<Error Code="450"/></Errors><Warnings><Warning Type="1" Code="W12">Late</Warning></Warnings>\n'
+        '<ns1:ErrorCode> E-99 </ns1:ErrorCode><Status WarningCode="77"/></OTA_AirBookRS>'
+    )
+    assert detect_xml_issues(payload) == (True, ["450", "W12", "E-99", "77"])
+    assert detect_xml_issues("<Errors></Errors>") == (True, [])
+    assert detect_xml_issues("<OTA_PingRS><Success/></OTA_PingRS>") == (False, [])
@@ -0,0 +1,55 @@
+import os
+import sys
+from xml.etree import ElementTree as ET
+
+# Ensure the repository root is on sys.path for direct script execution
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from xml_pretty import pretty_print_xml
+
+PAYLOAD = (
+    '<FareSearchRS Version="1.0" Note="a > b">\n<Success></Success>'
+    '<Itineraries><Itinerary id="1"><Segment from="MNL" to="SIN">PR501</Segment>'
+    '<!-- cheapest --><Price cur="USD"><![CDATA[<120.50>]]></Price></Itinerary>'
+    '<Itinerary id="2"><Segment from="MNL"\nto="HKG">CX902</Segment></Itinerary></Itineraries>'
+    '</FareSearchRS>'
+)
+
+
+def test_output_matches_elementtree_indent():
+    """Well-formed payloads come out as ``ET.indent`` lays them out, whatever the chunking."""
+    simple = PAYLOAD.replace("<!-- cheapest -->", "").replace("<![CDATA[<120.50>]]>", "120.50")
+    root = ET.fromstring(simple)
+    ET.indent(root, space="  ")
+    expected = ET.tostring(root, encoding="unicode").replace("&gt;", ">").replace("<Success />", "<Success></Success>")
+
+    result = pretty_print_xml(simple)
+    assert result["pretty_xml"] == expected
+    assert result["balanced"] is True and result["truncated"] is False
+
+    whole = pretty_print_xml(PAYLOAD)
+    for size in (1, 7, 64):
+        chunks = (PAYLOAD[i:i + size] for i in range(0, len(PAYLOAD), size))
+        assert pretty_print_xml(chunks) == whole
+    assert '      <Price cur="USD"><![CDATA[<120.50>]]></Price>' in whole["pretty_xml"].splitlines()
+
+
+def test_malformed_truncated_and_collapsed_views():
+    """Broken XML is formatted as far as it goes; large payloads can be cut or collapsed."""
+    cut = pretty_print_xml(PAYLOAD[:PAYLOAD.index("CX902") + 3])
+    assert cut["balanced"] is False
+    assert cut["pretty_xml"].splitlines()[-2:] == ['      <Segment from="MNL" to="HKG">', "        CX9"]
+
+    stray = pretty_print_xml("<a><b>1 < 2</b></c></a>")
+    assert stray["pretty_xml"] == "<a>\n  <b>1 < 2</b>\n  </c>\n</a>" and stray["balanced"] is False
+
+    truncated = pretty_print_xml(PAYLOAD, max_chars=60)
+    assert truncated["truncated"] is True and len(truncated["pretty_xml"]) <= 60
+
+    collapsed = pretty_print_xml(PAYLOAD, collapse_depth=2)
+    assert collapsed["collapsed_elements"] == 2
+    assert collapsed["pretty_xml"].splitlines()[3:] == [
+        "    <!-- … 2 elements -->",
+        "  </Itineraries>",
+        "</FareSearchRS>",
+    ]
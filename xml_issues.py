@@ -0,0 +1,91 @@
+# ✅ Linear-time detection of errors and warnings in RQ/RS payloads
+#
+# The RQ/RS table flags a payload when it holds an error element or an
+# ErrorCode/WarningCode.  The old check was the regex
+#     <(ns1:)?Errors>|<.*Error.*>|ErrorCode|WarningCode   (IGNORECASE)
+# whose ``<.*Error.*>`` retries from every '<' of a line to its end: quadratic
+# in the line length, seconds for one 150 KB single-line fare response.
+# ``detect_xml_issues`` answers the same question with a few C-level literal
+# searches, visiting each line at most once, and only then (for the few
+# flagged payloads) pulls out the actual codes.
+
+import re
+from typing import List, Optional, Tuple
+
+MAX_CODES = 10  # codes kept per payload
+
+# Where codes live in OTA/SOAP payloads: ErrorCode="..." / <ErrorCode>...</ErrorCode>
+# (and Warning*), or a Code attribute of an <Error>/<Warning> element.  Both
+# are only tried where a literal search found "error"/"warning", and every
+# repetition stops at a quote, '<' or '>', so neither backtracks far.
+CODE_VALUE = re.compile(r'(?:error|warning)code\s*(?:=\s*["\']([^"\'<>]*)["\']|>([^<]*)<)', re.IGNORECASE)
+CODE_ATTRIBUTE = re.compile(r'(?:error|warning)\b[^<>]*?\scode\s*=\s*["\']([^"\'<>]*)["\']', re.IGNORECASE)
+
+
+def has_xml_issue(xml: str) -> bool:
+    """
+    Exactly what the old regex matched: ErrorCode or WarningCode anywhere,
+    or "error" on a line with a '<' somewhere before it and a '>' somewhere
+    after it (any case).
+    """
+    return _has_issue(xml.lower())
+
+
+def _has_issue(low: str) -> bool:
+    if "errorcode" in low or "warningcode" in low:
+        return True
+    pos = low.find("error")
+    while pos != -1:
+        line_start = low.rfind("\n", 0, pos) + 1
+        line_end = low.find("\n", pos)
+        if line_end == -1:
+            line_end = len(low)
+        # Some "error" of this line sits between its first '<' and its last '>'
+        first_lt = low.find("<", line_start, line_end)
+        last_gt = low.rfind(">", line_start, line_end)
+        if first_lt != -1 and last_gt != -1 and low.find("error", first_lt + 1, last_gt) != -1:
+            return True
+        pos = low.find("error", line_end)
+    return False
+
+
+def find_issue_codes(xml: str, low: Optional[str] = None, limit: int = MAX_CODES) -> List[str]:
+    """
+    The distinct error/warning codes of a payload, in order of appearance.
+    ``low`` is ``xml.lower()`` when the caller already has it.
+    """
+    if low is None:
+        low = xml.lower()
+    if len(low) != len(xml):
+        low = xml.replace("\u0130", "I").lower()  # 'İ' is the one character that lowers to two
+    hits = []
+    for word in ("error", "warning"):
+        pos = low.find(word)
+        while pos != -1:
+            hits.append(pos)
+            pos = low.find(word, pos + 1)
+    hits.sort()
+
+    codes: List[str] = []
+    for pos in hits:
+        match = CODE_VALUE.match(xml, pos)
+        if match:
+            code = match.group(1) if match.group(1) is not None else match.group(2)
+        elif pos and xml[pos - 1] in "<:" and (match := CODE_ATTRIBUTE.match(xml, pos)):
+            code = match.group(1)
+        else:
+            continue
+        code = code.strip()
+        if code and code not in codes:
+            codes.append(code)
+            if len(codes) >= limit:
+                break
+    return codes
+
+
+def detect_xml_issues(xml: str) -> Tuple[bool, List[str]]:
+    """``(has_issue, codes)`` for one XML payload."""
+    low = xml.lower()
+    if not _has_issue(low):
+        return False, []
+    return True, find_issue_codes(xml, low)
@@ -0,0 +1,211 @@
+# ✅ Streaming XML pretty-printer
+#
+# Formats XML token by token without building a tree, so a 20 MB fare-search
+# response costs one pass over the text and roughly its size in output, not an
+# ElementTree or DOM many times larger.  Markup that is malformed or cut off
+# (a log line truncated mid-payload, a stray ``<``) is carried through as
+# text instead of failing the whole document.  Output can be cut at a size
+# limit or collapsed below a given depth for a quick overview.
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+TEXT, OPEN, CLOSE, EMPTY, OTHER = range(5)
+
+# Markup and text runs, one match per token: 1 comment/PI/doctype, 2 CDATA,
+# 3-4 closing tag and its name, 5-6 opening or empty tag and its name (quoted
+# attribute values may contain '>'), 7 text.  A '<' matching none of them is
+# skipped by finditer and comes out as text.
+TOKEN = re.compile(
+    r'(<!--.*?-->|<\?.*?\?>|<!(?!--|\[CDATA\[)[^>]*>)'
+    r'|(<!\[CDATA\[.*?\]\]>)'
+    r'|(</([^\s/>!?<]+)\s*>)'
+    r'|(<([^\s/>!?<]+)[^>"\'<]*(?:(?:"[^"]*"|\'[^\']*\')[^>"\'<]*)*>)'
+    r'|([^<]+)',
+    re.S,
+)
+SPACES = re.compile(r'\s+')
+CHUNK_CHARS = 64 * 1024
+
+
+def iter_xml_tokens(chunks: Iterable[str]) -> Iterator[Tuple[int, str, Optional[str]]]:
+    """
+    ``(kind, text, tag name)`` tokens of the XML arriving in ``chunks``.
+    Markup that is never completed comes out as ``TEXT``.
+    """
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        # Hold back the last markup, which may continue in the next chunk
+        cut = buf.rfind("<")
+        for opener, closer in (("<!--", "-->"), ("<![CDATA[", "]]>")):
+            begin = buf.rfind(opener, 0, cut)
+            if begin != -1:
+                close = buf.find(closer, begin)
+                if close == -1 or close + len(closer) > cut:
+                    cut = begin  # never split a comment or CDATA section
+        if cut > 0:
+            yield from _tokens(buf[:cut])
+            buf = buf[cut:]
+    if buf:
+        yield from _tokens(buf)
+
+
+def _tokens(text: str) -> Iterator[Tuple[int, str, Optional[str]]]:
+    pos = 0
+    for m in TOKEN.finditer(text):
+        if m.start() != pos:
+            yield TEXT, text[pos:m.start()], None  # a '<' that opens nothing
+        pos = m.end()
+        group = m.lastindex
+        if group == 7:
+            yield TEXT, m.group(7), None
+        elif group == 3:
+            yield CLOSE, m.group(3), m.group(4)
+        elif group == 5:
+            tag = m.group(5)
+            yield (EMPTY if tag.endswith("/>") else OPEN), tag, m.group(6)
+        elif group == 2:
+            yield TEXT, m.group(2), None
+        else:
+            yield OTHER, m.group(1), None
+    if pos != len(text):
+        yield TEXT, text[pos:], None
+
+
+def _one_line(markup: str) -> str:
+    return SPACES.sub(" ", markup) if "\n" in markup else markup
+
+
+class XmlFormatter:
+    """
+    Turns a token stream into indented lines.  An element holding only
+    text stays on one line (``<a>text</a>``) as with ``ElementTree.indent``;
+    tags keep their original prefixes and attribute order.
+
+    With ``collapse_depth`` set, elements nested that deep are left out and
+    each run of them is replaced by one ``<!-- … N elements -->`` line.
+    After formatting, ``balanced`` tells whether every tag was closed in
+    order and ``collapsed`` how many elements were left out.
+    """
+
+    def __init__(self, indent: str = "  ", collapse_depth: Optional[int] = None):
+        self.indent = indent
+        self.collapse_depth = collapse_depth
+        self.balanced = True
+        self.collapsed = 0
+
+    def lines(self, tokens: Iterable[Tuple[int, str, Optional[str]]]) -> Iterator[str]:
+        limit = self.collapse_depth
+        pads = [""]
+        stack: List[str] = []
+        pending: Optional[str] = None  # open tag that may still close on its own line
+        text: List[str] = []
+        run = 0  # elements collapsed since the last visible line
+
+        for kind, token, name in tokens:
+            if kind == TEXT:
+                text.append(token)
+                continue
+            depth = len(stack)
+            if len(pads) <= depth + 1:
+                pads.append(pads[-1] + self.indent)
+
+            if pending is not None:
+                if kind == CLOSE and stack[-1] == name:
+                    # <a>text</a> on one line
+                    content = "".join(text).strip() if text else ""
+                    text.clear()
+                    stack.pop()
+                    yield pads[depth - 1] + pending + content + token
+                    pending = None
+                    continue
+                yield pads[depth - 1] + pending
+                pending = None
+            if text:
+                content = "".join(text).strip()
+                text.clear()
+                if content and (limit is None or depth <= limit):
+                    if run:
+                        yield self._marker(pads[limit], run)
+                        run = 0
+                    yield pads[depth] + content
+
+            if kind == CLOSE:
+                if stack and stack[-1] == name:
+                    stack.pop()
+                elif name in stack:
+                    while stack[-1] != name:
+                        stack.pop()
+                    stack.pop()
+                    self.balanced = False
+                else:
+                    self.balanced = False  # closes nothing: keep it where it is
+                depth = len(stack)
+                if limit is None or depth < limit:
+                    if run:
+                        yield self._marker(pads[limit], run)
+                        run = 0
+                    yield pads[depth] + _one_line(token)
+                continue
+
+            if limit is not None and depth >= limit:
+                if depth == limit and kind != OTHER:
+                    run += 1
+                    self.collapsed += 1
+                if kind == OPEN:
+                    stack.append(name)
+                continue
+            if run:
+                yield self._marker(pads[limit], run)
+                run = 0
+            if kind == OPEN:
+                stack.append(name)
+                pending = _one_line(token)
+            else:
+                yield pads[depth] + _one_line(token)
+
+        if pending is not None:
+            yield pads[len(stack) - 1] + pending
+        content = "".join(text).strip()
+        if content and (limit is None or len(stack) <= limit):
+            yield self.indent * len(stack) + content
+        if stack:
+            self.balanced = False  # cut off before the end
+
+    @staticmethod
+    def _marker(pad: str, count: int) -> str:
+        return f"{pad}<!-- … {count} element{'s' if count > 1 else ''} -->"
+
+
+def _chunks(text: str) -> Iterator[str]:
+    for start in range(0, len(text), CHUNK_CHARS):
+        yield text[start:start + CHUNK_CHARS]
+
+
+def pretty_print_xml(source: Union[str, Iterable[str]], indent: str = "  ",
+                     max_chars: Optional[int] = None, collapse_depth: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Pretty-print ``source`` (a string or an iterable of string chunks).
+
+    Formatting stops once the output reaches ``max_chars``; the result then
+    has ``truncated`` set and ``balanced`` is None.  Otherwise ``balanced``
+    is False when tags were left open, closed out of order or closed twice.
+    """
+    formatter = XmlFormatter(indent, collapse_depth)
+    chunks = _chunks(source) if isinstance(source, str) else source
+    out: List[str] = []
+    size, truncated = 0, False
+    for line in formatter.lines(iter_xml_tokens(chunks)):
+        if max_chars is not None and size + len(line) > max_chars:
+            out.append(line[:max(max_chars - size, 0)])
+            truncated = True
+            break
+        out.append(line)
+        size += len(line) + 1
+    return {
+        "pretty_xml": "\n".join(out),
+        "truncated": truncated,
+        "balanced": formatter.balanced if not truncated else None,
+        "collapsed_elements": formatter.collapsed,
+    }